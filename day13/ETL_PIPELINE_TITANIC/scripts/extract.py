@@ -1,6 +1,13 @@
 import os
+import sys
 import seaborn as sns
 import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import staging
+
+# Low-cardinality text columns, staged as categoricals
+CATEGORIES = ["sex", "embarked", "class", "who", "deck", "embark_town", "alive"]
  
 def extract_data():
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # go up one level
@@ -8,8 +15,8 @@ def extract_data():
     os.makedirs(data_dir, exist_ok=True)
  
     df = sns.load_dataset("titanic")
-    raw_path = os.path.join(data_dir, "titanic_raw.csv")
-    df.to_csv(raw_path, index=False)
+    raw_path = staging.path(data_dir, "titanic_raw")
+    staging.write(df, raw_path, CATEGORIES)
  
     print(f"✅ Data extracted and saved at: {raw_path}")
     return raw_path
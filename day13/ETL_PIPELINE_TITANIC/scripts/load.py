@@ -4,9 +4,12 @@
 # Purpose: Load transformed Titanic dataset into Supabase using Supabase client
  
 import os
-import pandas as pd
+import sys
 from supabase import create_client, Client
 from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import checkpoint, staging
  
 # Initialize Supabase client
 def get_supabase_client():
@@ -52,8 +55,12 @@ def create_table_if_not_exists():
     alone BOOLEAN,
     family_size INTEGER,
     is_alone BOOLEAN,
-    title TEXT
+    title TEXT,
+    row_key TEXT
 );
+-- loads upsert on row_key (content hash), so reruns never duplicate rows
+ALTER TABLE public.titanic_data ADD COLUMN IF NOT EXISTS row_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS titanic_data_row_key ON public.titanic_data (row_key);
  
         """
        
@@ -77,12 +84,13 @@ def load_to_supabase(staged_path: str, table_name: str = "titanic_data"):
     Load a transformed CSV into a Supabase table.
  
     Args:
-        staged_path (str): Path to the transformed CSV file.
+        staged_path (str): Path to the transformed file (Parquet or CSV).
         table_name (str): Supabase table name. Default is 'titanic_data'.
     """
     # Convert to absolute path
     if not os.path.isabs(staged_path):
         staged_path = os.path.abspath(os.path.join(os.path.dirname(__file__), staged_path))
+    staged_path = staging.existing(staged_path)
    
     print(f"🔍 Looking for data file at: {staged_path}")
    
@@ -95,30 +103,20 @@ def load_to_supabase(staged_path: str, table_name: str = "titanic_data"):
         # Initialize Supabase client
         supabase = get_supabase_client()
        
-        # Read the CSV in chunks
-        batch_size = 50  # Reduced batch size for better reliability
-        df = pd.read_csv(staged_path)
+        df = staging.read(staged_path)
         total_rows = len(df)
        
         print(f"📊 Loading {total_rows} rows into '{table_name}'...")
        
-        # Process in batches
-        for i in range(0, total_rows, batch_size):
-            batch = df.iloc[i:i + batch_size].copy()
-            # Convert NaN to None for proper NULL handling
-            batch = batch.where(pd.notnull(batch), None)
-            records = batch.to_dict('records')
-           
-            try:
-                response = supabase.table(table_name).insert(records).execute()
-                if hasattr(response, 'error') and response.error:
-                    print(f"⚠️  Error in batch {i//batch_size + 1}: {response.error}")
-                else:
-                    end = min(i + batch_size, total_rows)
-                    print(f"✅ Inserted rows {i+1}-{end} of {total_rows}")
-            except Exception as e:
-                print(f"⚠️  Error in batch {i//batch_size + 1}: {str(e)}")
-                continue
+        # Upsert on row_key (a content hash: the data has no natural key) in concurrent,
+        # adaptively sized batches. Committed row ranges go to a manifest, so a rerun
+        # resumes where this one stopped; rows the database refuses go to the dead-letter CSV.
+        staged_dir = os.path.dirname(staged_path)
+        checkpoint.load_resumable(
+            supabase, table_name, df, staged_path,
+            manifest_path=os.path.join(staged_dir, f"{table_name}.load_manifest.json"),
+            dead_letter_path=os.path.join(staged_dir, f"{table_name}_dead_letter.csv"),
+            batch_size=50, workers=int(os.getenv("LOAD_WORKERS", "4")))
  
         print(f"🎯 Finished loading data into '{table_name}'.")
  
@@ -130,7 +128,7 @@ def load_to_supabase(staged_path: str, table_name: str = "titanic_data"):
 # ------------------------------------------------------
 if __name__ == "__main__":
     # Path relative to the script location
-    staged_csv_path = os.path.join("..", "data", "staged", "titanic_transformed.csv")
+    staged_path = staging.path(os.path.join("..", "data", "staged"), "titanic_transformed")
     create_table_if_not_exists()  # Ensure table exists
-    load_to_supabase(staged_csv_path)
+    load_to_supabase(staged_path)
  
\ No newline at end of file
@@ -1,37 +1,77 @@
 import os
-import pandas as pd
-from extract import extract_data
+import sys
+from extract import extract_data, CATEGORIES
 
-# Purpose: Clean and transform Titanic dataset
-def transform_data(raw_path):
-    # Ensure the path is relative to project root
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # go up one level
-    staged_dir = os.path.join(base_dir, "data", "staged")
-    os.makedirs(staged_dir, exist_ok=True)
- 
-    df = pd.read_csv(raw_path)
- 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import staging, streaming, validation
+
+
+# Checks on the staged file (etl_common/validation.py)
+def staged_rules(raw_path):
+    return [
+        validation.NotNull("age", "embarked", "deck"),      # filled by transform_frame
+        validation.Allowed("survived", [0, 1]),
+        validation.Allowed("pclass", [1, 2, 3]),
+        validation.Allowed("sex", ["male", "female"]),
+        validation.Range("age", 0, 100),
+        validation.Range("fare", 0),
+        validation.Range("family_size", 1),
+        validation.RowCount(lambda: staging.rows(raw_path)),   # no row dropped
+    ]
+
+
+# Global fill values (need the whole column)
+def fill_values(df):
+    return {"age": df["age"].median(), "embarked": df["embarked"].mode()[0]}
+
+
+# Row-wise cleaning, safe to run on one chunk at a time
+def transform_frame(df, fills):
     # --- 1️⃣ Handle missing values ---
-    df["age"] = df["age"].fillna(df["age"].median())
-    df["embarked"] = df["embarked"].fillna(df["embarked"].mode()[0])
-    df["deck"] = df["deck"].fillna("Unknown")
- 
+    df["age"] = df["age"].fillna(fills["age"])
+    df["embarked"] = staging.fillna(df["embarked"], fills["embarked"])
+    df["deck"] = staging.fillna(df["deck"], "Unknown")
+
     # --- 2️⃣ Feature engineering ---
     df["family_size"] = df["sibsp"] + df["parch"] + 1
     df["is_alone"] = (df["family_size"] == 1).astype(int)
     df["title"] = df["who"].str.title()
- 
+
     # --- 3️⃣ Drop unnecessary columns ---
     df.drop(columns=["alive", "adult_male"], inplace=True, errors="ignore")
- 
+    return df
+
+
+# Purpose: Clean and transform Titanic dataset
+# chunksize: stream the file in chunks of this many rows (bounded memory);
+# None reads it in one go. Both give the same staged file.
+# raw_path and the staged file are Parquet, or CSV with STAGE_FORMAT=csv.
+def transform_data(raw_path, chunksize=None):
+    # Ensure the path is relative to project root
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # go up one level
+    staged_dir = os.path.join(base_dir, "data", "staged")
+    os.makedirs(staged_dir, exist_ok=True)
+    staged_path = staging.path(staged_dir, "titanic_transformed")
+
+    if chunksize:
+        profile = streaming.profile(raw_path, chunksize, count={"age": None, "embarked": None})
+        fills = {"age": streaming.median(profile.counts["age"]), "embarked": streaming.mode(profile.counts["embarked"])}
+        chunks = streaming.read_chunks(raw_path, chunksize, profile.dtypes)
+        staging.write_chunks((transform_frame(chunk, fills) for chunk in chunks), staged_path, CATEGORIES + ["title"])
+        print(f"✅ Data transformed in chunks of {chunksize} rows and saved at: {staged_path}")
+        validation.validate_file(staged_path, staged_rules(raw_path), chunksize, "titanic_transformed").print_summary()
+        return staged_path
+
+    df = staging.read(raw_path)
+    df = transform_frame(df, fill_values(df))
+
     # --- 4️⃣ Save transformed data ---
-    staged_path = os.path.join(staged_dir, "titanic_transformed.csv")
-    df.to_csv(staged_path, index=False)
+    staging.write(df, staged_path, CATEGORIES + ["title"])
     print(f"✅ Data transformed and saved at: {staged_path}")
+    validation.validate(df, staged_rules(raw_path), "titanic_transformed").print_summary()
     return staged_path
- 
- 
+
+
 if __name__ == "__main__":
     raw_path = extract_data()
-    transform_data(raw_path)
- 
\ No newline at end of file
+    transform_data(raw_path, int(os.getenv("TRANSFORM_CHUNKSIZE", "0")) or None)
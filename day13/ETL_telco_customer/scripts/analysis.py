@@ -12,15 +12,33 @@ Histogram of TotalCharges
 Bar plot of Contract types
 Save output CSV into:
 data/processed/analysis_summary.csv
+
+The metrics come from one groupby per page of rows (summary.py) and are
+updated incrementally from the rows loaded since the last run. The load
+upserts on row_key, so a reload changes rows in place without new ids:
+when the load manifest differs from the one the saved summary was built
+from, the summary is rebuilt from the whole table.
 '''
 
+import json
 import os
+import sys
 from supabase import create_client,Client
-import pandas as pd
 import seaborn as sns
-import numpy as np
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import table_reader
+from summary import ChurnSummary
+from extract import DTYPES
+
+DATA_DIR=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),"data")
+PROCESSED_DIR=os.path.join(DATA_DIR,"processed")
+os.makedirs(PROCESSED_DIR,exist_ok=True)
+SUMMARY_PATH=os.path.join(PROCESSED_DIR,"analysis_summary.csv")
+STATE_PATH=os.path.join(PROCESSED_DIR,"analysis_state.json")   # totals so far, for incremental runs
+LOAD_MANIFEST=os.path.join(DATA_DIR,"staged","telco_customer_data.load_manifest.json")   # written by load.py
+
 def get_supabase_client():
     load_dotenv()
     url=os.getenv("SUPABASE_URL")
@@ -29,38 +47,67 @@ def get_supabase_client():
         print("error enter key and url")
     return create_client(url,key)
 
+def load_state():
+    # the staged file the table was last loaded from, and how much of it is committed
+    try:
+        with open(LOAD_MANIFEST) as f:
+            manifest=json.load(f)
+    except (OSError,ValueError):
+        return None
+    return {"fingerprint":manifest.get("fingerprint"),"committed_rows":manifest.get("committed_rows")}
+
 def load_dataset():
     supabase=get_supabase_client()
-    result=supabase.table("telco_customer_data").select("*").execute()
-    df=pd.DataFrame(result.data)
-    return df
+    # paged by id, so the whole table comes back (a plain select stops at max-rows)
+    df=table_reader.read_table(supabase,"telco_customer_data")
+    # compact dtypes; churn etc. stay "Yes"/"No" (as categories) and the
+    # charges float64, so the metrics come out as before
+    return DTYPES.lower().apply(df, booleans=False, floats=False)
 
-def analysis_data(df):
+def print_report(summary):
+    print("total customer = ",summary.total)
+    print('percentage of churn(left) customers are = ',summary.churn_percent())
+
+    for contract,avg in summary.avg_monthly_charges().items():
+        print(contract,"  =>  ",avg)
+
+    for group,count in summary.tenure_group_counts().items():
+        print(group,"  =>  ",count)
 
-    t_c=len(df['churn'])
-    print("total customer = ",t_c)
-    left_c=df[df['churn']=='Yes']
-    print('percentage of churn(left) customers are = ',(len(left_c['id'])/t_c)*100)
-
-    sam_c=df['contract'].unique()
-    for i in sam_c:
-        print(i,"  =>  ",end='  ')
-        month_con=df[df['contract']==i]
-        print(np.mean(month_con['monthlycharges']))
-
-    sam_tg=df['tenure_group'].unique()
-    for i in sam_tg:
-        grp_sep=df[df['tenure_group']==i]
-        print(i,"  =>  ",len(grp_sep['id']))
-    
-    in_c=df['internetservice'].unique()
-    print(in_c)
-    for i in in_c:
-        print("percentage of people using ",i," internet service = ",end=' ')
-        grp_i=df[df['internetservice']==i]
-        print((len(grp_i['id'])/len(df['id']))*100)
+    for service,percent in summary.internet_service_percent().items():
+        print("percentage of people using ",service," internet service = ",percent)
+
+    print(summary.churn_vs_tenure())
+
+
+def save_report(summary):
+    summary.as_frame().to_csv(SUMMARY_PATH,index=False)
+    print(f"✅ Analysis summary saved at: {SUMMARY_PATH}")
+
+
+def analysis_data(df):
+    summary=ChurnSummary()
+    summary.update(df)
+    print_report(summary)
+    save_report(summary)
+    return summary
 
 
 if __name__=='__main__':
-    data=load_dataset()
-    analysis_data(data)
\ No newline at end of file
+    # incremental by default: only the rows loaded since the last run are read
+    # and added to the saved totals; --full recomputes from the whole table
+    summary=ChurnSummary() if "--full" in sys.argv else ChurnSummary.load(STATE_PATH)
+    source=load_state()
+    if summary.last_id is not None and summary.source!=source:
+        # upserted rows keep their ids: reading after last_id would miss the changes
+        print("🔁 The table was reloaded since the last run, rebuilding the summary")
+        summary=ChurnSummary()
+    summary.source=source
+    if summary.last_id is not None:
+        print(f"⏩ Adding rows after id {summary.last_id} to the saved summary")
+    table_reader.aggregate(get_supabase_client(),"telco_customer_data",summary,after=summary.last_id)
+    if summary.cube is None:
+        raise SystemExit("❌ No rows in telco_customer_data")
+    summary.save(STATE_PATH)
+    print_report(summary)
+    save_report(summary)
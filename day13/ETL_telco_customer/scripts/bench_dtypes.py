@@ -0,0 +1,89 @@
+'''BENCHMARK (bench_dtypes.py)
+Memory of the raw telco frame under the read-time dtype plan
+(extract.DTYPES, etl_common/dtypes.py), per column with
+memory_usage(deep=True), against the same rows read with plain dtypes and
+with Python object strings (how older pandas held them).
+
+It also checks that the plan does not change the transformed output:
+the staged CSV text is compared with and without the plan, in one go and
+in chunks, and at the original size against the committed
+data/staged/telco_customers_transformed.csv.
+
+Usage (from scripts/):
+python bench_dtypes.py --rows 1000000 --output bench_dtypes.json
+'''
+import argparse
+import io
+import json
+import os
+import sys
+
+import pandas as pd
+
+from extract import DTYPES
+from transform import total_charges, transform_frame
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import dtypes
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+RAW = os.path.join(DATA_DIR, "raw", "telco_customer_raw.csv")
+STAGED = os.path.join(DATA_DIR, "staged", "telco_customers_transformed.csv")
+
+
+def mb(nbytes):
+    return round(float(nbytes) / 2**20, 2)
+
+
+def staged_text(frame, plan=None, chunksize=None):
+    '''The staged CSV text transform.py writes for frame, with or without the plan.'''
+    median_total = total_charges(frame["TotalCharges"]).median()
+    chunksize = chunksize or len(frame)
+    out = io.StringIO()
+    for start in range(0, len(frame), chunksize):
+        chunk = frame.iloc[start:start + chunksize].copy()
+        chunk = transform_frame(plan.apply(chunk) if plan else chunk, median_total)
+        chunk.to_csv(out, index=False, header=start == 0)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of the telco frame under the dtype plan")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    base = pd.read_csv(RAW)
+    same_as_committed = staged_text(base.copy(), DTYPES) == pd.read_csv(STAGED).to_csv(index=False)
+    print(f"✅ Original {len(base)} rows, planned transform matches the committed staged file: {same_as_committed}")
+
+    frame = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).iloc[:args.rows]
+    frame = frame.reset_index(drop=True)
+    as_object = frame.astype({c: object for c in frame.columns if pd.api.types.is_string_dtype(frame[c])})
+    planned = DTYPES.apply(frame.copy())
+
+    report = dtypes.memory_report(frame, planned)
+    print(report.to_string())
+    totals = {"object_strings_mb": mb(as_object.memory_usage(deep=True).sum()),
+              "default_mb": mb(frame.memory_usage(deep=True).sum()),
+              "planned_mb": mb(planned.memory_usage(deep=True).sum())}
+    totals["ratio_vs_object"] = round(totals["object_strings_mb"] / totals["planned_mb"], 1)
+    totals["ratio_vs_default"] = round(totals["default_mb"] / totals["planned_mb"], 1)
+    print(f"📉 {args.rows:,} rows: {totals}")
+
+    expected = staged_text(frame)
+    checks = {"same_as_committed": same_as_committed,
+              "same_output": staged_text(frame, DTYPES) == expected,
+              "same_output_chunked": staged_text(frame, DTYPES, args.chunksize) == expected}
+    print(f"✅ Transformed output unchanged: {checks}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "totals": totals, "checks": checks,
+                       "columns": report.reset_index(names="column").to_dict(orient="records")}, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
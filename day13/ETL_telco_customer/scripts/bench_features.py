@@ -0,0 +1,134 @@
+'''BENCHMARK (bench_features.py)
+Rows/sec of the feature step (features.add_features) on synthetic telco
+rows, against the old per-row Series.apply functions kept below as the
+reference. At each size it checks that both give the same CSV values.
+
+Usage (from scripts/):
+python bench_features.py                      # 1M and 10M rows
+python bench_features.py --rows 1000000 --legacy-max 1000000 --output bench_features.json
+'''
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import add_features
+
+
+# ---- reference: the per-row rules the vectorized ones replace ----
+def tenure_category(x):
+    if x <= 12:
+        return 'New'
+    elif x <= 36:
+        return 'Regular'
+    elif x <= 60:
+        return 'Loyal'
+    else:
+        return 'Champion'
+
+def mon_charge(t):
+    if(t<30):
+        return 'Low'
+    elif(t>=30 and t<=70):
+        return 'Medium'
+    else:
+        return "High"
+
+def has_net(t):
+    if(t=='DSL' or t=='Fiber optic'):
+        return 1
+    else:
+        return 0
+
+def multi_line(t):
+    if(t=='Yes'):
+        return 1
+    else:
+        return 0
+
+def contract_type(x):
+    if x=='Month-to-month':
+        return 0
+    elif x=='One year':
+        return 1
+    elif x=='Two year':
+        return 2
+
+def legacy_features(df):
+    df['tenure_group'] = df['tenure'].apply(tenure_category)
+    df['monthly_charge_segment']=df['MonthlyCharges'].apply(mon_charge)
+    df['has_internet_service']=df['InternetService'].apply(has_net)
+    df['is_multi_line']=df['MultipleLines'].apply(multi_line)
+    df['contract_type_code']=df['Contract'].apply(contract_type)
+    return df
+
+
+FEATURES = ['tenure_group', 'monthly_charge_segment', 'has_internet_service', 'is_multi_line', 'contract_type_code']
+
+
+def synthetic(rows, seed=7):
+    '''Telco-shaped input columns, with boundary values and a few gaps.'''
+    rng = np.random.default_rng(seed)
+    tenure = rng.integers(0, 73, rows).astype("float64")
+    charges = np.round(rng.uniform(18, 120, rows), 2)
+    charges[rng.integers(0, rows, max(rows // 1000, 4))] = rng.choice([30.0, 70.0, 29.99, 70.01])
+    tenure[rng.integers(0, rows, max(rows // 10000, 1))] = np.nan
+    charges[rng.integers(0, rows, max(rows // 10000, 1))] = np.nan
+    pick = lambda values, p: pd.Categorical.from_codes(rng.choice(len(values), rows, p=p), categories=values)
+    return pd.DataFrame({
+        "tenure": tenure,
+        "MonthlyCharges": charges,
+        "InternetService": pick(["DSL", "Fiber optic", "No"], [0.34, 0.44, 0.22]),
+        "MultipleLines": pick(["No", "Yes", "No phone service"], [0.48, 0.42, 0.10]),
+        "Contract": pick(["Month-to-month", "One year", "Two year", "Unknown"], [0.55, 0.21, 0.239, 0.001]),
+    })
+
+
+def as_written(df):
+    '''Feature columns the way to_csv writes them (the contract code as a number:
+    the reference writes 1.0 instead of 1 once any contract is unknown).'''
+    out = df[FEATURES].astype({"contract_type_code": "Float64"})
+    return out.astype(object).where(out.notna(), "").astype(str)
+
+
+def timed(fn, df):
+    t0 = time.perf_counter()
+    out = fn(df)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rows/sec of the telco feature step")
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000_000, 10_000_000])
+    parser.add_argument("--legacy-max", type=int, default=1_000_000,
+                        help="run the per-row reference only up to this many rows")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        df = synthetic(rows)
+        new, new_s = timed(add_features, df.copy())
+        result = {"rows": rows, "vectorized_s": round(new_s, 3), "vectorized_rows_per_s": round(rows / new_s),
+                  "memory_mb": round(float(new[FEATURES].memory_usage(deep=True).sum()) / 2**20, 1)}
+        if rows <= args.legacy_max:
+            old, old_s = timed(legacy_features, df.astype({c: object for c in ("InternetService", "MultipleLines", "Contract")}))
+            result.update(legacy_s=round(old_s, 3), legacy_rows_per_s=round(rows / old_s),
+                          speedup=round(old_s / new_s, 1),
+                          legacy_memory_mb=round(float(old[FEATURES].memory_usage(deep=True).sum()) / 2**20, 1),
+                          identical=bool(as_written(old).equals(as_written(new))))
+            del old
+        results.append(result)
+        print(f"✅ {rows:>11,} rows: {result}")
+        del df, new
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
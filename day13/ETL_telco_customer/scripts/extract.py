@@ -1,6 +1,10 @@
 import os
+import sys
 import seaborn as sns
 import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import dtypes, staging
  
 
 '''EXTRACT (extract.py)
@@ -15,6 +19,20 @@ data/raw/churn_raw.csv
 Save raw CSV as:data/raw/churn_raw.csv
  '''
 
+# Low-cardinality text columns, staged as categoricals
+CATEGORIES = ["gender", "Partner", "Dependents", "PhoneService", "MultipleLines", "InternetService",
+              "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport", "StreamingTV",
+              "StreamingMovies", "Contract", "PaperlessBilling", "PaymentMethod", "Churn"]
+
+# How the raw columns are held in memory once read (etl_common/dtypes.py):
+# enumerations as categories, the pure Yes/No columns as booleans,
+# SeniorCitizen as int8 and tenure as int16 (the same in every chunk),
+# MonthlyCharges (2 decimals) as float32.
+# TotalCharges stays text until the transform parses it.
+YES_NO = ["Partner", "Dependents", "PhoneService", "PaperlessBilling", "Churn"]
+DTYPES = dtypes.DtypePlan(category=[c for c in CATEGORIES if c not in YES_NO], yes_no=YES_NO,
+                          ints={"SeniorCitizen": "int8", "tenure": "int16"}, float32={"MonthlyCharges": 2})
+
 
 def extract_data():
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # go up one level
@@ -22,8 +40,8 @@ def extract_data():
     #os.makedirs(data_dir, exist_ok=True)
  
     df = pd.read_csv(r'C:\Users\reshmitha\Downloads\WA_Fn-UseC_-Telco-Customer-Churn.csv', encoding='ISO-8859-1')
-    raw_path = os.path.join(data_dir, "telco_customer_raw.csv")
-    df.to_csv(r'C:\Users\reshmitha\Desktop\ETL_telco_customer\data\raw\telco_customer_raw.csv', index=False)
+    raw_path = staging.path(data_dir, "telco_customer_raw")
+    staging.write(df, raw_path, CATEGORIES)
  
     print(f"✅ Data extracted and saved at: {raw_path}")
     return raw_path
@@ -0,0 +1,62 @@
+'''FEATURES (features.py)
+Derived columns for the telco dataset, computed column-at-a-time:
+tenure_group            New / Regular / Loyal / Champion   (tenure months)
+monthly_charge_segment  Low / Medium / High                (MonthlyCharges)
+has_internet_service    1 if DSL or Fiber optic, else 0
+is_multi_line           1 if MultipleLines == Yes, else 0
+contract_type_code      Month-to-month 0, One year 1, Two year 2
+
+Each rule is data (bins / value maps), applied with np.select or a
+categorical lookup instead of a Python call per row. The labels are
+categorical and the flags/codes are small ints, so a 50M-row frame
+stays compact. The values written to CSV match the old
+per-row functions, including their edge cases: a missing tenure or charge
+falls into the last bucket, and an unknown contract gets no code. (With
+an unknown contract the old code wrote every code as a float, "1.0";
+contract_type_code is now always written as an integer.)
+'''
+import numpy as np
+import pandas as pd
+
+# (label, upper bound): first bound the value is under wins, else the default
+TENURE_GROUPS = [("New", 12), ("Regular", 36), ("Loyal", 60)]
+TENURE_DEFAULT = "Champion"
+
+CHARGE_SEGMENTS = [("Low", 30), ("Medium", 70)]
+CHARGE_DEFAULT = "High"
+
+INTERNET_SERVICES = ["DSL", "Fiber optic"]
+CONTRACT_CODES = {"Month-to-month": 0, "One year": 1, "Two year": 2}
+
+
+def bucket(values, bins, default, strict_first=False):
+    '''Label each value with the first (label, bound) it is <= to, else default.
+    strict_first makes the first comparison < (e.g. charge < 30 is Low).
+    Missing values never match a bound, so they get the default.'''
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+    conditions = [values < bound if strict_first and i == 0 else values <= bound
+                  for i, (_, bound) in enumerate(bins)]
+    labels = [label for label, _ in bins] + [default]
+    codes = np.select(conditions, list(range(len(bins))), default=len(bins)).astype("int8")
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def flag(values, accepted):
+    '''1 where the value is one of accepted, else 0 (missing counts as 0).'''
+    return values.isin(accepted).astype("int8")
+
+
+def code(values, mapping):
+    '''Map values to their integer code; unknown or missing values stay empty.'''
+    return values.map(mapping).astype("Int8")
+
+
+def add_features(df):
+    '''Add the derived columns to df in place and return it.'''
+    df["tenure_group"] = pd.Series(bucket(df["tenure"], TENURE_GROUPS, TENURE_DEFAULT), index=df.index)
+    df["monthly_charge_segment"] = pd.Series(
+        bucket(df["MonthlyCharges"], CHARGE_SEGMENTS, CHARGE_DEFAULT, strict_first=True), index=df.index)
+    df["has_internet_service"] = flag(df["InternetService"], INTERNET_SERVICES)
+    df["is_multi_line"] = flag(df["MultipleLines"], ["Yes"])
+    df["contract_type_code"] = code(df["Contract"], CONTRACT_CODES)
+    return df
@@ -4,10 +4,13 @@
 # Purpose: Load transformed dataset into Supabase using Supabase client
 #
 import os
-import pandas as pd
+import sys
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import checkpoint, staging
+
 # Initialize Supabase client
 def get_supabase_client():
     """Initialize and return Supabase client."""
@@ -44,8 +47,12 @@ CREATE TABLE IF NOT EXISTS public.telco_customer (
     monthly_charge_segment TEXT,
     has_internet_service INTEGER,
     is_multi_line_user INTEGER,
-    contract_type_code INTEGER
+    contract_type_code INTEGER,
+    row_key TEXT
 );
+-- loads upsert on row_key (customerID), so reruns never duplicate rows
+ALTER TABLE public.telco_customer_data ADD COLUMN IF NOT EXISTS row_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS telco_customer_data_row_key ON public.telco_customer_data (row_key);
 """
     try:
         supabase = get_supabase_client()
@@ -73,6 +80,7 @@ def load_to_supabase(staged_path: str, table_name: str = "telco_customer_data"):
     # Convert to absolute path (relative to script)
     if not os.path.isabs(staged_path):
         staged_path = os.path.abspath(os.path.join(os.path.dirname(__file__), staged_path))
+    staged_path = staging.existing(staged_path)
 
     print(f"🔍 Looking for data file at: {staged_path}")
 
@@ -85,8 +93,8 @@ def load_to_supabase(staged_path: str, table_name: str = "telco_customer_data"):
         # Initialize Supabase client
         supabase = get_supabase_client()
 
-        # Read the CSV fully (staged file) and normalize columns to lowercase
-        df = pd.read_csv(staged_path)
+        # Read the staged file (Parquet, or CSV) and normalize columns to lowercase
+        df = staging.read(staged_path)
         total_rows = len(df)
 
         # Normalize column names to lowercase to match the CREATE TABLE SQL above
@@ -120,40 +128,21 @@ def load_to_supabase(staged_path: str, table_name: str = "telco_customer_data"):
             print(f"⚠️  Expected (sample): {expected_cols}")
             return
 
-        # Reorder and keep only send_cols
-        df_send = df[send_cols].copy()
-
-        # Process in batches
-        batch_size = 200  # Reduced batch size for better reliability
-        for i in range(0, total_rows, batch_size):
-            batch = df_send.iloc[i:i + batch_size].copy()
-            # Convert NaN to None for proper NULL handling
-            batch = batch.where(pd.notnull(batch), None)
-            records = batch.to_dict('records')
-
-            try:
-                # Use the standard table insert API
-                response = supabase.table(table_name).insert(records).execute()
-
-                # Different client versions return different shapes; handle common ones
-                if isinstance(response, dict) and response.get("error"):
-                    print(f"⚠️  Error in batch {i//batch_size + 1}: {response.get('error')}")
-                else:
-                    # If response has 'status_code' or has .error attribute, handle gracefully
-                    if hasattr(response, "error") and response.error:
-                        print(f"⚠️  Error in batch {i//batch_size + 1}: {response.error}")
-                    else:
-                        end = min(i + batch_size, total_rows)
-                        print(f"✅ Inserted rows {i+1}-{end} of {total_rows}")
-            except Exception as e:
-                # Many Supabase errors include a dict-like payload; print helpful info
-                print(f"⚠️  Error in batch {i//batch_size + 1}: {str(e)}")
-                # If it looks like a schema issue, provide guidance
-                if "Could not find the" in str(e) or "PGRST204" in str(e):
-                    print("ℹ️  This looks like a schema mismatch. Make sure the 'telco_customer' table exists")
-                    print("and that column names are lowercased (e.g. 'churn', 'monthlycharges', 'totalcharges').")
-                    print("Run the CREATE TABLE SQL printed earlier in the Supabase SQL editor, then re-run this script.")
-                continue
+        # Upsert send_cols + row_key (customerID) in concurrent, adaptively sized batches.
+        # Committed row ranges go to a manifest, so a rerun resumes where this one stopped;
+        # rows the database refuses go to the dead-letter CSV.
+        staged_dir = os.path.dirname(staged_path)
+        report = checkpoint.load_resumable(
+            supabase, table_name, df, staged_path,
+            manifest_path=os.path.join(staged_dir, f"{table_name}.load_manifest.json"),
+            dead_letter_path=os.path.join(staged_dir, f"{table_name}_dead_letter.csv"),
+            key_column="customerid", columns=send_cols, batch_size=200,
+            workers=int(os.getenv("LOAD_WORKERS", "4")))
+        if report and any("Could not find the" in str(f.error) or "PGRST204" in str(f.error) for f in report.failures):
+            # If it looks like a schema issue, provide guidance
+            print("ℹ️  This looks like a schema mismatch. Make sure the 'telco_customer' table exists")
+            print("and that column names are lowercased (e.g. 'churn', 'monthlycharges', 'totalcharges').")
+            print("Run the CREATE TABLE SQL printed earlier in the Supabase SQL editor, then re-run this script.")
 
         print(f"🎯 Finished loading data into '{table_name}'.")
 
@@ -165,6 +154,6 @@ def load_to_supabase(staged_path: str, table_name: str = "telco_customer_data"):
 # ------------------------------------------------------
 if __name__ == "__main__":
     # Path relative to the script location - ensure this matches your transform.py output filename
-    staged_csv_path = os.path.join("..", "data", "staged", "telco_customers_transformed.csv")
+    staged_csv_path = staging.path(os.path.join("..", "data", "staged"), "telco_customers_transformed")
     create_table_if_not_exists()  # Best-effort create (or print SQL to run)
     load_to_supabase(staged_csv_path)
\ No newline at end of file
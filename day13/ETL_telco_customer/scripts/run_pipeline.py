@@ -0,0 +1,45 @@
+# run_pipeline.py
+# extract -> transform -> load, skipping the transform when the raw data, its
+# parameters and the transform code are unchanged (etl_common/stage_cache.py).
+# The load always runs: it is checkpointed and idempotent (etl_common/checkpoint.py),
+# so on an unchanged staged file it finds every row committed and sends nothing.
+# PIPELINE_FORCE=1 rebuilds every stage; data/run_manifest.json lists what ran.
+
+import os
+import sys
+from extract import extract_data
+from transform import transform_data
+from load import create_table_if_not_exists, load_to_supabase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import stage_cache, staging
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "data")
+COMMON_DIR = os.path.join(SCRIPTS_DIR, "..", "..", "..", "etl_common")   # shared code the transform runs
+
+
+def run_full_pipeline():
+    run = stage_cache.Run(os.path.join(DATA_DIR, ".stages"), os.path.join(DATA_DIR, "run_manifest.json"))
+
+    print("\n📡 STEP 1: Extracting...")
+    raw_path = run.stage("extract", extract_data, always=True)
+
+    print("\n🔧 STEP 2: Transforming...")
+    chunksize = int(os.getenv("TRANSFORM_CHUNKSIZE", "0")) or None
+    staged_path = run.stage("transform", lambda: transform_data(raw_path, chunksize), inputs=[raw_path],
+                            params={"format": staging.FORMAT},
+                            code=[os.path.join(SCRIPTS_DIR, name) for name in ("extract.py", "transform.py", "features.py")]
+                                 + [os.path.join(COMMON_DIR, name) for name in ("dtypes.py", "staging.py", "streaming.py")])
+
+    print("\n📦 STEP 3: Loading into Supabase...")
+    def load():
+        create_table_if_not_exists()
+        load_to_supabase(staged_path)
+    run.stage("load", load, inputs=[staged_path], params={"table": "telco_customer_data"}, always=True)
+
+    run.save()
+
+
+if __name__ == "__main__":
+    run_full_pipeline()
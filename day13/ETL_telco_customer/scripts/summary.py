@@ -0,0 +1,107 @@
+'''SUMMARY (summary.py)
+The metrics of the telco analysis, from one groupby per batch of rows:
+churn percentage, average monthly charges per contract, customers per
+tenure group, internet service distribution and churn vs tenure group.
+
+All of them are sums over the same few columns, so ChurnSummary keeps a
+small cube: (contract, tenure_group, internetservice, churn) -> rows, sum
+and count of monthlycharges. update(rows) adds one groupby of the new rows
+to it and every metric is read off the cube, instead of filtering the
+whole table once per category.
+
+The cube and the largest id seen can be saved and loaded again, so a
+later run only reads the rows loaded since (table_reader after=last_id).
+That covers rows appended to the table. Rows changed in place keep their
+id, so the state also records `source`, the load it was built from;
+analysis.py rebuilds the cube when that changes.
+'''
+import json
+import os
+
+import pandas as pd
+
+from features import TENURE_GROUPS, TENURE_DEFAULT
+
+GROUPS = ["contract", "tenure_group", "internetservice", "churn"]
+MISSING = "(missing)"
+TENURE_ORDER = [label for label, _ in TENURE_GROUPS] + [TENURE_DEFAULT]
+
+
+class ChurnSummary:
+    def __init__(self, cube=None, last_id=None, source=None):
+        self.cube = cube            # GROUPS -> size, sum, count (of monthlycharges)
+        self.last_id = last_id
+        self.source = source        # load manifest state the cube was built against
+
+    def update(self, rows):
+        rows = rows.rename(columns=str.lower)
+        keys = [rows[c].astype("string").fillna(MISSING).rename(c) for c in GROUPS]
+        part = pd.to_numeric(rows["monthlycharges"], errors="coerce").groupby(keys).agg(["size", "sum", "count"])
+        self.cube = part if self.cube is None else self.cube.add(part, fill_value=0)
+        if "id" in rows and len(rows):
+            self.last_id = max(int(rows["id"].max()), self.last_id or 0)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    @property
+    def total(self):
+        return int(self.cube["size"].sum()) if self.cube is not None else 0
+
+    def by(self, level):
+        return self.cube.groupby(level=level).sum()
+
+    def churn_percent(self):
+        churned = self.by("churn")["size"].get("Yes", 0)
+        return 100 * churned / self.total
+
+    def avg_monthly_charges(self):
+        per_contract = self.by("contract")
+        return per_contract["sum"] / per_contract["count"]
+
+    def tenure_group_counts(self):
+        counts = self.by("tenure_group")["size"].astype(int)
+        order = [g for g in TENURE_ORDER if g in counts.index] + [g for g in counts.index if g not in TENURE_ORDER]
+        return counts.reindex(order)
+
+    def internet_service_percent(self):
+        return 100 * self.by("internetservice")["size"] / self.total
+
+    def churn_vs_tenure(self):
+        pivot = self.cube["size"].groupby(level=["tenure_group", "churn"]).sum().unstack(fill_value=0).astype(int)
+        return pivot.reindex(self.tenure_group_counts().index)
+
+    def as_frame(self):
+        '''All metrics as one long table: section, row, column, value.'''
+        parts = [pd.DataFrame({"section": "churn_percent", "row": "all", "column": "churn_percent",
+                               "value": [self.churn_percent()]})]
+        for section, series in [("avg_monthly_charges", self.avg_monthly_charges()),
+                                ("tenure_group_counts", self.tenure_group_counts()),
+                                ("internet_service_percent", self.internet_service_percent())]:
+            parts.append(pd.DataFrame({"section": section, "row": series.index, "column": section,
+                                       "value": series.to_numpy(dtype=float)}))
+        pivot = self.churn_vs_tenure().stack().rename("value").reset_index()
+        parts.append(pd.DataFrame({"section": "churn_vs_tenure_group", "row": pivot["tenure_group"],
+                                   "column": pivot["churn"], "value": pivot["value"].astype(float)}))
+        return pd.concat(parts, ignore_index=True)
+
+    # ------------------------------------------------------------------
+    # State, for incremental runs
+    # ------------------------------------------------------------------
+    def save(self, path):
+        state = {"last_id": self.last_id, "source": self.source,
+                 "cube": self.cube.reset_index().to_dict(orient="records") if self.cube is not None else []}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            state = json.load(f)
+        cube = pd.DataFrame(state["cube"])
+        cube = cube.astype({c: "string" for c in GROUPS}).set_index(GROUPS) if len(cube) else None
+        return cls(cube, state.get("last_id"), state.get("source"))
@@ -1,76 +1,61 @@
 import os
+import sys
 import pandas as pd
-from extract import extract_data
-
-
-def tenure_category(x):
-    if x <= 12:
-        return 'New'
-    elif x <= 36:
-        return 'Regular'
-    elif x <= 60:
-        return 'Loyal'
-    else:
-        return 'Champion'
-
-def mon_charge(t):
-    if(t<30):
-        return 'Low'
-    elif(t>=30 and t<=70):
-        return 'Medium'
-    else:
-        return "High"
-
-def has_net(t):
-    if(t=='DSL' or t=='Fiber optic'):
-        return 1
-    else:
-        return 0
-
-def multi_line(t):
-    if(t=='Yes'):
-        return 1
-    else:
-        return 0
-
-def contract_type(x):
-    if x=='Month-to-month':
-        return 0
-    elif x=='One year':
-        return 1
-    elif x=='Two year':
-        return 2
+from extract import extract_data, CATEGORIES, DTYPES
+from features import add_features
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import staging, streaming
+
+
+def total_charges(values):
+    # float even when a chunk holds only whole numbers, as for the full column
+    return pd.to_numeric(values, errors='coerce').astype('float64')
+
+
+# Row-wise cleaning, safe to run on one chunk at a time.
+# df is read with the DTYPES plan; restore() puts back what the staged file holds.
+def transform_frame(df, median_total):
+    df['TotalCharges']=total_charges(df['TotalCharges'])
+    df['TotalCharges']=df['TotalCharges'].fillna(median_total)
+
+
+    add_features(df)   # tenure_group, monthly_charge_segment, has_internet_service, is_multi_line, contract_type_code
+
+
+    df.drop(columns=['customerID','gender'])
+    return DTYPES.restore(df)
+
 
 # Purpose: Clean and transform Titanic dataset
-def transform_data(raw_path):
+# chunksize: stream the file in chunks of this many rows (bounded memory);
+# None reads it in one go. Both give the same staged file.
+# raw_path and the staged file are Parquet, or CSV with STAGE_FORMAT=csv.
+def transform_data(raw_path, chunksize=None):
     # Ensure the path is relative to project root
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # go up one level
     staged_dir = os.path.join(base_dir, "data", "staged")
     os.makedirs(staged_dir, exist_ok=True)
- 
-    df = pd.read_csv(raw_path)
-
-    df['TotalCharges']=pd.to_numeric(df['TotalCharges'],errors='coerce')
-    df['TotalCharges']=df['TotalCharges'].fillna(df['TotalCharges'].median())
-
+    staged_path = staging.path(staged_dir, "telco_customers_transformed")
 
-    df['tenure_group'] = df['tenure'].apply(tenure_category)
-    df['monthly_charge_segment']=df['MonthlyCharges'].apply(mon_charge)
-    df['has_internet_service']=df['InternetService'].apply(has_net)
-    df['is_multi_line']=df['MultipleLines'].apply(multi_line)
-    df['contract_type_code']=df['Contract'].apply(contract_type)
+    if chunksize:
+        # first pass: the TotalCharges median over the whole file
+        profile = streaming.profile(raw_path, chunksize, count={'TotalCharges': total_charges})
+        median_total = streaming.median(profile.counts['TotalCharges'])
+        chunks = streaming.read_chunks(raw_path, chunksize, profile.dtypes)
+        staging.write_chunks((transform_frame(DTYPES.apply(chunk), median_total) for chunk in chunks), staged_path, CATEGORIES)
+        print(f"✅ Data transformed in chunks of {chunksize} rows and saved at: {staged_path}")
+        return staged_path
 
+    df = DTYPES.apply(staging.read(raw_path))
+    df = transform_frame(df, total_charges(df['TotalCharges']).median())
 
-    df.drop(columns=['customerID','gender'])
-
- 
     # --- 4️⃣ Save transformed data ---
-    staged_path = os.path.join(staged_dir, "telco_customers_transformed.csv")
-    df.to_csv(staged_path, index=False)
+    staging.write(df, staged_path, CATEGORIES)
     print(f"✅ Data transformed and saved at: {staged_path}")
     return staged_path
- 
- 
+
+
 if __name__ == "__main__":
     raw_path = extract_data()
-    transform_data(raw_path)
\ No newline at end of file
+    transform_data(raw_path, int(os.getenv("TRANSFORM_CHUNKSIZE", "0")) or None)
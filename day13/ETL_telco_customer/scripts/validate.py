@@ -6,14 +6,21 @@ Unique count of rows = original dataset
 Row count matches Supabase table
 All segments (tenure_group, monthly_charge_segment) exist
 Contract codes are only {0,1,2}
-Print a validation summary.'''
+Print a validation summary.
+
+The checks are declared as rules (etl_common/validation.py) and run in
+one pass over the table, page by page.'''
 
 import os
-import pandas as pd
-import numpy as np
+import sys
 from supabase import create_client
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from etl_common import staging, table_reader, validation
+from extract import DTYPES
+from features import TENURE_GROUPS, TENURE_DEFAULT, CHARGE_SEGMENTS, CHARGE_DEFAULT, CONTRACT_CODES
+
 def get_supabase_client():
     load_dotenv()
     url = os.getenv("SUPABASE_URL")
@@ -30,73 +37,45 @@ def get_supabase_client():
 # ----------------------------------------
 def load_dataset():
     supabase = get_supabase_client()
-    response = supabase.table("telco_customer_data").select("*").execute()
-    df = pd.DataFrame(response.data)
-    return df
+    # paged by id, so the whole table comes back (a plain select stops at max-rows)
+    df = table_reader.read_table(supabase, "telco_customer_data")
+    # compact dtypes; the Yes/No columns stay text (as categories) for the rules
+    return DTYPES.lower().apply(df, booleans=False)
 
 
 # ----------------------------------------
-# Validation checks
+# Validation rules (column names as stored in Supabase)
 # ----------------------------------------
-def run_validation(df: pd.DataFrame):
-
-
-    # ----------------------------------------
-    # 1. Missing value checks
-    # ----------------------------------------
-    missing_tenure = df[df["tenure"].isna()]
-    missing_mc = df[df["monthlycharges"].isna()]
-    missing_tc = df[df["totalcharges"].isna()]
-
-    print("🔹 Missing Tenure:", len(missing_tenure))
-    print("🔹 Missing MonthlyCharges:", len(missing_mc))
-    print("🔹 Missing TotalCharges:", len(missing_tc))
-
-    if len(missing_tenure) == 0 and len(missing_mc) == 0 and len(missing_tc) == 0:
-        print("✅ No missing required fields.\n")
-    else:
-        print("⚠️ Missing values detected! Fix required.\n")
-
-    # ----------------------------------------
-    # 2. Duplicate ID check
-    # ----------------------------------------
-    unique_ok = df["id"].unique() == len(df)
-    if unique_ok:
-        print("✅ All IDs are unique.")
-    else:
-        print("❌ Duplicate IDs found!")
-
-    # ----------------------------------------
-    # 3. Required columns exist
-    # ----------------------------------------
-    required_cols = ["tenure_group", "monthly_charge_segment"]
+STAGED_PATH = staging.path(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                        "data", "staged"), "telco_customers_transformed")
+
+RULES = [
+    # 1. no missing values in the required fields
+    validation.NotNull("tenure", "monthlycharges", "totalcharges"),
+    # 2. one row per id / customer
+    validation.Unique("id"),
+    validation.Unique("row_key"),             # the customerID the load upserts on
+    # 3. segment columns exist and hold only known segments
+    validation.Columns("tenure_group", "monthly_charge_segment"),
+    validation.Allowed("tenure_group", [label for label, _ in TENURE_GROUPS] + [TENURE_DEFAULT]),
+    validation.Allowed("monthly_charge_segment", [label for label, _ in CHARGE_SEGMENTS] + [CHARGE_DEFAULT]),
+    # 4. contract codes are only {0,1,2}
+    validation.Allowed("contract_type_code", sorted(CONTRACT_CODES.values())),
+    # 5. every staged row made it into Supabase
+    validation.RowCount(lambda: staging.rows(STAGED_PATH)),
+]
 
-    missing = [c for c in required_cols if c not in df.columns]
 
-    if len(missing) == 0:
-        print("✅ All required segment columns exist.")
-    else:
-        print("❌ Missing columns:", missing)
-
-    # ----------------------------------------
-    # 4. Contract code validation {0,1,2}
-    # ----------------------------------------
-    valid_codes = {0, 1, 2}
-
-    invalid = set(df["contract_type_code"].unique()) - valid_codes
-
-    print("\n🔍 Contract type codes found:", df["contract_type_code"].unique())
-
-    if len(invalid) == 0:
-        print("✅ Contract codes valid (only 0,1,2 used).")
-    else:
-        print("❌ Invalid contract codes found:", invalid)
-
-    # ----------------------------------------
-    # 5. Row count summary
-    # ----------------------------------------
-    print("\n📌 Total rows in Supabase:", len(df))
+# ----------------------------------------
+# Validation checks
+# data: a DataFrame or an iterable of DataFrame pages (one pass either way)
+# ----------------------------------------
+def run_validation(data):
+    report = validation.validate(data, RULES, "telco_customer_data")
+    report.print_summary()
+    return report
 
 if __name__ == "__main__":
-    df = load_dataset()
-    run_validation(df)
+    # stream the table page by page instead of holding it all
+    supabase = get_supabase_client()
+    run_validation(table_reader.iter_pages(supabase, "telco_customer_data"))
@@ -16,10 +16,12 @@ air_quality_data (
     aqi_category TEXT,
     severity_score FLOAT,
     risk_flag TEXT,
-    hour INTEGER
+    hour INTEGER,
+    UNIQUE (city, time)
 )
 Load Requirements
-Batch insert records (batch size = 200)
+Batch upsert records on (city, time) (batch size = 200), so a rerun
+updates the hours it already loaded instead of adding them again
 Auto-convert NaN → NULL
 Convert datetime to ISO formatted strings
 Retry failed batches (2 retries)
@@ -73,6 +75,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 TABLE_NAME = "air_quality_data"
+KEY_COLUMNS = ["city", "time"]   # one row per city and hour; loads upsert on it
 
 
 def clean_inf_nan(df: pd.DataFrame) -> pd.DataFrame:
@@ -109,8 +112,11 @@ CREATE TABLE IF NOT EXISTS public.air_quality_data (
     aqi_category TEXT,
     severity_score FLOAT,
     risk_flag TEXT,
-    hour INTEGER
+    hour INTEGER,
+    UNIQUE (city, time)
 );
+-- a table created before the key: drop duplicate rows, then
+-- ALTER TABLE public.air_quality_data ADD CONSTRAINT air_quality_data_city_time UNIQUE (city, time);
 """)
 
 
@@ -121,6 +127,9 @@ def load_to_supabase(staged_csv_path: str, batch_size: int = 200):
     # Convert timestamps
     df["time"] = pd.to_datetime(df["time"], errors="coerce").astype(str)
 
+    # overlapping raw files repeat hours; one upsert cannot touch a row twice
+    df = df.drop_duplicates(subset=KEY_COLUMNS, keep="last")
+
     # CLEAN DATA COMPLETELY
     df = clean_inf_nan(df)
 
@@ -144,8 +153,8 @@ def load_to_supabase(staged_csv_path: str, batch_size: int = 200):
         retry = 0
         while retry < 3:
             try:
-                supabase.table(TABLE_NAME).insert(batch).execute()
-                print(f"✅ Inserted rows {i+1}-{min(i+batch_size, total)}")
+                supabase.table(TABLE_NAME).upsert(batch, on_conflict=",".join(KEY_COLUMNS)).execute()
+                print(f"✅ Upserted rows {i+1}-{min(i+batch_size, total)}")
                 successful += len(batch)
                 break
 
@@ -163,6 +172,7 @@ def load_to_supabase(staged_csv_path: str, batch_size: int = 200):
     print(f"Successfully Loaded: {successful}")
     print(f"Failed:              {total - successful}")
     print("\n🚀 Load stage complete.")
+    return total - successful
     
 
 if __name__ == "__main__":
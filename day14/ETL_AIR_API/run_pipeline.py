@@ -1,27 +1,47 @@
 # run_pipeline.py
+# Stages whose inputs did not change are skipped (etl_common/stage_cache.py):
+# the transform only flattens new or changed raw files, and an unchanged staged
+# file is not loaded again. The load upserts on (city, time), so a rerun after a
+# failed batch, or a staged file that repeats earlier hours, adds no duplicates.
+# PIPELINE_FORCE=1 rebuilds every stage; data/run_manifest.json lists what ran.
 
+import sys
 import time
 from extract import extract_all_cities
-from transform import transform_all
+from transform import transform_all, RAW_DIR, BASE_DIR
 from load import create_table_if_not_exists, load_to_supabase
 from etl_analysis import run_analysis
 from pathlib import Path
 
+sys.path.append(str(BASE_DIR.parents[1]))
+from etl_common import stage_cache
+
+DATA_DIR = BASE_DIR / "data"
+
 
 def run_full_pipeline():
 
     print("\n🚀 STARTING FULL ETL PIPELINE\n")
 
+    run = stage_cache.Run(DATA_DIR / ".stages", DATA_DIR / "run_manifest.json")
+
     print("\n📡 STEP 1: Extracting Air Quality Data...")
-    extract_all_cities()   # creates multiple raw JSON files
+    run.stage("extract", extract_all_cities, always=True)   # creates multiple raw JSON files
     time.sleep(1)
     print("\n🔧 STEP 2: Transforming Data...")
-    staged_csv = transform_all()     # returns path to air_quality_transformed.csv
+    raw_files = sorted(RAW_DIR.glob("*.json"))
+    staged_csv = run.stage("transform", lambda: transform_all(run), inputs=raw_files,
+                           code=[BASE_DIR / "transform.py"])     # returns path to air_quality_transformed.csv
     print("\n📦 STEP 3: Loading into Supabase...")
-    create_table_if_not_exists()
-    load_to_supabase(staged_csv, batch_size=200)
+    def load():
+        create_table_if_not_exists()
+        failed = load_to_supabase(staged_csv, batch_size=200)
+        if failed:
+            raise RuntimeError(f"{failed} rows were not loaded")
+    run.stage("load", load, inputs=[staged_csv], params={"table": "air_quality_data"})
     print("\n📊 STEP 4: Running Analysis...")
     run_analysis()
+    run.save()
 
     print("\n🎉 FULL ETL PIPELINE FINISHED SUCCESSFULLY!\n")
 
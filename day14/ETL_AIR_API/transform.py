@@ -43,6 +43,7 @@ Docstring for ETL_WEATHER_2APIS.transform
 # transform.py
 
 import json
+import sys
 from pathlib import Path
 import pandas as pd
 from datetime import datetime
@@ -53,6 +54,23 @@ STAGED_DIR = BASE_DIR / "data" / "staged"
 
 STAGED_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.append(str(BASE_DIR.parents[1]))
+from etl_common import staging, validation
+
+PARTITION_DIR = STAGED_DIR / "partitions"
+
+POLLUTANT_COLS = ["pm10", "pm2_5", "carbon_monoxide",
+                  "nitrogen_dioxide", "sulphur_dioxide", "ozone", "uv_index"]
+
+# Checks on the staged data (etl_common/validation.py)
+STAGED_RULES = [
+    validation.NotNull("city", "time"),
+    validation.Unique("city", "time"),      # one reading per city and hour
+    validation.Allowed("aqi_category", ["Good", "Moderate", "Unhealthy", "Very Unhealthy", "Hazardous"]),
+    validation.Allowed("risk_flag", ["High Risk", "Moderate Risk", "Low Risk"]),
+    validation.Range("hour", 0, 23),
+] + [validation.Range(col, 0) for col in POLLUTANT_COLS]
+
 
 def flatten_air_quality_json(json_path: str) -> pd.DataFrame:
     """
@@ -132,18 +150,31 @@ def classify_risk(severity):
         return "Low Risk"
 
 
-def transform_all():
+def flatten_partition(json_path):
+    """Flatten one raw JSON into its own staged partition; returns its path."""
+    print(f"📌 Processing {json_path} ...")
+    PARTITION_DIR.mkdir(parents=True, exist_ok=True)
+    return staging.write(flatten_air_quality_json(json_path), staging.path(PARTITION_DIR, Path(json_path).stem))
+
+
+def transform_all(run=None):
+    """run: an etl_common.stage_cache.Run; with it, only the raw files that are
+    new or changed since the last run are flattened again."""
     print("🔄 Transforming all raw air-quality JSON files...")
 
     json_files = sorted(RAW_DIR.glob("*.json"))
     if not json_files:
         raise SystemExit("❌ No raw JSON files found!")
 
-    dfs = []
-    for file in json_files:
-        print(f"📌 Processing {file} ...")
-        df = flatten_air_quality_json(file)
-        dfs.append(df)
+    if run is None:
+        dfs = []
+        for file in json_files:
+            print(f"📌 Processing {file} ...")
+            df = flatten_air_quality_json(file)
+            dfs.append(df)
+    else:
+        partitions = run.partitions("flatten", json_files, flatten_partition, code=[__file__])
+        dfs = [staging.read(path) for path in partitions]
 
     # Merge all cities
     df = pd.concat(dfs, ignore_index=True)
@@ -152,8 +183,7 @@ def transform_all():
     df["time"] = pd.to_datetime(df["time"])
 
     # Convert pollutants to numeric safely
-    pollutant_cols = ["pm10", "pm2_5", "carbon_monoxide",
-                      "nitrogen_dioxide", "sulphur_dioxide", "ozone", "uv_index"]
+    pollutant_cols = POLLUTANT_COLS
 
     for col in pollutant_cols:
         df[col] = pd.to_numeric(df[col], errors="coerce")
@@ -172,6 +202,7 @@ def transform_all():
     df.to_csv(output_file, index=False)
 
     print(f"✅ Transformed file saved → {output_file}")
+    validation.validate(df, STAGED_RULES, "air_quality_transformed").print_summary()
     return output_file
 
 
@@ -21,6 +21,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
  
 TABLE_NAME = "weather_data"
+KEY_COLUMNS = ["time"]   # one row per hour; loads upsert on it
  
 CREATE_TABLE_SQL = f"""
 CREATE TABLE IF NOT EXISTS public.{TABLE_NAME} (
@@ -32,7 +33,8 @@ CREATE TABLE IF NOT EXISTS public.{TABLE_NAME} (
     relative_humidity DOUBLE PRECISION,
     wind_speed_kmh DOUBLE PRECISION,
     temp_category TEXT,
-    feels_like_c DOUBLE PRECISION
+    feels_like_c DOUBLE PRECISION,
+    UNIQUE (time)
 );
 """
  
@@ -75,33 +77,38 @@ def load_to_supabase(staged_csv_path: str, batch_size: int = 100):
  
     # convert NaN to None for JSON serialization
     df = df.where(pd.notnull(df), None)
+    # one upsert cannot touch the same row twice
+    df = df.drop_duplicates(subset=KEY_COLUMNS, keep="last")
     records = df.to_dict(orient="records")
+    failed = 0
  
     for i in range(0, total, batch_size):
         batch = records[i:i + batch_size]
         try:
-            res = supabase.table(TABLE_NAME).insert(batch).execute()
+            res = supabase.table(TABLE_NAME).upsert(batch, on_conflict=",".join(KEY_COLUMNS)).execute()
             # supabase-py: res has .error attribute or .status_code depending on version
             # We print a short success message. If an error, print it.
             if hasattr(res, "error") and res.error:
                 print(f"⚠️  Batch {i//batch_size + 1} error: {res.error}")
             else:
                 end = min(i + batch_size, total)
-                print(f"✅ Inserted rows {i+1}-{end} of {total}")
+                print(f"✅ Upserted rows {i+1}-{end} of {total}")
         except Exception as e:
             print(f"⚠️  Exception while inserting batch {i//batch_size + 1}: {e}")
             # optional: exponential backoff retry
             print("Retrying after 3s ...")
             sleep(3)
             try:
-                supabase.table(TABLE_NAME).insert(batch).execute()
+                supabase.table(TABLE_NAME).upsert(batch, on_conflict=",".join(KEY_COLUMNS)).execute()
                 print("✅ Retry success")
             except Exception as e2:
                 print(f"❌ Retry failed: {e2}")
+                failed += len(batch)
                 # continue to next batch
                 continue
  
     print("🎯 Load complete.")
+    return failed
  
 if __name__ == "__main__":
     staged_files = sorted([str(p) for p in STAGED_DIR.glob("weather_staged_*.csv")])
@@ -1,24 +1,43 @@
 # run_pipeline.py
+# Stages whose inputs did not change are skipped (etl_common/stage_cache.py):
+# when the API returns the same data as last time, the transform reuses the
+# staged file and the load does not send its rows a second time. The load
+# upserts on time, so a rerun after a failed batch adds no duplicates.
+# PIPELINE_FORCE=1 rebuilds every stage; data/run_manifest.json lists what ran.
+import sys
 import time
 from extract import extract_weather_data
-from transform import transform_data
+from transform import transform_data, BASE_DIR
 from load import create_table_if_not_exists, load_to_supabase
 from etl_analysis import run_analysis
+
+sys.path.append(str(BASE_DIR.parents[1]))
+from etl_common import stage_cache
+
+DATA_DIR = BASE_DIR / "data"
  
 def run_full_pipeline():
+    run = stage_cache.Run(DATA_DIR / ".stages", DATA_DIR / "run_manifest.json")
+
     # 1) Extract
-    raw_file = extract_weather_data()
+    raw_file = run.stage("extract", extract_weather_data, always=True)
     time.sleep(1)
  
     # 2) Transform
-    staged_csv = transform_data([raw_file])
+    staged_csv = run.stage("transform", lambda: transform_data([raw_file]), inputs=[raw_file],
+                           code=[BASE_DIR / "transform.py"])
  
     # 3) Load
-    create_table_if_not_exists()
-    load_to_supabase(staged_csv, batch_size=100)
+    def load():
+        create_table_if_not_exists()
+        failed = load_to_supabase(staged_csv, batch_size=100)
+        if failed:
+            raise RuntimeError(f"{failed} rows were not loaded")
+    run.stage("load", load, inputs=[staged_csv], params={"table": "weather_data"})
  
     # 4) Analysis
     run_analysis()
+    run.save()
  
 if __name__ == "__main__":
     run_full_pipeline()
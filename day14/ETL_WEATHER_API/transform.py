@@ -1,5 +1,6 @@
 # transform.py
 import json
+import sys
 from pathlib import Path
 import pandas as pd
 from datetime import datetime
@@ -12,6 +13,19 @@ PROCESSED_DIR = BASE_DIR / "data" / "processed"
  
 STAGED_DIR.mkdir(parents=True, exist_ok=True)
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+
+sys.path.append(str(BASE_DIR.parents[1]))
+from etl_common import validation
+
+# Checks on the staged data (etl_common/validation.py)
+STAGED_RULES = [
+    validation.NotNull("time"),
+    validation.Unique("time"),               # one reading per hour
+    validation.Range("hour", 0, 23),
+    validation.Range("relative_humidity", 0, 100),
+    validation.Range("wind_speed_kmh", 0),
+    validation.Allowed("temp_category", ["very_cold", "cold", "mild", "warm", "hot"]),
+]
  
 def _flatten_weather_json(json_path: str) -> pd.DataFrame:
     """
@@ -87,6 +101,7 @@ def transform_data(raw_json_paths: List[str]) -> str:
     staged_path = STAGED_DIR / f"weather_staged_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     df.to_csv(staged_path, index=False)
     print(f"✅ Transformed data saved at: {staged_path}")
+    validation.validate(df, STAGED_RULES, staged_path.name).print_summary()
     return str(staged_path)
  
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, Response, stream_with_context
 import sys
 import os
 # app.py
@@ -18,10 +18,60 @@ from service import (
     notification_service,
     review_service
 )
+# services reference the src.service.* singletons, so share those instances
+from src.service import catalog_service, scheduler_service, segmentation_service, shop_directory_service, stock_monitor_service
+from src import deadline, routing, serializers
 
 app = Flask(__name__)
 app.secret_key = "supersecretkey"
 
+# Deliver future-dated notifications (return reminders, scheduled messages)
+scheduler_service.start()
+# Warm-start products, shops and sales from the on-disk snapshot
+catalog_service.start()
+# Track stock levels and queue low-stock / stockout alerts
+stock_monitor_service.start()
+# Keep RFM customer segments current for targeted notifications
+segmentation_service.start()
+
+# ----------------------- Request deadline -----------------------
+@app.before_request
+def start_deadline():
+    # every DAO call made for this request shares one time budget
+    deadline.start()
+    # reads stick to the primary for a few seconds after this session writes
+    routing.bind(session)
+
+@app.teardown_request
+def clear_deadline(exc=None):
+    deadline.clear()
+    routing.unbind()
+
+@app.errorhandler(deadline.DeadlineExceeded)
+def database_timeout(e):
+    return Response("The database is not responding right now, please try again.\n", status=504, mimetype="text/plain")
+
+# ----------------------- Streaming helpers -----------------------
+STREAM_BUFFER = 200  # template output chunks per flush
+
+def stream_page(template_name, **context):
+    """Render a template incrementally; rows are sent as the DAO pages arrive."""
+    app.update_template_context(context)
+    # the page is produced after the view returns: bound each page read, not the whole table
+    deadline.clear()
+    stream = app.jinja_env.get_template(template_name).stream(context)
+    stream.enable_buffering(STREAM_BUFFER)
+    return Response(stream_with_context(stream), mimetype="text/html")
+
+def table_args(sortable, default_sort):
+    """Optional ?sort=<column>&desc=1&limit=<n> for the admin tables."""
+    sort = request.args.get("sort", default_sort)
+    if sort not in sortable:
+        sort = default_sort
+    desc = request.args.get("desc") in ("1", "true", "yes")
+    limit = request.args.get("limit", type=int)
+    return {"order_by": sort, "desc": desc, "limit": limit if limit and limit > 0 else None}
+
 # ----------------------- Landing Page -----------------------
 @app.route("/")
 def index():
@@ -69,25 +119,42 @@ def dashboard():
         return redirect(url_for("login"))
     return render_template("dashboard.html", role=session["role"])
 
+CUSTOMER_SORT = ("cust_id", "name", "email", "loyalty_points")
+PRODUCT_SORT = ("prod_id", "prod_type", "brand", "color", "price", "stock")
+NOTIFICATION_SORT = ("notification_id", "notify_date", "type", "cust_id")
+
 @app.route("/customers_page")
 def customers_page():
-    from src.dao import customer_dao
-    customers = customer_dao.list_customers()
-    return render_template("view_customers.html", customers=customers)
+    customers = customer_service.iter_customers(**table_args(CUSTOMER_SORT, "cust_id"))
+    return stream_page("view_customers.html", customers=customers)
 
 @app.route("/shops_page")
 def shops_page():
     if "role" not in session:
         return redirect(url_for("login"))
-    shops = shop_service.list_shops()
-    return render_template("shops.html", shops=shops)
+    criteria = {
+        "near": request.args.get("near") or None,
+        "radius": request.args.get("radius", type=float),
+        "n": request.args.get("n", 10, type=int),
+        "floor": request.args.get("floor", type=int),
+        "zone": request.args.get("zone") or None,
+        "category": request.args.get("category") or None,
+    }
+    try:
+        shops = shop_service.find_shops(**criteria)
+    except ValueError as e:
+        flash(str(e))
+        shops = shop_service.list_shops()
+    directory = shop_directory_service.get_directory()
+    return render_template("shops.html", shops=shops, criteria=criteria,
+                           categories=directory.categories(), floors=directory.floors())
 
 @app.route("/product_table")
 def product_table():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
-    products = product_service.list_products()
-    return render_template("product_table.html", products=products)
+    products = product_service.iter_products(**table_args(PRODUCT_SORT, "prod_id"))
+    return stream_page("product_table.html", products=products)
 
 # ----------------------- ADMIN ROUTES -----------------------
 @app.route('/add_product', methods=['GET', 'POST'])
@@ -157,20 +224,36 @@ def send_notification():
         return redirect(url_for("login"))
     if request.method == "POST":
         cust_id = request.form.get("cust_id") or None
+        segment = request.form.get("segment") or None
         notif_type = request.form["type"]
         message = request.form["message"]
         notify_date = request.form["notify_date"]
+        if segment:
+            sent = notification_service.send_to_segment(segment, notif_type, message, notify_date)
+            return f"📢 Notification sent to {sent} customers in {segment}!"
         notification_service.create_notification(cust_id, notif_type, message, notify_date)
         return "📢 Notification Sent!"
-    return render_template("send_notification.html")
+    return render_template("send_notification.html", segments=segmentation_service.summary())
+
+
+@app.route("/admin/segments", methods=["GET", "POST"])
+def segments():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    if request.method == "POST":
+        result = segmentation_service.refresh()
+        flash(f"Segments updated: {result['orders']} new orders, {result['written']} customers changed")
+        return redirect(url_for("segments"))
+    return render_template("segments.html", segments=segmentation_service.summary(),
+                           computed_at=segmentation_service.get_engine().computed_at)
 
 
 @app.route("/view_customers")
 def view_customers():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
-    customers = customer_service.list_customers()
-    return render_template("view_customers.html", customers=customers)
+    customers = customer_service.iter_customers(**table_args(CUSTOMER_SORT, "cust_id"))
+    return stream_page("view_customers.html", customers=customers)
 
 
 
@@ -181,8 +264,18 @@ def view_customers():
 def admin_notifications():
     if session.get("role") != "admin":
         return redirect(url_for("login"))
-    notifications = notification_service.list_all_notifications()
-    return render_template("admin_notifications.html", notifications=notifications)
+    notifications = notification_service.iter_all_notifications(**table_args(NOTIFICATION_SORT, "notification_id"))
+    return stream_page("admin_notifications.html", notifications=notifications)
+
+@app.route("/admin/restock", methods=["GET", "POST"])
+def restock():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    if request.method == "POST":
+        stock_monitor_service.set_threshold(int(request.form["prod_id"]), int(request.form["threshold"]))
+        flash("Threshold updated")
+        return redirect(url_for("restock"))
+    return render_template("restock.html", rows=stock_monitor_service.restock_soon(limit=50))
 
 
 @app.route('/notifications/<int:cust_id>')
@@ -285,6 +378,27 @@ def view_reviews():
 
 
 
+# Search review comments (support staff)
+@app.route("/search_reviews", methods=["GET"])
+def search_reviews():
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+
+    query = request.args.get("q", "")
+    prod_id = request.args.get("prod_id") or None
+    # type=float: empty or malformed input means no bound, not a 500
+    min_rating = request.args.get("min_rating", type=float)
+    max_rating = request.args.get("max_rating", type=float)
+    date_from = request.args.get("date_from") or None
+    date_to = request.args.get("date_to") or None
+
+    results = review_service.search_reviews(
+        query, prod_id=prod_id, min_rating=min_rating, max_rating=max_rating,
+        date_from=date_from, date_to=date_to
+    ) if query else []
+    return render_template("search_reviews.html", results=results, query=query, args=request.args)
+
+
 @app.route("/view_history")
 def view_history():
     if "user_id" not in session:
@@ -294,17 +408,42 @@ def view_history():
     return render_template("view_history.html", history=history)
 
 # ----------------------- API ROUTES -----------------------
+def api_response(rows, name):
+    """Serialize rows as JSON, CSV, Arrow or Parquet (?format= or Accept header)."""
+    fmt = serializers.negotiate(request.accept_mimetypes, request.args.get("format"))
+    if fmt is None:
+        return Response(f"Not acceptable; available formats: {', '.join(serializers.available_formats())}\n",
+                        status=406, mimetype="text/plain")
+    body, mimetype = serializers.serialize(rows, fmt)
+    resp = Response(body, mimetype=mimetype)
+    resp.vary.add("Accept")
+    if fmt != "json":
+        resp.headers["Content-Disposition"] = f"attachment; filename={name}.{serializers.EXTENSIONS[fmt]}"
+    return resp
+
 @app.route("/api/customers")
 def api_customers():
-    return jsonify(customer_service.list_customers())
+    return api_response(customer_service.list_customers(), "customers")
 
 @app.route("/api/products")
 def api_products():
-    return jsonify(product_service.list_products())
+    return api_response(product_service.list_products(), "products")
+
+@app.route("/api/orders")
+def api_orders():
+    return api_response(order_service.list_orders(), "orders")
 
 @app.route("/api/notifications")
 def api_notifications():
-    return jsonify(notification_service.list_all_notifications())
+    return api_response(notification_service.list_all_notifications(), "notifications")
+
+
+@app.route("/admin/dao_metrics")
+def dao_metrics():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    metrics = dict(deadline.metrics(), routing=routing.metrics())
+    return Response(serializers.dumps_json(metrics, indent=True), mimetype="application/json")
 
 
 # ----------------------- Run App -----------------------
@@ -0,0 +1,425 @@
+# asgi_app.py
+"""
+Async (ASGI) variant of app.py.
+
+Same routes and templates as the Flask app, and the same service layer:
+every service call runs on a worker thread (asyncio.to_thread, which
+carries the request's deadline and read routing along), so the business
+rules, caches and kiosk mode live in src/service only. Independent calls
+on a page are awaited together with asyncio.gather, so the page waits for
+the slowest one instead of their sum (the admin dashboard's customer and
+product counts).
+
+Run with:
+    hypercorn asgi_app:app --bind 127.0.0.1:8000
+"""
+import asyncio
+
+from quart import Quart, render_template, request, redirect, url_for, session, flash, Response
+
+from src import deadline, routing, serializers
+from src.service import (auth_service, catalog_service, customer_service, notification_service, order_service,
+                         product_service, review_service, sales_service, scheduler_service, segmentation_service,
+                         shop_directory_service, shop_service, stock_monitor_service)
+
+app = Quart(__name__)
+app.secret_key = "supersecretkey"
+
+
+def call(fn, *args, **kwargs):
+    """Run a blocking service function off the event loop."""
+    return asyncio.to_thread(fn, *args, **kwargs)
+
+
+@app.before_serving
+async def startup():
+    # the same background services as app.py
+    scheduler_service.start()
+    await call(catalog_service.start)
+    stock_monitor_service.start()
+    segmentation_service.start()
+
+
+@app.before_request
+async def start_deadline():
+    # every DAO call made for this request shares one time budget
+    deadline.start()
+    # reads stick to the primary for a few seconds after this session writes
+    routing.bind(session)
+
+
+@app.errorhandler(deadline.DeadlineExceeded)
+async def database_timeout(e):
+    return Response("The database is not responding right now, please try again.\n", status=504, mimetype="text/plain")
+
+
+def table_args(sortable, default_sort):
+    """Optional ?sort=<column>&desc=1&limit=<n> for the admin tables."""
+    sort = request.args.get("sort", default_sort)
+    if sort not in sortable:
+        sort = default_sort
+    desc = request.args.get("desc") in ("1", "true", "yes")
+    limit = request.args.get("limit", type=int)
+    return {"order_by": sort, "desc": desc, "limit": limit if limit and limit > 0 else None}
+
+
+def read_all(iter_rows, **kwargs):
+    """list(iter_rows(**kwargs)) on a worker thread, for the paged admin tables."""
+    return call(lambda: list(iter_rows(**kwargs)))
+
+# ----------------------- Landing Page -----------------------
+@app.route("/")
+async def index():
+    return redirect(url_for("login"))
+
+# ----------------------- Authentication -----------------------
+@app.route("/signup", methods=["GET", "POST"])
+async def signup():
+    if request.method == "POST":
+        form = await request.form
+        try:
+            await call(auth_service.signup_user, form["email"], form["password"], form["role"])
+            return redirect(url_for("login"))
+        except ValueError as e:
+            return await render_template("signup.html", error=str(e))
+    return await render_template("signup.html")
+
+
+@app.route("/login", methods=["GET", "POST"])
+async def login():
+    if request.method == "POST":
+        form = await request.form
+        try:
+            user = await call(auth_service.login_user, form["email"], form["password"])
+            session["user_id"] = user["user_id"]
+            session["role"] = user["role"]
+            return redirect(url_for("dashboard"))
+        except ValueError as e:
+            return await render_template("login.html", error=str(e))
+    return await render_template("login.html")
+
+
+@app.route("/logout")
+async def logout():
+    session.clear()
+    return redirect(url_for("login"))
+
+# ----------------------- Dashboard -----------------------
+@app.route("/dashboard")
+async def dashboard():
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+    counts = {}
+    if session["role"] == "admin":
+        customer_count, product_count = await asyncio.gather(
+            call(customer_service.count_customers), call(product_service.count_products))
+        counts = {"customer_count": customer_count, "product_count": product_count}
+    return await render_template("dashboard.html", role=session["role"], **counts)
+
+CUSTOMER_SORT = ("cust_id", "name", "email", "loyalty_points")
+PRODUCT_SORT = ("prod_id", "prod_type", "brand", "color", "price", "stock")
+NOTIFICATION_SORT = ("notification_id", "notify_date", "type", "cust_id")
+
+@app.route("/customers_page")
+async def customers_page():
+    customers = await read_all(customer_service.iter_customers, **table_args(CUSTOMER_SORT, "cust_id"))
+    return await render_template("view_customers.html", customers=customers)
+
+@app.route("/shops_page")
+async def shops_page():
+    if "role" not in session:
+        return redirect(url_for("login"))
+    criteria = {
+        "near": request.args.get("near") or None,
+        "radius": request.args.get("radius", type=float),
+        "n": request.args.get("n", 10, type=int),
+        "floor": request.args.get("floor", type=int),
+        "zone": request.args.get("zone") or None,
+        "category": request.args.get("category") or None,
+    }
+    try:
+        shops = await call(shop_service.find_shops, **criteria)
+    except ValueError as e:
+        await flash(str(e))
+        shops = await call(shop_service.list_shops)
+    directory = await call(shop_directory_service.get_directory)
+    return await render_template("shops.html", shops=shops, criteria=criteria,
+                                 categories=directory.categories(), floors=directory.floors())
+
+@app.route("/product_table")
+async def product_table():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    products = await read_all(product_service.iter_products, **table_args(PRODUCT_SORT, "prod_id"))
+    return await render_template("product_table.html", products=products)
+
+# ----------------------- ADMIN ROUTES -----------------------
+@app.route('/add_product', methods=['GET', 'POST'])
+async def add_product():
+    if session.get('role') != 'admin':
+        await flash("Access denied")
+        return redirect(url_for('dashboard'))
+
+    if request.method == 'POST':
+        form = await request.form
+        prod_type = form.get('prod_type')
+        brand = form.get('brand') or 'local'
+        color = form.get('color') or 'multi'
+        price = float(form.get('price') or 0)
+        stock = int(form.get('stock') or 0)
+        on_sale = bool(form.get('on_sale'))
+        sale_id = form.get('sale_id')
+        sale_id = int(sale_id) if sale_id else None
+
+        try:
+            await call(product_service.create_product, prod_type, brand, color, price, stock, on_sale, sale_id)
+            return await render_template('add_product.html', success="✅ Product added successfully!")
+        except Exception as e:
+            return await render_template('add_product.html', error=str(e))
+
+    return await render_template('add_product.html')
+
+@app.route("/view_sales")
+async def view_sales():
+    sales = await call(sales_service.list_sales_with_products)
+    return await render_template("view_sales.html", sales=sales)
+
+
+@app.route("/add_sale", methods=["GET", "POST"])
+async def add_sale():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    if request.method == "POST":
+        form = await request.form
+        await call(sales_service.create_sale, form.get("sale_name"), form.get("discount"))
+        return "✅ Sale Added Successfully"
+    return await render_template("add_sale.html")
+
+
+@app.route("/add_shop", methods=["GET", "POST"])
+async def add_shop():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+
+    if request.method == "POST":
+        form = await request.form
+        await call(shop_service.create_shop, form.get("name"), form.get("owner"), form.get("location"), form.get("category"))
+        return "✅ Shop Added Successfully"
+
+    return await render_template("add_shop.html")
+
+
+@app.route("/send_notification", methods=["GET", "POST"])
+async def send_notification():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    if request.method == "POST":
+        form = await request.form
+        cust_id = form.get("cust_id") or None
+        segment = form.get("segment") or None
+        if segment:
+            sent = await call(notification_service.send_to_segment, segment, form["type"], form["message"],
+                              form["notify_date"])
+            return f"📢 Notification sent to {sent} customers in {segment}!"
+        await call(notification_service.create_notification, cust_id, form["type"], form["message"],
+                   form["notify_date"])
+        return "📢 Notification Sent!"
+    return await render_template("send_notification.html", segments=await call(segmentation_service.summary))
+
+
+@app.route("/admin/segments", methods=["GET", "POST"])
+async def segments():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    if request.method == "POST":
+        result = await call(segmentation_service.refresh)
+        await flash(f"Segments updated: {result['orders']} new orders, {result['written']} customers changed")
+        return redirect(url_for("segments"))
+    return await render_template("segments.html", segments=await call(segmentation_service.summary),
+                                 computed_at=segmentation_service.get_engine().computed_at)
+
+
+@app.route("/view_customers")
+async def view_customers():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    customers = await read_all(customer_service.iter_customers, **table_args(CUSTOMER_SORT, "cust_id"))
+    return await render_template("view_customers.html", customers=customers)
+
+
+@app.route("/admin/notifications")
+async def admin_notifications():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    notifications = await read_all(notification_service.iter_all_notifications,
+                                   **table_args(NOTIFICATION_SORT, "notification_id"))
+    return await render_template("admin_notifications.html", notifications=notifications)
+
+
+@app.route("/admin/restock", methods=["GET", "POST"])
+async def restock():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    if request.method == "POST":
+        form = await request.form
+        await call(stock_monitor_service.set_threshold, int(form["prod_id"]), int(form["threshold"]))
+        await flash("Threshold updated")
+        return redirect(url_for("restock"))
+    return await render_template("restock.html", rows=await call(stock_monitor_service.restock_soon, limit=50))
+
+
+@app.route('/notifications/<int:cust_id>')
+async def notifications_page(cust_id):
+    notifications = await call(notification_service.get_notifications, cust_id)
+    return await render_template("notifications.html", notifications=notifications, cust_id=cust_id)
+
+# ----------------------- CUSTOMER ROUTES -----------------------
+@app.route("/search_product", methods=["GET", "POST"])
+async def search_products():
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+
+    form = await request.form
+    prod_id = form.get("prod_id") or request.args.get("prod_id")
+    prod_type = form.get("prod_type")
+    brand = form.get("brand")
+    color = form.get("color")
+    min_price = form.get("min_price")
+    max_price = form.get("max_price")
+    on_sale = form.get("on_sale")
+
+    filters = {}
+
+    if prod_id:
+        filters["prod_id"] = prod_id
+    if prod_type:
+        filters["prod_type"] = prod_type
+    if brand:
+        filters["brand"] = brand
+    if color:
+        filters["color"] = color
+    if min_price:
+        filters["min_price"] = float(min_price)
+    if max_price:
+        filters["max_price"] = float(max_price)
+    if on_sale == "yes":
+        filters["on_sale"] = True
+    elif on_sale == "no":
+        filters["on_sale"] = False
+
+    results = await call(product_service.filter_products, filters) if filters else []
+
+    return await render_template("products_search.html", results=results, filters=filters)
+
+
+@app.route("/view_notifications", methods=["GET", "POST"])
+async def view_notifications():
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+
+    form = await request.form
+    email_input = form.get("email") if request.method == "POST" else request.args.get("email")
+    type_input = form.get("type") if request.method == "POST" else request.args.get("type")
+
+    cust_id = None
+    if email_input:
+        customer = await call(customer_service.get_customer_by_email, email_input)
+        cust_id = customer["cust_id"] if customer else -1
+
+    notifications = await call(notification_service.filter_notifications, cust_id=cust_id, notif_type=type_input)
+
+    return await render_template(
+        "view_notifications.html",
+        notifications=notifications,
+        email=email_input or "",
+        notif_type=type_input or ""
+    )
+
+
+@app.route("/add_review", methods=["GET", "POST"])
+async def add_review():
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+
+    if request.method == "POST":
+        form = await request.form
+        await call(review_service.create_review, session["user_id"], form["prod_id"], form["rating"], form["comment"])
+        return "⭐ Review Added!"
+
+    return await render_template("add_review.html")
+
+
+@app.route("/view_reviews", methods=["GET"])
+async def view_reviews():
+    prod_id = request.args.get("prod_id")
+    cust_id = request.args.get("cust_id")
+
+    reviews = await call(review_service.get_reviews, prod_id=prod_id, cust_id=cust_id)
+    return await render_template("view_reviews.html", reviews=reviews, prod_id=prod_id)
+
+
+@app.route("/search_reviews", methods=["GET"])
+async def search_reviews():
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+
+    args = request.args
+    query = args.get("q", "")
+    results = await call(
+        review_service.search_reviews, query,
+        args.get("prod_id") or None, args.get("min_rating", type=float), args.get("max_rating", type=float),
+        args.get("date_from") or None, args.get("date_to") or None
+    ) if query else []
+    return await render_template("search_reviews.html", results=results, query=query, args=args)
+
+
+@app.route("/view_history")
+async def view_history():
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+    history = await call(order_service.get_order_history, session["user_id"])
+    return await render_template("view_history.html", history=history)
+
+# ----------------------- API ROUTES -----------------------
+async def api_response(rows, name):
+    """Serialize rows as JSON, CSV, Arrow or Parquet (?format= or Accept header)."""
+    fmt = serializers.negotiate(request.accept_mimetypes, request.args.get("format"))
+    if fmt is None:
+        return Response(f"Not acceptable; available formats: {', '.join(serializers.available_formats())}\n",
+                        status=406, mimetype="text/plain")
+    # encoding a large table is CPU work; keep it off the event loop
+    body, mimetype = await asyncio.to_thread(serializers.serialize, rows, fmt)
+    resp = Response(body, mimetype=mimetype)
+    resp.vary.add("Accept")
+    if fmt != "json":
+        resp.headers["Content-Disposition"] = f"attachment; filename={name}.{serializers.EXTENSIONS[fmt]}"
+    return resp
+
+@app.route("/api/customers")
+async def api_customers():
+    return await api_response(await call(customer_service.list_customers), "customers")
+
+@app.route("/api/products")
+async def api_products():
+    return await api_response(await call(product_service.list_products), "products")
+
+@app.route("/api/orders")
+async def api_orders():
+    return await api_response(await call(order_service.list_orders), "orders")
+
+@app.route("/api/notifications")
+async def api_notifications():
+    return await api_response(await call(notification_service.list_all_notifications), "notifications")
+
+
+@app.route("/admin/dao_metrics")
+async def dao_metrics():
+    if session.get("role") != "admin":
+        return redirect(url_for("login"))
+    metrics = dict(deadline.metrics(), routing=routing.metrics())
+    return Response(serializers.dumps_json(metrics, indent=True), mimetype="application/json")
+
+
+# ----------------------- Run App -----------------------
+if __name__ == "__main__":
+    app.run(debug=True)
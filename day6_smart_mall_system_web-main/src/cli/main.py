@@ -1,47 +1,71 @@
 import argparse
-import json
-from src.services import product_service, customer_service, shop_service, order_service, notification_service, sales_service
+import sys
+from src import serializers
+from src.service import product_service, customer_service, shop_service, order_service, notification_service
 import streamlit as st
+
+def emit(data, args):
+    """Write a result in --format (json by default) to stdout or --output."""
+    fmt = args.format
+    if fmt == "json":
+        body = serializers.dumps_json(data, indent=True) + b"\n"
+    else:
+        rows = data if isinstance(data, list) else [data]
+        body, _ = serializers.serialize(rows, fmt)
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(body)
+    else:
+        sys.stdout.buffer.write(body)
+        sys.stdout.flush()
+
 class CmdProduct:
     def add(self, args):
         p = product_service.add_product(args.prod_type, args.brand, args.color, args.price, args.stock, args.on_sale, args.sale_id)
-        print(json.dumps(p, indent=2))
+        emit(p, args)
 
     def list(self, args):
         products = product_service.list_products()
-        print(json.dumps(products, indent=2))
+        emit(products, args)
 
 class CmdCustomer:
     def add(self, args):
         c = customer_service.add_customer(args.name, args.email, args.phone)
-        print(json.dumps(c, indent=2))
+        emit(c, args)
 
     def list(self, args):
         customers = customer_service.list_customers()
-        print(json.dumps(customers, indent=2))
+        emit(customers, args)
 
 class CmdShop:
     def add(self, args):
         s = shop_service.add_shop(args.name, args.category)
-        print(json.dumps(s, indent=2))
+        emit(s, args)
 
     def list(self, args):
         shops = shop_service.list_shops()
-        print(json.dumps(shops, indent=2))
+        emit(shops, args)
 
 class CmdOrder:
     def create(self, args):
         items = [{"prod_id": int(i.split(":")[0]), "quantity": int(i.split(":")[1])} for i in args.item]
         o = order_service.create_order(args.customer, args.shop, items)
-        print(json.dumps(o, indent=2))
+        emit(o, args)
+
+    def list(self, args):
+        orders = order_service.list_orders()
+        emit(orders, args)
 
 class CmdNotification:
     def view(self, args):
         notifications = notification_service.get_notifications(args.customer)
-        print(json.dumps(notifications, indent=2))
+        emit(notifications, args)
 
 def main():
     parser = argparse.ArgumentParser()
+    parser.add_argument("--format", choices=list(serializers.MEDIA_TYPES), default="json",
+                        help="output format; arrow and parquet need pyarrow")
+    parser.add_argument("--output", help="write to this file instead of stdout")
     sub = parser.add_subparsers(dest="cmd")
 
     # Product
@@ -88,6 +112,8 @@ def main():
     createo.add_argument("--shop", type=int, required=True)
     createo.add_argument("--item", required=True, nargs="+")
     createo.set_defaults(func=CmdOrder().create)
+    listo = o_sub.add_parser("list")
+    listo.set_defaults(func=CmdOrder().list)
 
     # Notification
     n_parser = sub.add_parser("notification")
@@ -0,0 +1,12 @@
+from src.config import get_supabase
+from src.dao.pager import iter_table
+
+def _sb():
+    return get_supabase()
+
+def fetch_all(table, pk):
+    return list(iter_table(_sb(), table, pk))
+
+def fetch_changed(table, pk, since, column="updated_at"):
+    """Rows whose `column` is later than `since`."""
+    return list(iter_table(_sb(), table, pk, order_by=column, after=(column, since)))
@@ -1,19 +1,35 @@
 # src/dao/customer_dao.py
 from src.config import get_supabase
+from src.deadline import execute
+from src.dao.pager import iter_table
 import streamlit as st
 def _sb():
     return get_supabase()
 
 def create_customer(name, email, phone):
     payload = {"name": name, "email": email, "phone": phone}
-    _sb().table("customer").insert(payload).execute()
+    execute(_sb().table("customer").insert(payload))
     return payload
 
 
 def list_customers():
-    resp = _sb().table("customer").select("*").execute()
+    resp = execute(_sb().table("customer").select("*"), stale_ok=True)
     return resp.data
 
+def count_customers():
+    resp = execute(_sb().table("customer").select("cust_id", count="exact").limit(1), stale_ok=True)
+    return resp.count or 0
+
+def iter_customers(order_by="cust_id", desc=False, limit=None):
+    return iter_table(_sb(), "customer", "cust_id", order_by, desc, limit)
+
+def iter_customers_after(cust_id=None):
+    return iter_table(_sb(), "customer", "cust_id", after=("cust_id", cust_id) if cust_id is not None else None)
+
+def get_customer_by_id(cust_id):
+    resp = execute(_sb().table("customer").select("*").eq("cust_id", cust_id).limit(1))
+    return resp.data[0] if resp.data else None
+
 def get_customer_by_email(email):
-    resp = _sb().table("customer").select("*").eq("email", email).limit(1).execute()
+    resp = execute(_sb().table("customer").select("*").eq("email", email).limit(1))
     return resp.data[0] if resp.data else None
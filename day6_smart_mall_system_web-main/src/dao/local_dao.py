@@ -0,0 +1,169 @@
+# src/dao/local_dao.py
+"""
+Local SQLite store for kiosk mode: a replica of the catalog tables, the
+last copy of the other reads the kiosk pages make (read_cache), and a
+journal of writes waiting to be sent to Supabase.
+
+Rows are kept as JSON documents keyed by (table, primary key), so the
+replica follows whatever columns Supabase returns. One connection per
+thread; WAL mode lets the sync thread write while pages read.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_PATH = os.environ.get("KIOSK_DB", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".kiosk", "kiosk.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replica (
+    tbl TEXT NOT NULL,
+    pk INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (tbl, pk)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS replica_meta (
+    tbl TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at TEXT
+);
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS journal_status ON journal (status, id);
+CREATE TABLE IF NOT EXISTS read_cache (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    stored_at TEXT NOT NULL
+);
+"""
+
+_local = threading.local()
+
+
+def _db():
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_PATH:
+        os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn, _local.path = conn, DB_PATH
+    return conn
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+# ----------------------- replica -----------------------
+def load_rows(tbl):
+    rows = _db().execute("SELECT data FROM replica WHERE tbl = ? ORDER BY pk", (tbl,)).fetchall()
+    return [json.loads(data) for (data,) in rows]
+
+def get_row(tbl, pk):
+    row = _db().execute("SELECT data FROM replica WHERE tbl = ? AND pk = ?", (tbl, pk)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def upsert_rows(tbl, pk, rows, replace=False, watermark=None):
+    """Write rows into the replica in one transaction (replace=True drops the old copy first)."""
+    conn = _db()
+    with conn:
+        if replace:
+            conn.execute("DELETE FROM replica WHERE tbl = ?", (tbl,))
+        conn.executemany("INSERT OR REPLACE INTO replica (tbl, pk, data) VALUES (?, ?, ?)",
+                         [(tbl, row[pk], json.dumps(row)) for row in rows])
+        if watermark is not None or replace:
+            conn.execute("INSERT OR REPLACE INTO replica_meta (tbl, watermark, synced_at) VALUES (?, ?, ?)",
+                         (tbl, watermark, _now()))
+
+def get_watermark(tbl):
+    row = _db().execute("SELECT watermark FROM replica_meta WHERE tbl = ?", (tbl,)).fetchone()
+    return row[0] if row else None
+
+def has_replica(tbl):
+    return _db().execute("SELECT 1 FROM replica_meta WHERE tbl = ?", (tbl,)).fetchone() is not None
+
+
+# ----------------------- read cache -----------------------
+def put_cached(key, value):
+    conn = _db()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO read_cache (key, data, stored_at) VALUES (?, ?, ?)",
+                     (key, json.dumps(value, default=str), _now()))
+
+def get_cached(key):
+    """(value, stored_at) of the last copy stored under key, or (None, None)."""
+    row = _db().execute("SELECT data, stored_at FROM read_cache WHERE key = ?", (key,)).fetchone()
+    return (json.loads(row[0]), row[1]) if row else (None, None)
+
+
+# ----------------------- journal -----------------------
+# pending -> in_flight (being sent) -> done / conflict / failed.
+# An in_flight entry was cut off mid-send and is retried like a pending one.
+OPEN = ("pending", "in_flight")
+
+def append_journal(op, payload, local_rows=None):
+    """
+    Queue a write. local_rows = (tbl, pk, rows) are applied to the replica
+    in the same transaction, so the kiosk shows the change straight away.
+    """
+    conn = _db()
+    with conn:
+        cur = conn.execute("INSERT INTO journal (op, payload, created_at) VALUES (?, ?, ?)",
+                           (op, json.dumps(payload), _now()))
+        if local_rows:
+            tbl, pk, rows = local_rows
+            conn.executemany("INSERT OR REPLACE INTO replica (tbl, pk, data) VALUES (?, ?, ?)",
+                             [(tbl, row[pk], json.dumps(row)) for row in rows])
+        return cur.lastrowid
+
+def pending_journal(limit):
+    rows = _db().execute(
+        "SELECT id, op, payload, attempts, status FROM journal WHERE status IN (?, ?) ORDER BY id LIMIT ?",
+        OPEN + (limit,)
+    ).fetchall()
+    return [{"id": r[0], "op": r[1], "payload": json.loads(r[2]), "attempts": r[3], "status": r[4]} for r in rows]
+
+def open_payloads(op):
+    """Payloads of the entries of one kind not sent yet (to show queued changes)."""
+    rows = _db().execute("SELECT payload FROM journal WHERE op = ? AND status IN (?, ?)", (op,) + OPEN).fetchall()
+    return [json.loads(data) for (data,) in rows]
+
+def start_journal(entry_id, payload):
+    """Mark an entry in_flight before it is sent, storing its (possibly completed) payload."""
+    conn = _db()
+    with conn:
+        conn.execute("UPDATE journal SET status = 'in_flight', payload = ?, attempts = attempts + 1 "
+                     "WHERE id = ? AND status IN (?, ?)", (json.dumps(payload), entry_id) + OPEN)
+
+def mark_journal(ids, status, error=None):
+    if not ids:
+        return
+    conn = _db()
+    with conn:
+        conn.executemany("UPDATE journal SET status = ?, error = ?, attempts = attempts + 1 "
+                         "WHERE id = ? AND status IN (?, ?)",
+                         [(status, error, i) + OPEN for i in ids])
+
+def journal_counts():
+    return dict(_db().execute("SELECT status, COUNT(*) FROM journal GROUP BY status").fetchall())
+
+def list_journal(status=None, limit=100):
+    query = "SELECT id, op, payload, created_at, status, attempts, error FROM journal"
+    args = ()
+    if status:
+        query += " WHERE status = ?"
+        args = (status,)
+    rows = _db().execute(query + " ORDER BY id DESC LIMIT ?", args + (limit,)).fetchall()
+    keys = ("id", "op", "payload", "created_at", "status", "attempts", "error")
+    return [dict(zip(keys, r), payload=json.loads(r[2])) for r in rows]
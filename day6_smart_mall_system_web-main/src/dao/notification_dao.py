@@ -1,17 +1,28 @@
 from src.config import get_supabase
+from src.deadline import execute
+from src.dao.pager import iter_table
 from datetime import date
 import streamlit as st
 def _sb():
     return get_supabase()
 
 def get_notifications(cust_id):
-    resp = _sb().table("notification").select("*").eq("cust_id", cust_id).execute()
+    resp = execute(_sb().table("notification").select("*").eq("cust_id", cust_id).eq("delivered", True), stale_ok=True)
     return resp.data or []
 
+def iter_notifications(order_by="notification_id", desc=False, limit=None):
+    return iter_table(_sb(), "notification", "notification_id", order_by, desc, limit,
+                      filters={"delivered": True})
+
 def mark_as_read(notification_id):
-    _sb().table("notification").update({"read": True}).eq("notification_id", notification_id).execute()
+    execute(_sb().table("notification").update({"read": True}).eq("notification_id", notification_id))
     return {"status": "updated"}
 
+def mark_many_as_read(notification_ids):
+    if not notification_ids:
+        return
+    execute(_sb().table("notification").update({"read": True}).in_("notification_id", list(notification_ids)))
+
 def create_notification(cust_id, msg_type, message, related_id=None, notify_date=None):
     notify_date = notify_date or str(date.today())
     payload = {
@@ -20,7 +31,27 @@ def create_notification(cust_id, msg_type, message, related_id=None, notify_date
         "message": message,
         "related_id": related_id,
         "notify_date": notify_date,
-        "read": False
+        "read": False,
+        "delivered": notify_date <= str(date.today())
     }
-    _sb().table("notification").insert(payload).execute()
-    return {"status": "inserted"}
+    resp = execute(_sb().table("notification").insert(payload))
+    return resp.data[0] if resp.data else payload
+
+def create_notifications(rows):
+    """Insert many notifications in one request (rows already carry every column)."""
+    if not rows:
+        return []
+    resp = execute(_sb().table("notification").insert(list(rows)))
+    return resp.data or []
+
+def iter_pending_notifications(end_date, after_id=None):
+    """Undelivered notifications due up to end_date, with notification_id > after_id, paged."""
+    return iter_table(_sb(), "notification", "notification_id", filters={"delivered": False},
+                      after=("notification_id", after_id) if after_id is not None else None,
+                      until=("notify_date", str(end_date)))
+
+def mark_delivered(notification_ids):
+    if not notification_ids:
+        return {"status": "skipped"}
+    execute(_sb().table("notification").update({"delivered": True}).in_("notification_id", list(notification_ids)))
+    return {"status": "updated"}
@@ -1,25 +1,40 @@
 from src.config import get_supabase
+from src.deadline import execute
+from src.dao.pager import iter_table
 import streamlit as st
 def _sb():
     return get_supabase()
 
-def create_order(cust_id, shop_id, total_amount):
+def create_order(cust_id, shop_id, total_amount, client_token=None):
     data = {"cust_id": cust_id, "shop_id": shop_id, "total_amount": total_amount}
-    resp = _sb().table("orders").insert(data).execute()
+    if client_token:
+        # unique per kiosk order, so a retried sync finds it instead of placing it again
+        data["client_token"] = client_token
+    resp = execute(_sb().table("orders").insert(data))
     return resp.data[0]
 
 def add_order_item(order_id, prod_id, quantity, price):
     data = {"order_id": order_id, "prod_id": prod_id, "quantity": quantity, "price": price}
-    _sb().table("order_items").insert(data).execute()
+    execute(_sb().table("order_items").insert(data))
 
 def update_order_total(order_id, total):
-    _sb().table("orders").update({"total_amount": total}).eq("order_id", order_id).execute()
+    execute(_sb().table("orders").update({"total_amount": total}).eq("order_id", order_id))
 
 def list_orders():
-    return _sb().table("orders").select("*").execute().data
+    return execute(_sb().table("orders").select("*"), stale_ok=True).data
 
 def get_orders_by_customer(cust_id):
-    return _sb().table("orders").select("*").eq("cust_id", cust_id).execute().data
+    return execute(_sb().table("orders").select("*").eq("cust_id", cust_id), stale_ok=True).data
+
+def get_orders_by_tokens(client_tokens):
+    """Orders already placed under any of these client tokens."""
+    if not client_tokens:
+        return []
+    return execute(_sb().table("orders").select("*").in_("client_token", list(client_tokens))).data
 
 def get_order_items(order_id):
-    return _sb().table("order_items").select("*").eq("order_id", order_id).execute().data
+    return execute(_sb().table("order_items").select("*").eq("order_id", order_id)).data
+
+def iter_orders_after(order_id=None):
+    """Orders with order_id > order_id (all when None), oldest first."""
+    return iter_table(_sb(), "orders", "order_id", after=("order_id", order_id) if order_id is not None else None)
@@ -1,19 +1,20 @@
 from src.config import get_supabase
+from src.deadline import execute
 import streamlit as st
 def _sb():
     return get_supabase()
 
 def create_order_item(order_id, prod_id, quantity, price):
     payload = {"order_id": order_id, "prod_id": prod_id, "quantity": quantity, "price": price}
-    _sb().table("order_items").insert(payload).execute()
+    execute(_sb().table("order_items").insert(payload))
     return payload
 
 def get_order_item(order_item_id):
-    resp = _sb().table("order_items").select("*").eq("order_item_id", order_item_id).limit(1).execute()
+    resp = execute(_sb().table("order_items").select("*").eq("order_item_id", order_item_id).limit(1))
     return resp.data[0] if resp.data else None
 
 def list_items_by_order(order_id):
-    resp = _sb().table("order_items").select("*").eq("order_id", order_id).execute()
+    resp = execute(_sb().table("order_items").select("*").eq("order_id", order_id))
     return resp.data or []
 
 def update_order_item(order_item_id, quantity=None, price=None):
@@ -23,9 +24,9 @@ def update_order_item(order_item_id, quantity=None, price=None):
     if price is not None:
         updates["price"] = price
     if updates:
-        _sb().table("order_items").update(updates).eq("order_item_id", order_item_id).execute()
+        execute(_sb().table("order_items").update(updates).eq("order_item_id", order_item_id))
     return get_order_item(order_item_id)
 
 def delete_order_item(order_item_id):
-    _sb().table("order_items").delete().eq("order_item_id", order_item_id).execute()
+    execute(_sb().table("order_items").delete().eq("order_item_id", order_item_id))
     return {"message": f"Order item {order_item_id} deleted"}
@@ -0,0 +1,39 @@
+# src/dao/pager.py
+"""
+Generator-backed table reads.
+
+iter_table() walks a table one page at a time with .range(), yielding rows
+as each page arrives, so callers (streamed templates, exports) never hold
+the whole table in memory. Ordering always ends with the primary key so
+offsets stay stable when sorting on a non-unique column.
+"""
+from src.deadline import execute
+
+PAGE_SIZE = 1000
+
+
+def iter_table(sb, table, pk, order_by=None, desc=False, limit=None, page_size=PAGE_SIZE, filters=None, after=None,
+               until=None):
+    """filters: {column: value} equality; after: (column, value) for column > value;
+    until: (column, value) for column <= value."""
+    remaining = limit
+    start = 0
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        query = sb.table(table).select("*")
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        if after is not None:
+            query = query.gt(*after)
+        if until is not None:
+            query = query.lte(*until)
+        if order_by and order_by != pk:
+            query = query.order(order_by, desc=desc)
+        query = query.order(pk, desc=desc if order_by in (None, pk) else False)
+        page = execute(query.range(start, start + size - 1)).data or []
+        yield from page
+        if len(page) < size:
+            return
+        start += size
+        if remaining is not None:
+            remaining -= size
@@ -1,4 +1,6 @@
 from src.config import get_supabase
+from src.deadline import execute
+from src.dao.pager import iter_table
 import streamlit as st
 def _sb():
     return get_supabase()
@@ -13,19 +15,32 @@ def create_product(prod_type, brand, color, price, stock=0, on_sale=False, sale_
         "on_sale": on_sale,
         "sale_id": sale_id
     }
-    _sb().table("product").insert(payload).execute()
-    return payload
+    resp = execute(_sb().table("product").insert(payload))
+    return resp.data[0] if resp.data else payload
 
 def list_products():
-    resp = _sb().table("product").select("*").order("prod_id").execute()
+    resp = execute(_sb().table("product").select("*").order("prod_id"), stale_ok=True)
     return resp.data or []
 
+def count_products():
+    resp = execute(_sb().table("product").select("prod_id", count="exact").limit(1), stale_ok=True)
+    return resp.count or 0
+
+def iter_products(order_by="prod_id", desc=False, limit=None):
+    return iter_table(_sb(), "product", "prod_id", order_by, desc, limit)
+
 def get_product_by_id(prod_id):
-    resp = _sb().table("product").select("*").eq("prod_id", prod_id).limit(1).execute()
+    resp = execute(_sb().table("product").select("*").eq("prod_id", prod_id).limit(1))
     return resp.data[0] if resp.data else None
 
+def get_products_by_ids(prod_ids):
+    if not prod_ids:
+        return []
+    resp = execute(_sb().table("product").select("*").in_("prod_id", list(prod_ids)))
+    return resp.data or []
+
 def update_stock(prod_id, new_stock):
-    _sb().table("product").update({"stock": new_stock}).eq("prod_id", prod_id).execute()
+    execute(_sb().table("product").update({"stock": new_stock}).eq("prod_id", prod_id))
 
 def filter_products(filters):
     query = _sb().table("product").select("*")
@@ -45,10 +60,10 @@ def filter_products(filters):
     if "on_sale" in filters:
         query = query.eq("on_sale", filters["on_sale"])
 
-    resp = query.execute()
+    resp = execute(query, stale_ok=True)
     return resp.data or []
 
 def list_products_by_sale(sale_id):
-    resp = _sb().table("product").select("*").eq("sale_id", sale_id).execute()
+    resp = execute(_sb().table("product").select("*").eq("sale_id", sale_id), stale_ok=True)
     return resp.data or []
 
@@ -1,28 +1,41 @@
-from supabase import create_client
 import os
-from src.config import SUPABASE_URL, SUPABASE_KEY
+from src.config import get_supabase
+from src.deadline import execute
+from src.dao.pager import iter_table
 import streamlit as st
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def _sb():
+    return get_supabase()
 
 
 def add_review(cust_id: int, prod_id: int, rating: float, comment: str):
     """
     Adds a new review for a product by a customer.
     """
-    response = supabase.table("reviews").insert({
+    response = execute(_sb().table("reviews").insert({
         "cust_id": cust_id,
         "prod_id": prod_id,
         "rating": rating,
         "comment": comment
-    }).execute()
+    }))
     return response.data
 
 
+def add_reviews(reviews):
+    """
+    Inserts several reviews in one request. Each item has cust_id, prod_id, rating, comment.
+    """
+    if not reviews:
+        return []
+    response = execute(_sb().table("reviews").insert(list(reviews)))
+    return response.data or []
+
+
 def get_reviews_by_product(prod_id: int):
     """
     Fetch all reviews for a specific product.
     """
-    response = supabase.table("reviews").select("*").eq("prod_id", prod_id).execute()
+    response = execute(_sb().table("reviews").select("*").eq("prod_id", prod_id), stale_ok=True)
     return response.data
 
 
@@ -30,7 +43,7 @@ def get_reviews_by_customer(cust_id: int):
     """
     Fetch all reviews written by a specific customer.
     """
-    response = supabase.table("reviews").select("*").eq("cust_id", cust_id).execute()
+    response = execute(_sb().table("reviews").select("*").eq("cust_id", cust_id), stale_ok=True)
     return response.data
 
 
@@ -44,7 +57,7 @@ def update_review(review_id: int, rating: float = None, comment: str = None):
     if comment is not None:
         update_data["comment"] = comment
 
-    response = supabase.table("reviews").update(update_data).eq("review_id", review_id).execute()
+    response = execute(_sb().table("reviews").update(update_data).eq("review_id", review_id))
     return response.data
 
 
@@ -52,16 +65,37 @@ def delete_review(review_id: int):
     """
     Delete a review by ID.
     """
-    response = supabase.table("reviews").delete().eq("review_id", review_id).execute()
+    response = execute(_sb().table("reviews").delete().eq("review_id", review_id))
     return response.data
 
 def get_reviews(prod_id=None, cust_id=None):
-    query = supabase.table("reviews").select("*").order("created_at", desc=True)
+    query = _sb().table("reviews").select("*").order("created_at", desc=True)
 
     if prod_id is not None:
         query = query.eq("prod_id", prod_id)
     if cust_id is not None:
         query = query.eq("cust_id", cust_id)
 
-    resp = query.execute()
-    return resp.data or []
\ No newline at end of file
+    resp = execute(query, stale_ok=True)
+    return resp.data or []
+
+def list_all_reviews(page_size: int = 1000):
+    """
+    Fetch every review, page by page (PostgREST caps rows per response).
+    """
+    reviews = []
+    start = 0
+    while True:
+        resp = execute(_sb().table("reviews").select("*").order("review_id").range(start, start + page_size - 1))
+        page = resp.data or []
+        reviews.extend(page)
+        if len(page) < page_size:
+            return reviews
+        start += page_size
+
+
+def iter_reviews_after(review_id=None):
+    """
+    Reviews with review_id > review_id (all when None), oldest first.
+    """
+    return iter_table(_sb(), "reviews", "review_id", after=("review_id", review_id) if review_id is not None else None)
@@ -1,17 +1,22 @@
 from src.config import get_supabase
+from src.deadline import execute
 import streamlit as st
 def _sb():
     return get_supabase()
 
 def create_sale(sale_name, discount):
     payload = {"sale_name": sale_name, "discount": discount}
-    _sb().table("sales").insert(payload).execute()
+    execute(_sb().table("sales").insert(payload))
     return payload
 
 def list_sales():
-    resp = _sb().table("sales").select("*").order("sale_id").execute()
+    resp = execute(_sb().table("sales").select("*").order("sale_id"), stale_ok=True)
     return resp.data or []
 
 def get_sale_by_id(sale_id):
-    resp = _sb().table("sales").select("*").eq("sale_id", sale_id).limit(1).execute()
+    resp = execute(_sb().table("sales").select("*").eq("sale_id", sale_id).limit(1))
     return resp.data[0] if resp.data else None
+
+def update_sale(sale_id, updates):
+    execute(_sb().table("sales").update(updates).eq("sale_id", sale_id))
+    return get_sale_by_id(sale_id)
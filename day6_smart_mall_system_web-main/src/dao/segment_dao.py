@@ -0,0 +1,24 @@
+# src/dao/segment_dao.py
+from src.config import get_supabase
+from src.deadline import execute
+from src.dao.pager import iter_table
+
+TABLE = "customer_segment"
+BATCH_SIZE = 500
+
+def _sb():
+    return get_supabase()
+
+def iter_segments():
+    return iter_table(_sb(), TABLE, "cust_id")
+
+def upsert_segments(rows):
+    """Insert or update segment rows keyed by cust_id, BATCH_SIZE per request."""
+    rows = list(rows)
+    for i in range(0, len(rows), BATCH_SIZE):
+        execute(_sb().table(TABLE).upsert(rows[i:i + BATCH_SIZE], on_conflict="cust_id"))
+    return len(rows)
+
+def customer_ids(segment):
+    """Every customer currently in `segment`, paged so max-rows cannot cut it short."""
+    return [row["cust_id"] for row in iter_table(_sb(), TABLE, "cust_id", filters={"segment": segment})]
@@ -1,17 +1,18 @@
 from src.config import get_supabase
+from src.deadline import execute
 import streamlit as st
 def _sb():
     return get_supabase()
 
 def create_shop(name,owner,location, category):
     payload = {"name": name,"owner":owner,"location":location, "category": category}
-    _sb().table("shop").insert(payload).execute()
-    return payload
+    resp = execute(_sb().table("shop").insert(payload))
+    return resp.data[0] if resp.data else payload
 
 def list_shops():
-    resp = _sb().table("shop").select("*").order("shop_id").execute()
+    resp = execute(_sb().table("shop").select("*").order("shop_id"), stale_ok=True)
     return resp.data or []
 
 def get_shop_by_id(shop_id):
-    resp = _sb().table("shop").select("*").eq("shop_id", shop_id).limit(1).execute()
+    resp = execute(_sb().table("shop").select("*").eq("shop_id", shop_id).limit(1))
     return resp.data[0] if resp.data else None
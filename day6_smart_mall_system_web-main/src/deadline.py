@@ -0,0 +1,258 @@
+# src/deadline.py
+"""
+Deadline-bounded Supabase calls.
+
+A request sets a deadline once (app.py and asgi_app.py do it in
+before_request). Every DAO call then runs through execute(), which waits
+no longer than the time left. A call with no
+request deadline still gets CALL_TIMEOUT_SECONDS.
+
+Reads (GET requests) get two extra protections:
+
+    hedging    if the first attempt has not answered after this table's
+               recent p95 latency, an identical request is sent and the
+               first response wins
+    fallback   only for calls made with stale_ok=True (listings): when the
+               deadline runs out, the last good response for the same
+               query (no older than STALE_MAX_AGE) is returned instead of
+               an error. Reads that decide something (a stock check, a
+               login, a duplicate-email check) never get a stale answer.
+
+Writes are never hedged or served stale. A write that times out raises
+DeadlineExceeded, but it may still be applied on the server.
+
+At most MAX_IN_FLIGHT calls run at once. An attempt that cannot get a
+slot within the time left fails like a timeout (no queue builds up behind
+a slow database), a hedge is only sent when a slot is free right away,
+and attempts nobody waits for any more are cancelled if they have not
+started. One that is already running holds its slot until it returns.
+
+metrics() reports call counts, how often hedging and fallback fired,
+and the per-table latency percentiles the hedge delay is based on.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+REQUEST_BUDGET_SECONDS = float(os.environ.get("DAO_REQUEST_BUDGET", "8"))
+CALL_TIMEOUT_SECONDS = float(os.environ.get("DAO_CALL_TIMEOUT", "10"))
+HEDGE_READS = os.environ.get("DAO_HEDGE_READS", "1") not in ("0", "false", "no")
+DEFAULT_HEDGE_DELAY = 0.1    # until a table has MIN_SAMPLES latencies
+MIN_HEDGE_DELAY = 0.005
+MIN_SAMPLES = 20
+LATENCY_WINDOW = 256
+STALE_ENTRIES = 256
+STALE_MAX_AGE = 600
+MAX_WORKERS = 32
+MAX_IN_FLIGHT = MAX_WORKERS
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before the database answered."""
+
+
+_deadline = contextvars.ContextVar("dao_deadline", default=None)
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="dao")
+_slots = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+_lock = threading.Lock()
+_counts = Counter()
+_latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+_stale = OrderedDict()   # query key -> (stored_at, response)
+
+
+# ----------------------------------------------------------------------
+# Deadline scope
+# ----------------------------------------------------------------------
+def start(seconds=REQUEST_BUDGET_SECONDS):
+    """Set the deadline for the current request; returns a token for clear()."""
+    return _deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+def clear(token=None):
+    if token is not None:
+        _deadline.reset(token)
+    else:
+        _deadline.set(None)
+
+
+@contextmanager
+def deadline(seconds):
+    token = start(seconds)
+    try:
+        yield
+    finally:
+        clear(token)
+
+
+def remaining():
+    """Seconds left for this call: the request's budget capped at CALL_TIMEOUT_SECONDS."""
+    end = _deadline.get()
+    if end is None:
+        return CALL_TIMEOUT_SECONDS
+    return min(end - time.monotonic(), CALL_TIMEOUT_SECONDS)
+
+
+# ----------------------------------------------------------------------
+# Bookkeeping
+# ----------------------------------------------------------------------
+def _describe(query):
+    """(table, is_read, cache key) for a postgrest request builder."""
+    cfg = getattr(query, "request", query)   # newer postgrest keeps these on .request
+    method = str(getattr(cfg, "http_method", "")).rsplit(".", 1)[-1].upper()
+    path = str(getattr(cfg, "path", ""))
+    headers = getattr(cfg, "headers", {}) or {}
+    table = path.rstrip("/").rsplit("/", 1)[-1]
+    key = (method, path, str(getattr(cfg, "params", "")), headers.get("accept"), headers.get("prefer"))
+    return table, method in ("GET", "HEAD"), key
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def hedge_delay(table):
+    with _lock:
+        samples = list(_latencies[table])
+    if len(samples) < MIN_SAMPLES:
+        return DEFAULT_HEDGE_DELAY
+    return max(_percentile(samples, 0.95), MIN_HEDGE_DELAY)
+
+
+def _observe(table, elapsed):
+    # every attempt counts, including hedged losers, so p95 sees the tail
+    with _lock:
+        _latencies[table].append(elapsed)
+
+
+def _remember(key, resp):
+    if key is None:
+        return
+    with _lock:
+        _stale[key] = (time.monotonic(), resp)
+        _stale.move_to_end(key)
+        while len(_stale) > STALE_ENTRIES:
+            _stale.popitem(last=False)
+
+
+def _fallback(table, key):
+    """Stale response for this query, or raise DeadlineExceeded."""
+    with _lock:
+        hit = _stale.get(key) if key is not None else None
+        if hit and time.monotonic() - hit[0] <= STALE_MAX_AGE:
+            _counts["stale_fallbacks"] += 1
+            return hit[1]
+        _counts["deadline_exceeded"] += 1
+    raise DeadlineExceeded(f"{table}: no response within the request deadline")
+
+
+def _count(name):
+    with _lock:
+        _counts[name] += 1
+
+
+def metrics():
+    with _lock:
+        counts = dict(_counts)
+        tables = {t: list(v) for t, v in _latencies.items() if v}
+    calls = counts.get("calls", 0)
+    return {
+        "calls": calls,
+        "reads": counts.get("reads", 0),
+        "hedged": counts.get("hedged", 0),
+        "hedge_wins": counts.get("hedge_wins", 0),
+        "stale_fallbacks": counts.get("stale_fallbacks", 0),
+        "deadline_exceeded": counts.get("deadline_exceeded", 0),
+        "errors": counts.get("errors", 0),
+        "saturated": counts.get("saturated", 0),
+        "hedge_rate": round(counts.get("hedged", 0) / calls, 4) if calls else 0.0,
+        "fallback_rate": round(counts.get("stale_fallbacks", 0) / calls, 4) if calls else 0.0,
+        "tables": {t: {"samples": len(v),
+                       "p50_ms": round(_percentile(v, 0.50) * 1000, 2),
+                       "p95_ms": round(_percentile(v, 0.95) * 1000, 2),
+                       "p99_ms": round(_percentile(v, 0.99) * 1000, 2)}
+                   for t, v in sorted(tables.items())},
+    }
+
+
+def reset_metrics():
+    with _lock:
+        _counts.clear()
+        _latencies.clear()
+
+
+# ----------------------------------------------------------------------
+# Execution
+# ----------------------------------------------------------------------
+def _timed(query, table):
+    t0 = time.monotonic()
+    resp = query.execute()
+    _observe(table, time.monotonic() - t0)
+    return resp
+
+
+def _submit(query, table, timeout):
+    """Start an attempt once a slot is free (waiting at most timeout); None if none is."""
+    if not _slots.acquire(timeout=max(timeout, 0)):
+        _count("saturated")
+        return None
+    future = _pool.submit(_timed, query, table)
+    # also runs when the future is cancelled before it started
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def execute(query, hedge=None, stale_ok=False):
+    """Run a postgrest query within the current deadline (see module docstring).
+    stale_ok=True lets a read fall back to its last good response (listings only)."""
+    table, is_read, key = _describe(query)
+    hedge = HEDGE_READS if hedge is None else hedge
+    key = key if is_read and stale_ok else None
+    _count("calls")
+    if is_read:
+        _count("reads")
+    budget = remaining()
+    if budget <= 0:
+        return _fallback(table, key)
+
+    started = time.monotonic()
+    first = _submit(query, table, budget)
+    if first is None:
+        return _fallback(table, key)
+    pending = {first}
+    error = None
+    try:
+        if is_read and hedge:
+            done, _ = wait(pending, timeout=min(hedge_delay(table), budget))
+            if not done:
+                second = _submit(query, table, 0)
+                if second is not None:
+                    _count("hedged")
+                    pending.add(second)
+        while pending:
+            left = budget - (time.monotonic() - started)
+            done, pending = wait(pending, timeout=max(left, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                resp = future.result()
+                if future is not first:
+                    _count("hedge_wins")
+                _remember(key, resp)
+                return resp
+    finally:
+        # nobody waits for these any more; drop the ones that have not started
+        for future in pending:
+            future.cancel()
+    if error is not None and not pending and (time.monotonic() - started) < budget:
+        _count("errors")
+        raise error
+    return _fallback(table, key)
+
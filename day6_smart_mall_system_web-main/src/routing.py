@@ -0,0 +1,137 @@
+# src/routing.py
+"""
+Read/write routing between the primary database and a read endpoint.
+
+Set SUPABASE_READ_URL to a read replica (or any mirror serving the same
+REST API) and every select issued through get_supabase() goes there,
+while inserts, updates, upserts and deletes go to the primary. Without
+SUPABASE_READ_URL everything stays on the primary.
+
+Replicas lag behind. A session that has just written reads from the
+primary for the next STICKY_SECONDS, so a user always sees their own
+changes (read-your-writes). The web apps bind the session with bind()
+in before_request; Streamlit binds st.session_state. Code running
+outside a session (scheduler, CLI) is sticky per thread instead.
+
+Routing happens when the query is built (`.table(...).select(...)`), so
+the DAO layer is unchanged. auth, storage and rpc always use the primary.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import Counter
+
+STICKY_SECONDS = float(os.environ.get("READ_STICKY_SECONDS", "5"))   # keep above the replica's lag
+SESSION_KEY = "_last_write_at"
+
+_session = contextvars.ContextVar("routing_session", default=None)
+_unbound_write = contextvars.ContextVar("routing_last_write", default=0.0)
+_lock = threading.Lock()
+_counts = Counter()
+
+WRITE_METHODS = ("insert", "upsert", "update", "delete")
+
+
+# ----------------------------------------------------------------------
+# Session stickiness
+# ----------------------------------------------------------------------
+def bind(store):
+    """Attach a session mapping (Flask session, st.session_state) to this request."""
+    return _session.set(store)
+
+
+def unbind(token=None):
+    if token is not None:
+        _session.reset(token)
+    else:
+        _session.set(None)
+
+
+def note_write():
+    store = _session.get()
+    if store is not None:
+        store[SESSION_KEY] = time.time()
+    else:
+        _unbound_write.set(time.time())
+
+
+def last_write():
+    store = _session.get()
+    if store is not None:
+        return store.get(SESSION_KEY) or 0.0
+    return _unbound_write.get()
+
+
+def use_primary():
+    """True while the current session's last write may not have reached the replica."""
+    return time.time() - last_write() < STICKY_SECONDS
+
+
+def _count(name):
+    with _lock:
+        _counts[name] += 1
+
+
+def metrics():
+    with _lock:
+        counts = dict(_counts)
+    reads = counts.get("replica_reads", 0) + counts.get("primary_reads", 0)
+    return {
+        "replica_reads": counts.get("replica_reads", 0),
+        "primary_reads": counts.get("primary_reads", 0),
+        "sticky_reads": counts.get("sticky_reads", 0),
+        "writes": counts.get("writes", 0),
+        "replica_share": round(counts.get("replica_reads", 0) / reads, 4) if reads else 0.0,
+    }
+
+
+def reset_metrics():
+    with _lock:
+        _counts.clear()
+
+
+# ----------------------------------------------------------------------
+# Routed client
+# ----------------------------------------------------------------------
+class RoutedClient:
+    """Wraps the primary and read clients; looks like a Supabase client to the DAOs."""
+
+    def __init__(self, primary, replica=None):
+        self.primary = primary
+        self.replica = replica
+
+    def table(self, name):
+        return _RoutedTable(self, name)
+
+    from_ = table
+
+    def read_client(self):
+        if self.replica is None:
+            _count("primary_reads")
+            return self.primary
+        if use_primary():
+            _count("primary_reads")
+            _count("sticky_reads")
+            return self.primary
+        _count("replica_reads")
+        return self.replica
+
+    def __getattr__(self, attr):
+        # auth, storage, rpc, postgrest ... stay on the primary
+        return getattr(self.primary, attr)
+
+
+class _RoutedTable:
+    def __init__(self, client, name):
+        self._client = client
+        self._name = name
+
+    def select(self, *columns, **kwargs):
+        return self._client.read_client().table(self._name).select(*columns, **kwargs)
+
+    def __getattr__(self, attr):
+        if attr in WRITE_METHODS:
+            _count("writes")
+            note_write()
+        return getattr(self._client.primary.table(self._name), attr)
@@ -0,0 +1,141 @@
+# src/serializers.py
+"""
+Serializers for API and CLI output.
+
+Rows come back from the DAOs as lists of dicts. They can be written as:
+
+    json     orjson when installed, stdlib json otherwise
+    csv      one header line, then one line per row
+    arrow    Arrow IPC stream (needs pyarrow)
+    parquet  Parquet file (needs pyarrow)
+
+The columnar formats are built from the column values in one pass. This
+avoids a per-row dict encode, so analysts can pull whole tables cheaply.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: arrow / parquet are not offered without it
+    pa = pq = None
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXTENSIONS = {"json": "json", "csv": "csv", "arrow": "arrow", "parquet": "parquet"}
+
+
+def available_formats():
+    """Formats that can be produced with the installed packages (json first)."""
+    return [f for f in MEDIA_TYPES if f in ("json", "csv") or pa is not None]
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def dumps_json(data, indent=False):
+    """Encode to JSON bytes."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=_default, option=option)
+    return json.dumps(data, default=_default, indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode()
+
+
+def _columns(rows):
+    """Column names in first-seen order across all rows."""
+    seen = {}
+    for row in rows:
+        for key in row:
+            seen.setdefault(key, None)
+    return list(seen)
+
+
+def dumps_csv(rows):
+    columns = _columns(rows)
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    # plain tuples: DictWriter re-checks every row's keys
+    writer.writerows(tuple(row.get(c) for c in columns) for row in rows)
+    return buf.getvalue().encode()
+
+
+def to_arrow(rows):
+    """Build a pyarrow Table from a list of dicts, column by column."""
+    if pa is None:
+        raise ValueError("arrow and parquet output need pyarrow (pip install pyarrow)")
+    columns = _columns(rows)
+    arrays = {}
+    for name in columns:
+        values = [row.get(name) for row in rows]
+        try:
+            arrays[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # mixed types in one column: keep it readable as text
+            arrays[name] = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+    return pa.table(arrays)
+
+
+def dumps_arrow(rows):
+    table = to_arrow(rows)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def dumps_parquet(rows):
+    table = to_arrow(rows)
+    buf = io.BytesIO()
+    pq.write_table(table, buf)
+    return buf.getvalue()
+
+
+_WRITERS = {
+    "json": dumps_json,
+    "csv": dumps_csv,
+    "arrow": dumps_arrow,
+    "parquet": dumps_parquet,
+}
+
+
+def serialize(rows, fmt="json"):
+    """Return (body bytes, media type) for rows in the given format."""
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown format '{fmt}' (choose from {', '.join(MEDIA_TYPES)})")
+    return _WRITERS[fmt](rows), MEDIA_TYPES[fmt]
+
+
+def negotiate(accept_mimetypes, requested=None):
+    """
+    Pick an output format: an explicit ?format= wins, otherwise the best
+    match for the Accept header (a werkzeug MIMEAccept), defaulting to json.
+    Returns None when nothing acceptable can be produced.
+    """
+    formats = available_formats()
+    if requested:
+        return requested if requested in formats else None
+    by_type = {MEDIA_TYPES[f]: f for f in formats}
+    best = accept_mimetypes.best_match(list(by_type), default=None) if accept_mimetypes else None
+    if best is None and accept_mimetypes and accept_mimetypes.provided:
+        return None
+    return by_type.get(best, "json")
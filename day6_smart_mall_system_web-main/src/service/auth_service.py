@@ -1,9 +1,14 @@
 # src/service/auth_service.py
-from supabase import create_client
-from src.config import SUPABASE_URL, SUPABASE_KEY
+from src.config import get_supabase
+from src.deadline import execute
+from src.service import kiosk_service
 import hashlib
+import hmac
+import os
 import streamlit as st
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def _sb():
+    return get_supabase()
 
 TABLE = "users"  # <-- updated table name
 
@@ -12,23 +17,50 @@ def signup_user(email, password, role):
     hashed_password = hashlib.sha256(password.encode()).hexdigest()
 
     # Check if user already exists
-    existing = supabase.table(TABLE).select("*").eq("email", email).execute()
+    existing = execute(_sb().table(TABLE).select("*").eq("email", email))
     if existing.data:
         raise ValueError("Email already registered")
 
     # Insert new user
-    supabase.table(TABLE).insert({
+    execute(_sb().table(TABLE).insert({
         "email": email,
         "password": hashed_password,
         "role": role
-    }).execute()
+    }))
     return {"email": email, "role": role}
 
 
 def login_user(email, password):
     hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    response = supabase.table(TABLE).select("*").eq("email", email).eq("password", hashed_password).execute()
+    if kiosk_service.enabled():
+        return _kiosk_login(email, password, hashed_password)
+    response = execute(_sb().table(TABLE).select("*").eq("email", email).eq("password", hashed_password))
     if not response.data:
         raise ValueError("Invalid email or password")
     return response.data[0]
 
+
+# What a kiosk keeps per user for offline logins: never the stored password
+# hash, only a salted PBKDF2 verifier computed on the kiosk.
+KIOSK_USER_FIELDS = ("user_id", "email", "role")
+PBKDF2_ROUNDS = 200_000
+
+def _verifier(password, salt):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ROUNDS).hex()
+
+def _kiosk_login(email, password, hashed_password):
+    def fetch():
+        response = execute(_sb().table(TABLE).select("*").eq("email", email).eq("password", hashed_password))
+        if not response.data:
+            # raised, not returned: a failed attempt must not replace the kept entry
+            raise ValueError("Invalid email or password")
+        salt = os.urandom(16)
+        user = {field: response.data[0].get(field) for field in KIOSK_USER_FIELDS}
+        return dict(user, salt=salt.hex(), verifier=_verifier(password, salt))
+
+    # online the password is checked by Supabase; offline against the kept verifier
+    kept = kiosk_service.read_through(f"user:{email}", fetch)
+    if not kept or "verifier" not in kept or not hmac.compare_digest(
+            _verifier(password, bytes.fromhex(kept["salt"])), kept["verifier"]):
+        raise ValueError("Invalid email or password")
+    return {field: kept[field] for field in KIOSK_USER_FIELDS}
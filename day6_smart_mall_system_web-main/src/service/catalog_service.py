@@ -0,0 +1,315 @@
+# src/service/catalog_service.py
+"""
+Warm-start cache of the catalog tables (product, shop, sales).
+
+Every process keeps the three tables in memory. A background thread
+writes them to a versioned on-disk snapshot: one Arrow IPC file per
+table plus a manifest.json. A new Flask worker or Streamlit process
+memory-maps the newest snapshot at startup, which takes milliseconds.
+It then catches up with a delta query for the rows whose updated_at is
+later than the snapshot's watermark, instead of refetching every table.
+
+start() only loads the snapshot; catching up with the database happens
+on the background thread, so an unreachable database does not stop the
+app from starting (reads then fetch on demand, as without the cache).
+
+Reads resync with a delta at most every SYNC_SECONDS. The fetch runs
+outside the cache lock, one per table at a time: while it runs, other
+readers get the rows already cached instead of queueing behind it.
+Writes in this process call touch(), so the next read waits for fresh
+rows. A delta cannot see deleted rows, or a transaction that commits
+after a later one with an earlier now(). A full refetch every
+FULL_REFRESH_SECONDS covers both.
+Without the updated_at column, or without pyarrow, it degrades to full
+refetches and skips the snapshots.
+
+Requires an updated_at column maintained by the database:
+    ALTER TABLE product ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+    CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+    BEGIN NEW.updated_at = now(); RETURN NEW; END $$ LANGUAGE plpgsql;
+    CREATE TRIGGER product_touch BEFORE UPDATE ON product
+        FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+    -- and the same for shop and sales
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from postgrest.exceptions import APIError
+
+from src import serializers
+from src.dao import catalog_dao
+from src.service import kiosk_service
+
+TABLES = {"product": "prod_id", "shop": "shop_id", "sales": "sale_id"}
+SNAPSHOT_DIR = os.environ.get("CATALOG_SNAPSHOT_DIR",
+                              os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                           ".snapshots", "catalog"))
+SNAPSHOT_FORMAT = 1          # bump when the on-disk layout changes; older snapshots are ignored
+SNAPSHOT_SECONDS = 300       # how often the background thread writes a snapshot
+SYNC_SECONDS = 2             # reads older than this run a delta query first
+FULL_REFRESH_SECONDS = 1800  # full refetch to drop deleted rows
+KEEP_VERSIONS = 2
+UPDATED_AT = "updated_at"
+UNDEFINED_COLUMN = "42703"   # Postgres error code when updated_at has not been added
+
+
+class CatalogCache:
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._rows = {name: {} for name in TABLES}      # table -> {pk: row}
+        self._watermarks = {name: None for name in TABLES}
+        self._synced_at = {name: 0.0 for name in TABLES}
+        self._full_at = {name: 0.0 for name in TABLES}
+        self._sorted = {name: None for name in TABLES}  # rows ordered by pk, rebuilt after changes
+        self._ready = {name: False for name in TABLES}   # rows loaded (snapshot or fetch) at least once
+        self._touches = {name: 0 for name in TABLES}     # touch() calls, to spot one during a fetch
+        self._fetching = {name: threading.Lock() for name in TABLES}  # one database fetch per table
+        self._changed = False                            # rows differ from the last snapshot
+        self._delta_ok = True
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.version = 0
+        self.loaded_from = None
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def _manifest_path(self):
+        return os.path.join(self.snapshot_dir, "manifest.json")
+
+    def load_snapshot(self):
+        """Load the newest snapshot from disk. Returns False if there is none usable."""
+        if serializers.pa is None:
+            return False
+        try:
+            with open(self._manifest_path()) as f:
+                manifest = json.load(f)
+            if manifest.get("format") != SNAPSHOT_FORMAT or set(manifest["tables"]) != set(TABLES):
+                return False
+            rows = {}
+            for name, meta in manifest["tables"].items():
+                path = os.path.join(self.snapshot_dir, meta["file"])
+                with serializers.pa.memory_map(path) as source:
+                    table = serializers.pa.ipc.open_file(source).read_all()
+                rows[name] = {row[TABLES[name]]: row for row in table.to_pylist()}
+        except (OSError, ValueError, KeyError, serializers.pa.ArrowInvalid):
+            return False
+        with self._lock:
+            self._rows = rows
+            self._watermarks = {name: meta["watermark"] for name, meta in manifest["tables"].items()}
+            self._synced_at = {name: 0.0 for name in TABLES}   # catch up on first read
+            self._full_at = {name: time.monotonic() for name in TABLES}
+            self._sorted = {name: None for name in TABLES}
+            self._ready = {name: True for name in TABLES}
+            self._changed = False
+            self.version = manifest["version"]
+            self.loaded_from = manifest["created_at"]
+        return True
+
+    def write_snapshot(self):
+        """Write the cached tables as a new snapshot version (atomic via manifest rename)."""
+        if serializers.pa is None:
+            return None
+        with self._lock:
+            tables = {name: list(rows.values()) for name, rows in self._rows.items()}
+            watermarks = dict(self._watermarks)
+            self._changed = False
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        version = self._disk_version() + 1
+        manifest = {"format": SNAPSHOT_FORMAT, "version": version,
+                    "created_at": datetime.now().isoformat(timespec="seconds"), "tables": {}}
+        for name, rows in tables.items():
+            filename = f"{name}-v{version}.arrow"
+            tmp = os.path.join(self.snapshot_dir, filename + ".tmp")
+            table = serializers.to_arrow(rows)
+            with serializers.pa.OSFile(tmp, "wb") as sink:
+                with serializers.pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp, os.path.join(self.snapshot_dir, filename))
+            manifest["tables"][name] = {"file": filename, "rows": len(rows), "watermark": watermarks[name]}
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self._manifest_path())
+        self.version = version
+        self._prune(version)
+        return version
+
+    def _disk_version(self):
+        try:
+            with open(self._manifest_path()) as f:
+                return int(json.load(f).get("version", 0))
+        except (OSError, ValueError):
+            return self.version
+
+    def _prune(self, current):
+        for filename in os.listdir(self.snapshot_dir):
+            stem, _, ext = filename.rpartition(".")
+            if ext == "arrow" and "-v" in stem:
+                try:
+                    version = int(stem.rsplit("-v", 1)[1])
+                except ValueError:
+                    continue
+                if version <= current - KEEP_VERSIONS:
+                    try:
+                        os.remove(os.path.join(self.snapshot_dir, filename))
+                    except OSError:
+                        pass
+
+    # ------------------------------------------------------------------
+    # Sync with the database
+    # ------------------------------------------------------------------
+    def _apply(self, name, rows, replace=False):
+        pk = TABLES[name]
+        current = {} if replace else self._rows[name]
+        watermark = None if replace else self._watermarks[name]
+        changed = replace
+        for row in rows:
+            # a touch() can return rows this cache already has
+            if current.get(row[pk]) != row:
+                current[row[pk]] = row
+                changed = True
+            stamp = row.get(UPDATED_AT)
+            if stamp is not None and (watermark is None or str(stamp) > str(watermark)):
+                watermark = str(stamp)
+        self._rows[name] = current
+        self._watermarks[name] = watermark
+        if changed:
+            self._sorted[name] = None
+            self._changed = True
+
+    def _fetch_changed(self, name, watermark):
+        """Delta rows, or None when this database has no updated_at column."""
+        try:
+            return catalog_dao.fetch_changed(name, TABLES[name], watermark, UPDATED_AT)
+        except APIError as e:
+            if e.code != UNDEFINED_COLUMN:
+                raise
+            self._delta_ok = False
+            return None
+
+    def _refresh_table(self, table, full=False):
+        """Fetch (without the cache lock) and apply; the caller holds self._fetching[table]."""
+        now = time.monotonic()
+        with self._lock:
+            due = full or now - self._full_at[table] > FULL_REFRESH_SECONDS
+            watermark = self._watermarks[table]
+            touches = self._touches[table]
+        changed = None
+        if not due and self._delta_ok and watermark is not None:
+            changed = self._fetch_changed(table, watermark)
+        rows = catalog_dao.fetch_all(table, TABLES[table]) if changed is None else None
+        with self._lock:
+            if changed is None:
+                self._apply(table, rows, replace=True)
+                self._full_at[table] = now
+            else:
+                self._apply(table, changed)
+            self._ready[table] = True
+            # a touch() during the fetch may not be in it: leave the table stale
+            if self._touches[table] == touches:
+                self._synced_at[table] = now
+
+    def refresh(self, name=None, full=False):
+        """Fetch changes for one table (or all), falling back to a full fetch when needed."""
+        for table in [name] if name else list(TABLES):
+            with self._fetching[table]:
+                self._refresh_table(table, full)
+
+    def touch(self, name):
+        """A row in `name` was written by this process: resync before the next read."""
+        with self._lock:
+            self._touches[name] += 1
+            self._synced_at[name] = 0.0
+
+    def _stale(self, name):
+        return time.monotonic() - self._synced_at[name] > SYNC_SECONDS
+
+    def rows(self, name):
+        """All cached rows of a catalog table, ordered by primary key."""
+        if self._stale(name):
+            # wait for a fetch in progress only if the cached rows cannot be served:
+            # nothing loaded yet, or this process wrote to the table since
+            wait = not self._ready[name] or self._synced_at[name] == 0.0
+            if self._fetching[name].acquire(blocking=wait):
+                try:
+                    if self._stale(name):
+                        self._refresh_table(name)
+                finally:
+                    self._fetching[name].release()
+        with self._lock:
+            if self._sorted[name] is None:
+                pk = TABLES[name]
+                self._sorted[name] = sorted(self._rows[name].values(), key=lambda r: r[pk])
+            return [dict(row) for row in self._sorted[name]]
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def catch_up(self, loaded):
+        """After load_snapshot() (loaded=True) fetch the delta; otherwise fetch everything."""
+        if loaded:
+            self.refresh()
+        else:
+            self.refresh(full=True)
+            self.write_snapshot()
+
+    def warm_start(self):
+        """Load the snapshot if there is one and catch up; otherwise fetch everything."""
+        self.catch_up(self.load_snapshot())
+
+    def start(self, interval=SNAPSHOT_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+        # the snapshot is local; the database is only contacted on the thread
+        loaded = self.load_snapshot()
+        self._stop.clear()
+
+        def loop():
+            try:
+                self.catch_up(loaded)
+            except Exception as e:
+                print(f"catalog warm start failed, reads will fetch on demand: {e}")
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                    if self._changed:
+                        self.write_snapshot()
+                except Exception as e:
+                    print(f"catalog snapshot failed: {e}")
+
+        self._thread = threading.Thread(target=loop, name="catalog-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_catalog = CatalogCache()
+
+
+def get_catalog():
+    return _catalog
+
+
+def start():
+    """Warm-start the catalog and begin periodic snapshots (idempotent)."""
+    if kiosk_service.enabled():
+        # kiosks read the catalog from their SQLite replica instead
+        kiosk_service.start()
+        return
+    _catalog.start()
+
+
+def list_rows(name):
+    if kiosk_service.enabled():
+        return kiosk_service.rows(name)
+    return _catalog.rows(name)
+
+
+def touch(name):
+    _catalog.touch(name)
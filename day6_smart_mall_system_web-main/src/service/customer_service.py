@@ -1,12 +1,21 @@
 from src.dao import customer_dao
+from src.service import kiosk_service
 import streamlit as st
 def create_customer(name, email, phone):
     customer = customer_dao.create_customer(name, email, phone)
     return {"message": "Customer created", "data": customer}
 
 def list_customers():
+    if kiosk_service.enabled():
+        return kiosk_service.read_through("customers", customer_dao.list_customers) or []
     return customer_dao.list_customers()
 
+def count_customers():
+    return customer_dao.count_customers()
+
+def iter_customers(order_by="cust_id", desc=False, limit=None):
+    return customer_dao.iter_customers(order_by, desc, limit)
+
 def get_customer(cust_id):
     customer = customer_dao.get_customer_by_id(cust_id)
     if not customer:
@@ -21,6 +30,5 @@ def ensure_customer_record(name, email, phone):
     return "Customer already exists"
 
 def get_customer_by_email(email):
-    resp = _sb().table("customer").select("*").eq("email", email).limit(1).execute()
-    return resp.data[0] if resp.data else None
+    return customer_dao.get_customer_by_email(email)
 
@@ -0,0 +1,343 @@
+# src/service/kiosk_service.py
+"""
+Offline-first kiosk mode (set KIOSK_MODE=1 before starting streamlit_app.py).
+
+The catalog tables (product, shop, sales) are replicated into a local
+SQLite file (src/dao/local_dao.py). Catalog reads always come from that
+replica, online or not. Reviews, orders and notification read flags are
+appended to a local journal and applied to the replica at once.
+
+The other pages a kiosk shows (login, dashboard, reviews, notifications,
+order history) read through read_through(): online, the result is stored
+locally as well; offline, the last stored copy is served. Logging in
+offline therefore works for accounts that logged in on this kiosk before.
+For those the local file keeps the id, email and role, plus a salted
+PBKDF2 verifier of the password (auth_service), never the stored hash.
+
+A background thread checks connectivity every SYNC_SECONDS. When online
+it sends the journal in batches of BATCH_SIZE:
+
+    reviews    one bulk insert per batch
+    read flags one update per batch
+    orders     live stock for every product in the batch is fetched in
+               one query. An order whose items are no longer in stock is
+               marked 'conflict' and the customer gets a notification.
+               The others are placed through order_service, which writes
+               stock relative to the live count, never the kiosk's copy.
+               The price charged is the one shown at the kiosk.
+
+It then pulls catalog changes newer than the replica's updated_at
+watermark. Reviews and read flags are delivered at least once: if the
+connection drops after Supabase accepted a batch but before the reply
+arrived, that batch is sent again. Orders are placed once: each carries a
+client_token and is marked in_flight before it is sent, and a retry that
+finds an order with its token finishes that order instead of placing a
+new one. Requires:
+    ALTER TABLE orders ADD COLUMN IF NOT EXISTS client_token TEXT UNIQUE;
+"""
+import os
+import threading
+import time
+import uuid
+
+import httpx
+
+from src.dao import catalog_dao, local_dao, notification_dao, order_dao, product_dao, review_dao
+from src.deadline import DeadlineExceeded
+
+ENABLED = os.environ.get("KIOSK_MODE", "0") in ("1", "true", "yes")
+TABLES = {"product": "prod_id", "shop": "shop_id", "sales": "sale_id"}
+SYNC_SECONDS = 15
+BATCH_SIZE = 50
+UPDATED_AT = "updated_at"
+
+# errors that mean "the network is down", not "the request was wrong"
+OFFLINE_ERRORS = (httpx.TransportError, DeadlineExceeded, OSError)
+
+_lock = threading.RLock()
+_state = {"online": None, "last_sync": None, "last_error": None}
+_cache = {}              # table -> rows decoded from the replica
+_thread = None
+_stop = threading.Event()
+
+
+def enabled():
+    return ENABLED
+
+
+def status():
+    """Connectivity and journal state for the sidebar banner."""
+    with _lock:
+        state = dict(_state)
+    state["journal"] = local_dao.journal_counts()
+    return state
+
+
+# ----------------------------------------------------------------------
+# Replica reads
+# ----------------------------------------------------------------------
+def rows(table):
+    """Catalog rows from the local replica (decoded once per change)."""
+    with _lock:
+        if table not in _cache:
+            _cache[table] = local_dao.load_rows(table)
+        return [dict(row) for row in _cache[table]]
+
+
+def get_row(table, pk):
+    return local_dao.get_row(table, pk)
+
+
+def _invalidate(table):
+    with _lock:
+        _cache.pop(table, None)
+
+
+def filter_products(filters):
+    """Same filters as product_dao.filter_products, evaluated on the replica."""
+    def contains(value, needle):
+        return needle.lower() in str(value or "").lower()
+
+    out = []
+    for prod in rows("product"):
+        if "prod_id" in filters and prod.get("prod_id") != int(filters["prod_id"]):
+            continue
+        if any(k in filters and not contains(prod.get(k), filters[k]) for k in ("prod_type", "brand", "color")):
+            continue
+        price = float(prod.get("price") or 0)
+        if "min_price" in filters and price < float(filters["min_price"]):
+            continue
+        if "max_price" in filters and price > float(filters["max_price"]):
+            continue
+        if "on_sale" in filters and bool(prod.get("on_sale")) != bool(filters["on_sale"]):
+            continue
+        out.append(prod)
+    return out
+
+
+def read_through(key, fetch):
+    """fetch() while online, keeping a local copy under key; the copy while offline."""
+    with _lock:
+        offline = _state["online"] is False
+    if not offline:
+        try:
+            value = fetch()
+        except OFFLINE_ERRORS as e:
+            with _lock:
+                _state.update(online=False, last_error=str(e))
+        else:
+            local_dao.put_cached(key, value)
+            return value
+    value, _ = local_dao.get_cached(key)
+    return value
+
+
+def queued_read_flags():
+    """Notification ids marked as read on this kiosk but not synced yet."""
+    return {payload["notification_id"] for payload in local_dao.open_payloads("mark_read")}
+
+
+# ----------------------------------------------------------------------
+# Queued writes
+# ----------------------------------------------------------------------
+def queue_review(cust_id, prod_id, rating, comment):
+    if get_row("product", prod_id) is None:
+        raise ValueError(f"❌ Product ID {prod_id} does not exist.")
+    payload = {"cust_id": cust_id, "prod_id": prod_id, "rating": rating, "comment": comment}
+    journal_id = local_dao.append_journal("review", payload)
+    return dict(payload, journal_id=journal_id, status="queued")
+
+
+def queue_mark_read(notification_id):
+    local_dao.append_journal("mark_read", {"notification_id": notification_id})
+    return {"status": "queued"}
+
+
+def queue_order(cust_id, shop_id, items):
+    """
+    Check stock against the replica, reserve it locally and queue the order.
+    Items = [{"prod_id": int, "quantity": int}]
+    """
+    from src.service import pricing_service
+
+    updated, lines, total = [], [], 0
+    with _lock:
+        for item in items:
+            prod = get_row("product", item["prod_id"])
+            if not prod:
+                raise ValueError(f"Product {item['prod_id']} not found")
+            if prod["stock"] < item["quantity"]:
+                raise ValueError(f"Insufficient stock for product {item['prod_id']}")
+            unit_price = pricing_service.effective_price(prod)
+            total += item["quantity"] * unit_price
+            lines.append({"prod_id": item["prod_id"], "quantity": item["quantity"], "price": unit_price})
+            updated.append(dict(prod, stock=prod["stock"] - item["quantity"]))
+        payload = {"cust_id": cust_id, "shop_id": shop_id, "items": lines, "client_token": uuid.uuid4().hex}
+        journal_id = local_dao.append_journal("order", payload, local_rows=("product", "prod_id", updated))
+        _invalidate("product")
+    return {"order_id": None, "journal_id": journal_id, "status": "queued", "total_amount": round(total, 2)}
+
+
+# ----------------------------------------------------------------------
+# Sync
+# ----------------------------------------------------------------------
+def _push_orders(entries):
+    """Place queued orders; reject the ones the live stock can no longer cover."""
+    from src.service import order_service
+
+    for entry in entries:
+        # entries queued before orders carried a token get one now
+        entry["payload"].setdefault("client_token", uuid.uuid4().hex)
+    # orders an interrupted sync already wrote (found by token) are finished, not placed again
+    started = {o["client_token"]: o for o in order_dao.get_orders_by_tokens(
+        [e["payload"]["client_token"] for e in entries if e["status"] == "in_flight"])}
+    prod_ids = {line["prod_id"] for e in entries for line in e["payload"]["items"]}
+    rows_by_id = {p["prod_id"]: p for p in product_dao.get_products_by_ids(prod_ids)}
+    live = {prod_id: p["stock"] for prod_id, p in rows_by_id.items()}
+    placed, conflicts = 0, []
+    for entry in entries:
+        order = entry["payload"]
+        existing = started.get(order["client_token"])
+        short = [line["prod_id"] for line in order["items"] if live.get(line["prod_id"], 0) < line["quantity"]]
+        if short and existing is None:
+            conflicts.append((entry, short))
+            continue
+        # from here until "done" a lost connection leaves the entry in_flight
+        local_dao.start_journal(entry["id"], order)
+        try:
+            order_service.place_order(
+                order["cust_id"], order["shop_id"],
+                [{"prod_id": line["prod_id"], "quantity": line["quantity"]} for line in order["items"]],
+                unit_prices={line["prod_id"]: line["price"] for line in order["items"]},
+                client_token=order["client_token"], order=existing,
+            )
+        except ValueError as e:
+            # stock went away between the check and the write
+            local_dao.mark_journal([entry["id"]], "conflict", str(e))
+            continue
+        for line in order["items"]:
+            live[line["prod_id"]] -= line["quantity"]
+        placed += 1
+        local_dao.mark_journal([entry["id"]], "done")
+    for entry, short in conflicts:
+        ids = ", ".join(str(p) for p in short)
+        notification_dao.create_notification(
+            entry["payload"]["cust_id"], "Order",
+            f"Your kiosk order could not be completed: product {ids} sold out before it synced."
+        )
+        local_dao.mark_journal([entry["id"]], "conflict", f"insufficient stock for product {ids}")
+    if conflicts:
+        # drop the local reservations of rejected orders: show the live stock again
+        local_dao.upsert_rows("product", "prod_id", [rows_by_id[p] for _, short in conflicts for p in short if p in rows_by_id])
+        _invalidate("product")
+    return {"order": placed, "conflict": len(conflicts)}
+
+
+def _push_reviews(entries):
+    """Bulk-insert queued reviews; a rejected batch is split in half until the bad rows are isolated."""
+    from src.service import review_search_service
+
+    try:
+        added = review_dao.add_reviews([e["payload"] for e in entries])
+    except OFFLINE_ERRORS:
+        raise
+    except Exception as e:
+        if len(entries) == 1:
+            local_dao.mark_journal([entries[0]["id"]], "failed", str(e))
+            return {"review": 0, "failed": 1}
+        half = len(entries) // 2
+        first, second = _push_reviews(entries[:half]), _push_reviews(entries[half:])
+        return {key: first[key] + second[key] for key in first}
+    local_dao.mark_journal([e["id"] for e in entries], "done")
+    review_search_service.on_review_added(added)
+    return {"review": len(entries), "failed": 0}
+
+
+def _push_read_flags(entries):
+    notification_dao.mark_many_as_read({e["payload"]["notification_id"] for e in entries})
+    local_dao.mark_journal([e["id"] for e in entries], "done")
+    return {"mark_read": len(entries)}
+
+
+_PUSHERS = {"review": _push_reviews, "mark_read": _push_read_flags, "order": _push_orders}
+
+
+def push_journal():
+    """Send pending (and interrupted in_flight) journal entries in batches. Returns counts per outcome."""
+    sent = {"review": 0, "mark_read": 0, "order": 0, "conflict": 0, "failed": 0}
+    while True:
+        batch = local_dao.pending_journal(BATCH_SIZE)
+        if not batch:
+            return sent
+        by_op = {}
+        for entry in batch:
+            by_op.setdefault(entry["op"], []).append(entry)
+        for op, entries in by_op.items():
+            try:
+                if op not in _PUSHERS:
+                    raise ValueError(f"unknown operation {op}")
+                for key, count in _PUSHERS[op](entries).items():
+                    sent[key] += count
+            except OFFLINE_ERRORS:
+                raise
+            except Exception as e:
+                # a rejected entry must not block the queue; keep it for inspection
+                local_dao.mark_journal([entry["id"] for entry in entries], "failed", str(e))
+                sent["failed"] += len(entries)
+
+
+def pull_replica(full=False):
+    """Bring the local catalog up to date (delta on updated_at when possible)."""
+    for table, pk in TABLES.items():
+        watermark = None if full else local_dao.get_watermark(table)
+        if watermark is None or not local_dao.has_replica(table):
+            fetched = catalog_dao.fetch_all(table, pk)
+            replace = True
+        else:
+            fetched = catalog_dao.fetch_changed(table, pk, watermark, UPDATED_AT)
+            replace = False
+        stamps = [str(r[UPDATED_AT]) for r in fetched if r.get(UPDATED_AT)]
+        newest = max(stamps + ([watermark] if watermark else []), default=None)
+        if fetched or replace:
+            local_dao.upsert_rows(table, pk, fetched, replace=replace, watermark=newest)
+            _invalidate(table)
+
+
+def sync():
+    """One round: push the journal, then pull catalog changes. Returns False when offline."""
+    try:
+        pushed = push_journal()
+        pull_replica()
+    except OFFLINE_ERRORS as e:
+        with _lock:
+            _state.update(online=False, last_error=str(e))
+        return False
+    with _lock:
+        _state.update(online=True, last_sync=time.strftime("%Y-%m-%d %H:%M:%S"), last_error=None)
+        _state["last_pushed"] = pushed
+    return True
+
+
+def start(interval=SYNC_SECONDS):
+    """Sync once (if reachable) and keep syncing in the background (idempotent)."""
+    global _thread
+    with _lock:
+        if _thread and _thread.is_alive():
+            return
+        _stop.clear()
+        _thread = threading.Thread(target=_loop, args=(interval,), name="kiosk-sync", daemon=True)
+    sync()
+    _thread.start()
+
+
+def _loop(interval):
+    while not _stop.wait(interval):
+        try:
+            sync()
+        except Exception as e:
+            with _lock:
+                _state["last_error"] = str(e)
+
+
+def stop():
+    _stop.set()
@@ -1,44 +1,80 @@
 # src/service/notification_service.py
-from supabase import create_client
 from datetime import date, datetime
-from src.config import SUPABASE_URL, SUPABASE_KEY
+from src.config import get_supabase
+from src.deadline import execute
+from src.dao import notification_dao
+from src.service import kiosk_service, scheduler_service, segmentation_service
 import streamlit as st
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def _sb():
+    return get_supabase()
 
 TABLE = "notification"
+BATCH_SIZE = 500
 
 def create_notification(cust_id, notif_type, message, notify_date):
     if isinstance(notify_date, (date, datetime)):
         notify_date = notify_date.strftime("%Y-%m-%d")
-    supabase.table(TABLE).insert({
+    resp = execute(_sb().table(TABLE).insert({
         "cust_id": cust_id,
         "type": notif_type,
         "message": message,
         "notify_date": notify_date,
-        "read": False
-    }).execute()
+        "read": False,
+        "delivered": notify_date <= str(date.today())
+    }))
+    # future-dated notifications are delivered by the scheduler
+    if resp.data:
+        scheduler_service.schedule(resp.data[0])
+
+def send_to_segment(segment, notif_type, message, notify_date):
+    """Notify every customer in an RFM segment; returns how many were sent."""
+    if isinstance(notify_date, (date, datetime)):
+        notify_date = notify_date.strftime("%Y-%m-%d")
+    delivered = notify_date <= str(date.today())
+    rows = [{"cust_id": cust_id, "type": notif_type, "message": message, "notify_date": notify_date,
+             "read": False, "delivered": delivered}
+            for cust_id in segmentation_service.customer_ids(segment)]
+    sent = 0
+    for i in range(0, len(rows), BATCH_SIZE):
+        for row in notification_dao.create_notifications(rows[i:i + BATCH_SIZE]):
+            scheduler_service.schedule(row)
+            sent += 1
+    return sent
 
 def get_notifications(cust_id):
-    resp = supabase.table(TABLE).select("*").eq("cust_id", cust_id).execute()
-    return resp.data
+    def fetch():
+        return execute(_sb().table(TABLE).select("*").eq("cust_id", cust_id).eq("delivered", True),
+                       stale_ok=True).data
+    if not kiosk_service.enabled():
+        return fetch()
+    notifications = kiosk_service.read_through(f"notifications:{cust_id}", fetch) or []
+    # read flags queued on this kiosk are not in Supabase yet
+    queued = kiosk_service.queued_read_flags()
+    return [dict(n, read=True) if n["notification_id"] in queued else n for n in notifications]
 
 # ✅ Add this function to fix your error
 def list_all_notifications():
-    resp = supabase.table(TABLE).select("*").execute()
+    resp = execute(_sb().table(TABLE).select("*").eq("delivered", True), stale_ok=True)
     return resp.data
 
+def iter_all_notifications(order_by="notification_id", desc=False, limit=None):
+    return notification_dao.iter_notifications(order_by, desc, limit)
+
 def mark_as_read(notification_id):
-    supabase.table(TABLE).update({"read": True}).eq("id", notification_id).execute()
+    if kiosk_service.enabled():
+        return kiosk_service.queue_mark_read(notification_id)
+    return notification_dao.mark_as_read(notification_id)
 
 def filter_notifications(cust_id=None, notif_type=None):
-    query = supabase.table("notification").select("*").order("notify_date", desc=True)
+    query = _sb().table("notification").select("*").eq("delivered", True).order("notify_date", desc=True)
 
     if cust_id is not None and cust_id != -1:
         query = query.eq("cust_id", cust_id)
     if notif_type:
         query = query.eq("type", notif_type)
 
-    resp = query.execute()
+    resp = execute(query, stale_ok=True)
     return resp.data or []
 
 
@@ -1,4 +1,5 @@
 from src.dao import order_dao, product_dao, notification_dao
+from src.service import catalog_service, kiosk_service, pricing_service, scheduler_service, stock_monitor_service
 from datetime import timedelta, date
 import streamlit as st
 
@@ -6,11 +7,36 @@ def create_order(cust_id: int, shop_id: int, items: list):
     """
     Create a new order for the given customer and shop.
     Items = [{"prod_id": int, "quantity": int}]
+    In kiosk mode the order is queued locally and placed on the next sync.
+    """
+    if kiosk_service.enabled():
+        return kiosk_service.queue_order(cust_id, shop_id, items)
+    return place_order(cust_id, shop_id, items)
+
+
+def place_order(cust_id: int, shop_id: int, items: list, unit_prices=None, client_token=None, order=None):
+    """
+    Write the order to Supabase. unit_prices ({prod_id: price}) overrides the
+    current effective price, e.g. the price a kiosk quoted while offline.
+    client_token is stored on the order so a retry can find it; pass the
+    order found that way as `order` to finish it instead of starting over.
     """
     total_amount = 0
-    order = order_dao.create_order(cust_id, shop_id, total_amount)
+    resumed = order is not None
+    if resumed:
+        written = {item["prod_id"]: item for item in order_dao.get_order_items(order["order_id"])}
+    else:
+        written = {}
+        order = order_dao.create_order(cust_id, shop_id, total_amount, client_token=client_token)
 
     for item in items:
+        if item["prod_id"] in written:
+            # written by the interrupted attempt. Its stock write may have been lost with
+            # the connection; the count is then left high rather than taken twice
+            done = written[item["prod_id"]]
+            total_amount += done["quantity"] * done["price"]
+            continue
+
         prod = product_dao.get_product_by_id(item["prod_id"])
         if not prod:
             raise ValueError(f"Product {item['prod_id']} not found")
@@ -18,13 +44,24 @@ def create_order(cust_id: int, shop_id: int, items: list):
         if prod["stock"] < item["quantity"]:
             raise ValueError(f"Insufficient stock for product {item['prod_id']}")
 
-        total_amount += item["quantity"] * prod["price"]
+        # charge the sale price when the product is on sale
+        if unit_prices and item["prod_id"] in unit_prices:
+            unit_price = unit_prices[item["prod_id"]]
+        else:
+            unit_price = pricing_service.effective_price(prod)
+        total_amount += item["quantity"] * unit_price
+
+        # add to order_items first: a retry that finds the item does not take the stock twice
+        order_dao.add_order_item(order["order_id"], item["prod_id"], item["quantity"], unit_price)
 
         # update stock
         product_dao.update_stock(item["prod_id"], prod["stock"] - item["quantity"])
+        catalog_service.touch("product")
+        stock_monitor_service.record_stock(item["prod_id"], prod["stock"] - item["quantity"], sold=item["quantity"])
 
-        # add to order_items
-        order_dao.add_order_item(order["order_id"], item["prod_id"], item["quantity"], prod["price"])
+    if resumed and order.get("total_amount"):
+        # the interrupted attempt got as far as the total, and the notifications
+        return order
 
     # Update total amount
     order_dao.update_order_total(order["order_id"], total_amount)
@@ -37,9 +74,10 @@ def create_order(cust_id: int, shop_id: int, items: list):
     # Pre-date reminder if return_due_date exists
     if order.get("return_due_date"):
         reminder_date = date.fromisoformat(order["return_due_date"]) - timedelta(days=1)
-        notification_dao.create_notification(
+        reminder = notification_dao.create_notification(
             cust_id, "Reminder", f"Return due soon for Order {order['order_id']}", notify_date=str(reminder_date)
         )
+        scheduler_service.schedule(reminder)
 
     return order
 
@@ -53,6 +91,12 @@ def get_order_history(cust_id: int):
     """
     Returns order history for a given customer, including product and order details.
     """
+    if kiosk_service.enabled():
+        return kiosk_service.read_through(f"order_history:{cust_id}", lambda: _order_history(cust_id)) or []
+    return _order_history(cust_id)
+
+
+def _order_history(cust_id):
     orders = order_dao.get_orders_by_customer(cust_id)
     history = []
 
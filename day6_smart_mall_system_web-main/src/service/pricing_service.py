@@ -0,0 +1,142 @@
+# src/service/pricing_service.py
+"""
+Effective (discounted) prices for the whole catalog.
+
+Products carry on_sale / sale_id and sales carry a discount percentage.
+The price table joins the two in one vectorized pandas pass:
+
+    effective_price = price * (1 - discount / 100)   if on_sale and the sale exists
+                    = price                          otherwise
+
+The table is cached under (catalog_version, sales_version). Writes that
+change prices bump the matching version: a new product forces a full
+rebuild, a changed sale only recomputes the products linked to it.
+Checkout, product search and the sales page all read from this table.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.dao import sales_dao
+from src.service import catalog_service
+
+MAX_AGE_SECONDS = 300   # other workers may have written; rebuild at least this often
+
+_lock = threading.RLock()
+_catalog_version = 0
+_sales_version = 0
+_dirty_sales = set()
+_cache = {"key": None, "table": None, "built_at": 0.0}
+
+
+def bump_catalog_version():
+    """Products were added or repriced: rebuild the whole table on next read."""
+    global _catalog_version
+    with _lock:
+        _catalog_version += 1
+
+
+def bump_sales_version(sale_id=None):
+    """A sale changed. With a sale_id only its products are recomputed."""
+    global _sales_version
+    with _lock:
+        _sales_version += 1
+        _dirty_sales.add(sale_id)
+
+
+def _price_after(price, discount):
+    # same rounding as the vectorized path (numpy round-half-even)
+    return float(np.round(float(price) * (1 - discount / 100), 2))
+
+
+def _apply_discount(table):
+    active = table["on_sale"].fillna(False).astype(bool) & table["discount"].notna()
+    discount = table["discount"].where(active, 0.0).clip(0, 100)
+    table["discount"] = discount
+    table["effective_price"] = (table["price"] * (1 - discount / 100)).round(2)
+    return table
+
+
+def compute_price_table(products, sales):
+    """Join products to sales and compute every effective price at once."""
+    prods = pd.DataFrame(products, columns=["prod_id", "price", "on_sale", "sale_id"])
+    sale_df = pd.DataFrame(sales, columns=["sale_id", "discount"])
+    prods["sale_id"] = pd.to_numeric(prods["sale_id"], errors="coerce").astype("Int64")
+    prods["price"] = pd.to_numeric(prods["price"], errors="coerce").astype(float)
+    sale_df["sale_id"] = pd.to_numeric(sale_df["sale_id"], errors="coerce").astype("Int64")
+    sale_df["discount"] = pd.to_numeric(sale_df["discount"], errors="coerce").astype(float)
+
+    table = prods.merge(sale_df, on="sale_id", how="left")
+    return _apply_discount(table).set_index("prod_id")
+
+
+def _refresh_sales(table, sale_ids):
+    """Recompute only the rows linked to the given sales."""
+    for sale_id in sale_ids:
+        sale = sales_dao.get_sale_by_id(sale_id)
+        mask = (table["sale_id"] == sale_id).fillna(False).to_numpy()
+        if not mask.any():
+            continue
+        rows = table.loc[mask].copy()
+        rows["discount"] = float(sale["discount"]) if sale and sale.get("discount") is not None else np.nan
+        table.loc[mask, ["discount", "effective_price"]] = _apply_discount(rows)[["discount", "effective_price"]]
+    return table
+
+
+def get_price_table():
+    """Return the cached price table (indexed by prod_id), rebuilding as needed."""
+    with _lock:
+        key = (_catalog_version, _sales_version)
+        table = _cache["table"]
+        fresh = time.monotonic() - _cache["built_at"] < MAX_AGE_SECONDS
+        if table is not None and _cache["key"] == key and fresh:
+            return table
+
+        stale_catalog = _cache["key"] is None or _cache["key"][0] != _catalog_version
+        if table is None or stale_catalog or not fresh or None in _dirty_sales:
+            table = compute_price_table(catalog_service.list_rows("product"), catalog_service.list_rows("sales"))
+            _cache["built_at"] = time.monotonic()
+        else:
+            table = _refresh_sales(table.copy(), set(_dirty_sales))
+
+        _dirty_sales.clear()
+        _cache["key"] = key
+        _cache["table"] = table
+        return table
+
+
+def _uncached(prod):
+    """Discount for a product the cached table does not describe correctly."""
+    if prod.get("on_sale") and prod.get("sale_id"):
+        sale = sales_dao.get_sale_by_id(prod["sale_id"])
+        return min(max(float(sale["discount"]), 0.0), 100.0) if sale else 0.0
+    return 0.0
+
+
+def _discount_for(prod, table):
+    prod_id = prod.get("prod_id")
+    if prod_id in table.index:
+        row = table.loc[prod_id]
+        cached_sale = None if pd.isna(row["sale_id"]) else int(row["sale_id"])
+        if bool(row["on_sale"]) == bool(prod.get("on_sale")) and cached_sale == prod.get("sale_id"):
+            return float(row["discount"])
+    # not in the cached catalog yet (e.g. created by another worker) or its sale changed
+    return _uncached(prod)
+
+
+def effective_price(prod):
+    """Effective price for a product row (as returned by product_dao)."""
+    return _price_after(prod["price"], _discount_for(prod, get_price_table()))
+
+
+def annotate(products):
+    """Add discount and effective_price to each product dict (in place)."""
+    if not products:
+        return products
+    table = get_price_table()
+    for prod in products:
+        prod["discount"] = _discount_for(prod, table)
+        prod["effective_price"] = _price_after(prod["price"], prod["discount"])
+    return products
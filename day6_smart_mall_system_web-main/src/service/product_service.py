@@ -1,7 +1,12 @@
 from src.dao import product_dao, sales_dao, notification_dao
+from src.service import catalog_service, kiosk_service, pricing_service, stock_monitor_service
 import streamlit as st
 def create_product(prod_type, brand, color, price, stock=0, on_sale=False, sale_id=None):
     product = product_dao.create_product(prod_type, brand, color, price, stock, on_sale, sale_id)
+    catalog_service.touch("product")
+    pricing_service.bump_catalog_version()
+    if product.get("prod_id") is not None:
+        stock_monitor_service.record_stock(product["prod_id"], stock)
 
     if on_sale and sale_id:
         sale = sales_dao.get_sale_by_id(sale_id)
@@ -14,7 +19,13 @@ def create_product(prod_type, brand, color, price, stock=0, on_sale=False, sale_
     return product
 
 def list_products():
-    return product_dao.list_products()
+    return catalog_service.list_rows("product")
+
+def count_products():
+    return product_dao.count_products()
+
+def iter_products(order_by="prod_id", desc=False, limit=None):
+    return product_dao.iter_products(order_by, desc, limit)
 
 def get_product(prod_id):
     prod = product_dao.get_product_by_id(prod_id)
@@ -24,7 +35,11 @@ def get_product(prod_id):
 
 def update_stock(prod_id, new_stock):
     product_dao.update_stock(prod_id, new_stock)
+    catalog_service.touch("product")
+    stock_monitor_service.record_stock(prod_id, new_stock)
     return {"message": f"Stock updated for Product {prod_id}"}
 
 def filter_products(filters):
-    return product_dao.filter_products(filters)
+    if kiosk_service.enabled():
+        return pricing_service.annotate(kiosk_service.filter_products(filters))
+    return pricing_service.annotate(product_dao.filter_products(filters))
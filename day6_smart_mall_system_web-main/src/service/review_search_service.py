@@ -0,0 +1,206 @@
+# src/service/review_search_service.py
+"""
+Full-text search over review comments.
+
+An inverted index (term -> {review_id: term frequency}) is built once from
+the reviews table and then kept up to date by review_service on every
+add / update / delete, so queries never scan the table. Results are
+ranked with BM25 and can be filtered by product, rating range and
+created_at date range.
+
+Reviews written by other processes (Streamlit, other workers, a kiosk
+sync) are picked up by a delta query for review_id > the highest id
+indexed, at most every SYNC_SECONDS. Edits and deletes made elsewhere,
+and a lower id committing after a higher one, are covered by a full
+rebuild every FULL_REBUILD_SECONDS. One search runs the fetch while the
+others keep using the current index.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+from src.dao import review_dao
+
+K1 = 1.5
+B = 0.75
+SYNC_SECONDS = 5
+FULL_REBUILD_SECONDS = 1800
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in",
+    "is", "it", "of", "on", "or", "so", "that", "the", "this", "to", "was",
+    "were", "with", "very", "i", "my", "me", "we",
+}
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+class ReviewSearchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._syncing = threading.Lock()   # one database fetch at a time
+        self._reset()
+        self.loaded = False
+        self.synced_at = 0.0
+        self.built_at = 0.0
+
+    def _reset(self):
+        self._postings = {}     # term -> {review_id: tf}
+        self._doc_terms = {}    # review_id -> Counter of terms
+        self._doc_len = {}      # review_id -> token count
+        self._docs = {}         # review_id -> review row (without re-fetching)
+        self._total_len = 0
+        self.max_id = None      # highest review_id indexed, for the delta query
+
+    def __len__(self):
+        return len(self._docs)
+
+    def build(self, reviews):
+        with self._lock:
+            self._reset()
+            for review in reviews:
+                self.add(review)
+            self.loaded = True
+            self.synced_at = self.built_at = time.monotonic()
+
+    def catch_up(self, reviews):
+        """Index reviews added since the last sync (fetched before taking the lock)."""
+        with self._lock:
+            for review in reviews:
+                self.add(review)
+            self.synced_at = time.monotonic()
+
+    def add(self, review):
+        """Index a review row (replaces any previous version)."""
+        review_id = review.get("review_id")
+        if review_id is None:
+            return
+        with self._lock:
+            if review_id in self._docs:
+                self.remove(review_id)
+            terms = Counter(tokenize(review.get("comment")))
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[review_id] = tf
+            self._doc_terms[review_id] = terms
+            self._doc_len[review_id] = sum(terms.values())
+            self._total_len += self._doc_len[review_id]
+            self._docs[review_id] = review
+            if self.max_id is None or int(review_id) > self.max_id:
+                self.max_id = int(review_id)
+
+    def update(self, review):
+        """Merge changed fields into the indexed row and re-index it."""
+        review_id = review.get("review_id")
+        with self._lock:
+            merged = dict(self._docs.get(review_id, {}))
+            merged.update(review)
+            self.add(merged)
+
+    def remove(self, review_id):
+        with self._lock:
+            terms = self._doc_terms.pop(review_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(review_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_len -= self._doc_len.pop(review_id)
+            self._docs.pop(review_id, None)
+
+    def _matches(self, review, prod_id, min_rating, max_rating, date_from, date_to):
+        if prod_id is not None and str(review.get("prod_id")) != str(prod_id):
+            return False
+        rating = review.get("rating")
+        if min_rating is not None and (rating is None or float(rating) < float(min_rating)):
+            return False
+        if max_rating is not None and (rating is None or float(rating) > float(max_rating)):
+            return False
+        created = str(review.get("created_at") or "")[:10]
+        if date_from and created < str(date_from):
+            return False
+        if date_to and created > str(date_to):
+            return False
+        return True
+
+    def search(self, query, prod_id=None, min_rating=None, max_rating=None,
+               date_from=None, date_to=None, limit=20):
+        """Return [(score, review)] best-first for the query terms."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avg_len = self._total_len / n_docs or 1.0
+            scores = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for review_id, tf in postings.items():
+                    norm = tf + K1 * (1 - B + B * self._doc_len[review_id] / avg_len)
+                    scores[review_id] = scores.get(review_id, 0.0) + idf * tf * (K1 + 1) / norm
+
+            ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+            results = []
+            for review_id, score in ranked:
+                review = self._docs[review_id]
+                if self._matches(review, prod_id, min_rating, max_rating, date_from, date_to):
+                    results.append((score, review))
+                    if len(results) >= limit:
+                        break
+            return results
+
+
+_index = ReviewSearchIndex()
+
+
+def get_index():
+    """Return the process-wide index, building it on first use and syncing it
+    with the reviews table at most every SYNC_SECONDS after that."""
+    if not _index.loaded:
+        with _index._lock:
+            if not _index.loaded:
+                _index.build(review_dao.list_all_reviews())
+        return _index
+    now = time.monotonic()
+    if now - _index.synced_at > SYNC_SECONDS and _index._syncing.acquire(blocking=False):
+        try:
+            if now - _index.built_at > FULL_REBUILD_SECONDS:
+                _index.build(review_dao.list_all_reviews())
+            else:
+                _index.catch_up(list(review_dao.iter_reviews_after(_index.max_id)))
+        finally:
+            _index._syncing.release()
+    return _index
+
+
+def on_review_added(rows):
+    if _index.loaded:
+        for row in rows or []:
+            _index.add(row)
+
+
+def on_review_updated(rows):
+    if _index.loaded:
+        for row in rows or []:
+            _index.update(row)
+
+
+def on_review_deleted(review_id):
+    if _index.loaded:
+        _index.remove(review_id)
+
+
+def search_reviews(query, prod_id=None, min_rating=None, max_rating=None,
+                   date_from=None, date_to=None, limit=20):
+    results = get_index().search(query, prod_id, min_rating, max_rating, date_from, date_to, limit)
+    return [dict(review, score=round(score, 3)) for score, review in results]
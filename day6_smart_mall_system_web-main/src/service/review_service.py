@@ -1,11 +1,17 @@
 from src.dao import review_dao,product_dao
+from src.service import kiosk_service, review_search_service
 import streamlit as st
 def create_review(cust_id, prod_id, rating, comment):
+    if kiosk_service.enabled():
+        # queued locally, sent on the next sync
+        return {"message": "Review saved, it will be posted when the kiosk is back online",
+                "data": kiosk_service.queue_review(cust_id, prod_id, rating, comment)}
     product = product_dao.get_product_by_id(prod_id)
     if not product:
         raise ValueError(f"❌ Product ID {prod_id} does not exist.")
     # then insert the review
     result = review_dao.add_review(cust_id, prod_id, rating, comment)
+    review_search_service.on_review_added(result)
     return {"message": "Review added successfully", "data": result}
 
 def view_reviews_for_product(prod_id: int):
@@ -33,6 +39,7 @@ def modify_review(review_id: int, rating: float = None, comment: str = None):
     Updates review details.
     """
     result = review_dao.update_review(review_id, rating, comment)
+    review_search_service.on_review_updated(result)
     return {"message": "Review updated successfully", "data": result}
 
 
@@ -41,8 +48,17 @@ def remove_review(review_id: int):
     Deletes a review.
     """
     review_dao.delete_review(review_id)
+    review_search_service.on_review_deleted(review_id)
     return {"message": "Review deleted successfully"}
 
 def get_reviews(prod_id=None, cust_id=None):
+    if kiosk_service.enabled():
+        return kiosk_service.read_through(f"reviews:{prod_id}:{cust_id}",
+                                          lambda: review_dao.get_reviews(prod_id, cust_id)) or []
     return review_dao.get_reviews(prod_id, cust_id)
 
+def search_reviews(query, prod_id=None, min_rating=None, max_rating=None, date_from=None, date_to=None, limit=20):
+    """
+    Ranked full-text search over review comments.
+    """
+    return review_search_service.search_reviews(query, prod_id, min_rating, max_rating, date_from, date_to, limit)
@@ -1,4 +1,5 @@
-from src.dao import sales_dao, notification_dao ,product_dao
+from src.dao import sales_dao, notification_dao
+from src.service import catalog_service, pricing_service
 import streamlit as st
 def create_sale(sale_name, discount):
     """
@@ -16,10 +17,13 @@ def create_sale(sale_name, discount):
     # Convert discount to float safely
     discount = float(discount)
 
-    return sales_dao.create_sale(sale_name, discount)
+    sale = sales_dao.create_sale(sale_name, discount)
+    catalog_service.touch("sales")
+    pricing_service.bump_sales_version()
+    return sale
 
 def list_sales():
-    return sales_dao.list_sales()
+    return catalog_service.list_rows("sales")
 
 def get_sale(sale_id):
     sale = sales_dao.get_sale_by_id(sale_id)
@@ -27,14 +31,34 @@ def get_sale(sale_id):
         raise ValueError("Sale not found")
     return sale
 
+def update_sale(sale_id, sale_name=None, discount=None):
+    """
+    Rename a sale or change its discount. Only the products linked to
+    this sale are repriced.
+    """
+    updates = {}
+    if sale_name:
+        updates["sale_name"] = sale_name
+    if discount is not None and discount != "":
+        updates["discount"] = float(discount)
+    if not updates:
+        return get_sale(sale_id)
+    sale = sales_dao.update_sale(sale_id, updates)
+    catalog_service.touch("sales")
+    pricing_service.bump_sales_version(sale_id)
+    return sale
+
 def list_sales_with_products():
     """
     Returns a list of sales, each with an array of products under that sale.
     """
-    sales = sales_dao.list_sales()  # Get all sales
+    sales = catalog_service.list_rows("sales")  # Get all sales
+    by_sale = {}
+    for prod in catalog_service.list_rows("product"):
+        by_sale.setdefault(prod.get("sale_id"), []).append(prod)
     for sale in sales:
-        # Fetch products linked to this sale_id
-        products = product_dao.list_products_by_sale(sale["sale_id"])
-        sale["products"] = products  # Add product list to sale dict
+        # Products linked to this sale_id
+        products = by_sale.get(sale["sale_id"], [])
+        sale["products"] = pricing_service.annotate(products)  # Add product list (with sale prices) to sale dict
 
     return sales
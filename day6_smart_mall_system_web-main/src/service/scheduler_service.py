@@ -0,0 +1,182 @@
+# src/service/scheduler_service.py
+"""
+Delivers future-dated notifications (return reminders, admin scheduled
+messages) when their notify_date arrives.
+
+Pending notifications are kept in a min-heap ordered by notify_date, so
+scheduling a new one is O(log n) and the due ones are popped from the
+heap. Due entries are marked delivered in batches.
+
+The heap holds the undelivered rows due up to today + WINDOW_DAYS,
+including rows that were due while no scheduler ran (they are delivered
+late rather than never). It is loaded in pages, so the PostgREST max-rows
+cap cannot cut it short. Each tick then reads only the undelivered rows
+with a notification_id above the highest one loaded, which picks up rows
+inserted by another worker, the Streamlit app or the CLI. A full reload
+runs when the date changes and every RELOAD_SECONDS. It moves the window
+and drops rows delivered elsewhere. It also catches an id that committed
+after a higher one.
+
+Requires a `delivered` column on the notification table. The UPDATE marks
+the existing rows that are already due as delivered, so they stay visible:
+    ALTER TABLE notification ADD COLUMN IF NOT EXISTS delivered BOOLEAN DEFAULT FALSE;
+    UPDATE notification SET delivered = notify_date <= current_date;
+"""
+import heapq
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from src.dao import notification_dao
+
+WINDOW_DAYS = 30
+BATCH_SIZE = 100
+POLL_SECONDS = 60
+RELOAD_SECONDS = 3600
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class NotificationScheduler:
+    def __init__(self, window_days=WINDOW_DAYS, batch_size=BATCH_SIZE):
+        self.window_days = window_days
+        self.batch_size = batch_size
+        self._heap = []          # (notify_date, notification_id)
+        self._queued = set()     # ids currently in the heap
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.loaded_until = None
+        self.loaded_on = None    # date of the last full load
+        self.loaded_at = 0.0     # monotonic time of the last full load
+        self.last_id = None      # highest notification_id read from the table
+
+    def load(self, today=None):
+        """(Re)load the undelivered notifications due up to today + window_days."""
+        today = today or date.today()
+        end = today + timedelta(days=self.window_days)
+        rows = list(notification_dao.iter_pending_notifications(end))
+        with self._lock:
+            self._heap = []
+            self._queued = set()
+            for row in rows:
+                self._queued.add(row["notification_id"])
+                self._heap.append((_to_date(row["notify_date"]), row["notification_id"]))
+            heapq.heapify(self._heap)
+            self.loaded_until = end
+            self.loaded_on = today
+            self.loaded_at = time.monotonic()
+            self.last_id = max((row["notification_id"] for row in rows), default=None)
+        return len(rows)
+
+    def catch_up(self):
+        """Queue the undelivered rows inserted since the last read (notification_id > last_id)."""
+        rows = list(notification_dao.iter_pending_notifications(self.loaded_until, after_id=self.last_id))
+        with self._lock:
+            for row in rows:
+                if row["notification_id"] not in self._queued:
+                    self._queued.add(row["notification_id"])
+                    heapq.heappush(self._heap, (_to_date(row["notify_date"]), row["notification_id"]))
+                if self.last_id is None or row["notification_id"] > self.last_id:
+                    self.last_id = row["notification_id"]
+        return len(rows)
+
+    def schedule(self, notification):
+        """Queue a freshly inserted notification row. O(log n)."""
+        if not notification or notification.get("delivered") or "notification_id" not in notification:
+            return False
+        notify_date = _to_date(notification["notify_date"])
+        with self._lock:
+            # Beyond the loaded window: the next reload will pick it up.
+            if self.loaded_until is None or notify_date > self.loaded_until:
+                return False
+            if notification["notification_id"] in self._queued:
+                return False
+            self._queued.add(notification["notification_id"])
+            heapq.heappush(self._heap, (notify_date, notification["notification_id"]))
+        return True
+
+    def pending(self):
+        with self._lock:
+            return len(self._heap)
+
+    def pop_due(self, today=None):
+        """Pop at most batch_size notification ids whose date has arrived."""
+        today = today or date.today()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= today and len(due) < self.batch_size:
+                _, notification_id = heapq.heappop(self._heap)
+                self._queued.discard(notification_id)
+                due.append(notification_id)
+        return due
+
+    def deliver_due(self, today=None):
+        """Mark every due notification delivered, one batch per update call."""
+        today = today or date.today()
+        if self.loaded_on != today or time.monotonic() - self.loaded_at > RELOAD_SECONDS:
+            self.load(today)
+        else:
+            # rows other processes inserted since the last tick are in the table only
+            self.catch_up()
+
+        delivered = 0
+        while True:
+            batch = self.pop_due(today)
+            if not batch:
+                break
+            try:
+                notification_dao.mark_delivered(batch)
+            except Exception:
+                # Put the batch back so the next tick retries it.
+                with self._lock:
+                    for notification_id in batch:
+                        if notification_id not in self._queued:
+                            self._queued.add(notification_id)
+                            heapq.heappush(self._heap, (today, notification_id))
+                raise
+            delivered += len(batch)
+        return delivered
+
+    def _run(self, interval):
+        while not self._stop.is_set():
+            try:
+                self.deliver_due()
+            except Exception as e:
+                print(f"⚠️  Notification scheduler tick failed: {e}")
+            self._stop.wait(interval)
+
+    def start(self, interval=POLL_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+
+_scheduler = NotificationScheduler()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler instance."""
+    return _scheduler
+
+
+def schedule(notification):
+    return _scheduler.schedule(notification)
+
+
+def start(interval=POLL_SECONDS):
+    _scheduler.start(interval)
@@ -0,0 +1,303 @@
+# src/service/segmentation_service.py
+"""
+RFM (recency, frequency, monetary) customer segments.
+
+Per customer the engine keeps running aggregates:
+
+    last_order_date, frequency (orders), monetary (total spent),
+    review_count, rating_sum
+
+A refresh reads only the orders, reviews and customers added since the
+previous run (id watermarks) and folds them into the aggregates with one
+groupby each. Then it scores every customer in one vectorized pass:
+
+    r_score / f_score / m_score   quintiles 1-5 among customers with orders
+                                  (5 = most recent / most orders / most spent)
+    segment                       label from the scores (SEGMENT_RULES),
+                                  "Prospect" for customers with no orders
+
+Orders are counted in order_id order and the watermark stops at the first
+one that is not settled yet:
+    - an order still at total_amount 0 (inserted, not priced yet), or
+    - an order after a gap in the ids (a lower id may still commit),
+until it has been seen for SETTLE_SECONDS. Orders after it are re-read on
+the next run. An order still at 0 after that was abandoned and is skipped.
+
+Results are upserted into the customer_segment table (only rows whose
+scores or segment changed), so targeting a segment is a single query:
+    SELECT cust_id FROM customer_segment WHERE segment = 'At Risk'
+
+The table also holds the aggregates and watermarks, so any process can
+resume incrementally after a restart:
+    CREATE TABLE IF NOT EXISTS customer_segment (
+        cust_id BIGINT PRIMARY KEY REFERENCES customer (cust_id),
+        last_order_date DATE, frequency INT, monetary NUMERIC,
+        last_order_id BIGINT, review_count INT, rating_sum NUMERIC, last_review_id BIGINT,
+        recency_days INT, r_score SMALLINT, f_score SMALLINT, m_score SMALLINT,
+        rfm TEXT, segment TEXT, computed_at TIMESTAMPTZ
+    );
+    CREATE INDEX IF NOT EXISTS customer_segment_segment ON customer_segment (segment);
+"""
+import threading
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from src.dao import customer_dao, order_dao, review_dao, segment_dao
+
+REFRESH_SECONDS = 900
+SETTLE_SECONDS = 120         # how long an unpriced order or an id gap holds the watermark
+PROSPECT = "Prospect"
+
+# first matching rule wins; r/f/m are the 1-5 scores
+SEGMENT_RULES = [
+    ("Champions",       lambda r, f, m: (r >= 4) & (f >= 4) & (m >= 4)),
+    ("Loyal",           lambda r, f, m: (r >= 3) & (f >= 4)),
+    ("Big Spenders",    lambda r, f, m: (r >= 3) & (m >= 4)),
+    ("New",             lambda r, f, m: (r >= 4) & (f <= 2)),
+    ("Promising",       lambda r, f, m: r >= 3),
+    ("Can't Lose Them", lambda r, f, m: (r <= 2) & (f >= 4) & (m >= 4)),
+    ("At Risk",         lambda r, f, m: (r <= 2) & (f >= 3)),
+    ("Hibernating",     lambda r, f, m: r == 2),
+    ("Lost",            lambda r, f, m: r <= 1),
+]
+SEGMENTS = [name for name, _ in SEGMENT_RULES] + [PROSPECT]
+
+AGGREGATES = ["last_order_date", "frequency", "monetary", "last_order_id",
+              "review_count", "rating_sum", "last_review_id"]
+SCORES = ["recency_days", "r_score", "f_score", "m_score", "rfm", "segment"]
+
+
+def _empty():
+    frame = pd.DataFrame(columns=AGGREGATES + SCORES, index=pd.Index([], name="cust_id", dtype="int64"))
+    return frame.astype({"frequency": "int64", "monetary": "float64", "review_count": "int64",
+                         "rating_sum": "float64", "last_order_date": "datetime64[ns]"})
+
+
+def _quintile(values, ascending=True):
+    """Scores 1-5 by percentile rank; ties share a score."""
+    pct = values.rank(method="average", pct=True, ascending=ascending)
+    return np.ceil(pct * 5).clip(1, 5).astype("int64")
+
+
+def _differs(new, old):
+    """Elementwise new != old, with two missing values counting as equal."""
+    return ~((new == old) | (new.isna() & old.isna()))
+
+
+def _max_id(series):
+    return int(series.max()) if series.notna().any() else None
+
+
+class SegmentEngine:
+    def __init__(self):
+        self.frame = None            # cust_id -> aggregates + scores
+        self._persisted = None       # scores as last written, to upsert only changes
+        self._seen = {}              # order_id -> monotonic time first read, past the watermark
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.computed_at = None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def load(self):
+        """Resume from the customer_segment table (empty on the first run)."""
+        rows = list(segment_dao.iter_segments())
+        frame = _empty()
+        if rows:
+            loaded = pd.DataFrame(rows).set_index("cust_id")
+            loaded["last_order_date"] = pd.to_datetime(loaded["last_order_date"])
+            frame = loaded.reindex(columns=AGGREGATES + SCORES)
+            for column in ("frequency", "review_count"):
+                frame[column] = frame[column].fillna(0).astype("int64")
+            for column in ("monetary", "rating_sum"):
+                frame[column] = frame[column].fillna(0.0).astype("float64")
+        self.frame = frame
+        self._persisted = frame[SCORES].copy()
+
+    # ------------------------------------------------------------------
+    # Incremental aggregation
+    # ------------------------------------------------------------------
+    def _add_customers(self, frame):
+        known = int(frame.index.max()) if len(frame) else None
+        new = [c["cust_id"] for c in customer_dao.iter_customers_after(known)]
+        if not new:
+            return frame, 0
+        return frame.reindex(frame.index.union(pd.Index(new, name="cust_id"))), len(new)
+
+    def _add_orders(self, frame):
+        watermark = _max_id(frame["last_order_id"])
+        orders = pd.DataFrame(list(order_dao.iter_orders_after(watermark)),
+                              columns=["order_id", "cust_id", "total_amount", "order_date"])
+        self._seen = {k: v for k, v in self._seen.items() if watermark is None or k > watermark}
+        if orders.empty:
+            return frame, 0
+        orders = orders.sort_values("order_id", ignore_index=True)
+        now = time.monotonic()
+        for order_id in orders["order_id"]:
+            self._seen.setdefault(order_id, now)
+        ids = orders["order_id"].to_numpy()
+        priced = orders["total_amount"].fillna(0).to_numpy() != 0
+        settled = now - orders["order_id"].map(self._seen).to_numpy() >= SETTLE_SECONDS
+        previous = np.concatenate(([ids[0] - 1 if watermark is None else watermark], ids[:-1]))
+        # stop at the first order that may still change or have a lower id commit before it
+        waiting = ~settled & (~priced | (ids != previous + 1))
+        keep = int(np.argmax(waiting)) if waiting.any() else len(orders)
+        # unpriced orders before that point were abandoned mid-checkout
+        orders = orders.iloc[:keep][priced[:keep]]
+        if orders.empty:
+            return frame, 0
+        orders = orders.assign(order_date=pd.to_datetime(orders["order_date"].astype(str).str[:10]),
+                               total_amount=orders["total_amount"].astype("float64"))
+        agg = orders.groupby("cust_id").agg(
+            last_order_date=("order_date", "max"), frequency=("order_id", "size"),
+            monetary=("total_amount", "sum"), last_order_id=("order_id", "max"))
+        frame = frame.reindex(frame.index.union(agg.index))
+        agg = agg.reindex(frame.index)
+        frame["frequency"] = frame["frequency"].fillna(0).astype("int64") + agg["frequency"].fillna(0).astype("int64")
+        frame["monetary"] = frame["monetary"].fillna(0.0) + agg["monetary"].fillna(0.0)
+        frame["last_order_date"] = pd.concat([frame["last_order_date"], agg["last_order_date"]], axis=1).max(axis=1)
+        frame["last_order_id"] = pd.concat([frame["last_order_id"], agg["last_order_id"]], axis=1).max(axis=1)
+        return frame, len(orders)
+
+    def _add_reviews(self, frame):
+        reviews = pd.DataFrame(list(review_dao.iter_reviews_after(_max_id(frame["last_review_id"]))),
+                               columns=["review_id", "cust_id", "rating"])
+        if reviews.empty:
+            return frame, 0
+        agg = reviews.assign(rating=reviews["rating"].astype("float64")).groupby("cust_id").agg(
+            review_count=("review_id", "size"), rating_sum=("rating", "sum"), last_review_id=("review_id", "max"))
+        frame = frame.reindex(frame.index.union(agg.index))
+        agg = agg.reindex(frame.index)
+        frame["review_count"] = frame["review_count"].fillna(0).astype("int64") + agg["review_count"].fillna(0).astype("int64")
+        frame["rating_sum"] = frame["rating_sum"].fillna(0.0) + agg["rating_sum"].fillna(0.0)
+        frame["last_review_id"] = pd.concat([frame["last_review_id"], agg["last_review_id"]], axis=1).max(axis=1)
+        return frame, len(reviews)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    @staticmethod
+    def score(frame, today=None):
+        """RFM scores and segment for every customer, vectorized."""
+        today = pd.Timestamp(today or date.today())
+        frame = frame.copy()
+        frame["frequency"] = frame["frequency"].fillna(0).astype("int64")
+        frame["monetary"] = frame["monetary"].fillna(0.0)
+        buyers = frame["frequency"] > 0
+        recency = (today - frame["last_order_date"]).dt.days
+
+        r = pd.Series(0, index=frame.index, dtype="int64")
+        f, m = r.copy(), r.copy()
+        if buyers.any():
+            r[buyers] = _quintile(recency[buyers], ascending=False)
+            f[buyers] = _quintile(frame.loc[buyers, "frequency"])
+            m[buyers] = _quintile(frame.loc[buyers, "monetary"])
+        conditions = [buyers & rule(r, f, m) for _, rule in SEGMENT_RULES]
+        frame["recency_days"] = recency.astype("Int64")
+        frame["r_score"], frame["f_score"], frame["m_score"] = r, f, m
+        frame["rfm"] = np.where(buyers, r.astype(str) + f.astype(str) + m.astype(str), None)
+        frame["segment"] = np.select(conditions, [name for name, _ in SEGMENT_RULES], default=PROSPECT)
+        return frame
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    def refresh(self, today=None):
+        """Fold in new customers, orders and reviews, rescore, persist changed rows."""
+        with self._lock:
+            if self.frame is None:
+                self.load()
+            frame, customers = self._add_customers(self.frame)
+            frame, orders = self._add_orders(frame)
+            frame, reviews = self._add_reviews(frame)
+            frame = self.score(frame, today)
+
+            before = self._persisted.reindex(frame.index)
+            changed = pd.Series(False, index=frame.index)
+            for column in SCORES:
+                changed |= _differs(frame[column].astype(object), before[column].astype(object))
+            if orders or reviews:
+                # aggregates moved for these customers even if their scores did not
+                previous = self.frame.reindex(frame.index)
+                changed |= _differs(frame["last_order_id"], previous["last_order_id"])
+                changed |= _differs(frame["last_review_id"], previous["last_review_id"])
+            written = segment_dao.upsert_segments(self._rows(frame[changed]))
+            self.frame = frame
+            self._persisted = frame[SCORES].copy()
+            self.computed_at = datetime.now().isoformat(timespec="seconds")
+            return {"customers": customers, "orders": orders, "reviews": reviews, "written": written}
+
+    def _rows(self, frame):
+        out = frame.reset_index()
+        out["last_order_date"] = out["last_order_date"].dt.strftime("%Y-%m-%d")
+        out["monetary"] = out["monetary"].round(2)
+        out["computed_at"] = datetime.now().isoformat(timespec="seconds")
+        for column in ("last_order_id", "last_review_id", "recency_days"):
+            out[column] = out[column].astype("Int64")
+        out = out.astype(object)
+        return out.where(out.notna(), None).to_dict("records")
+
+    def summary(self):
+        """Customers, average recency/frequency/spend per segment."""
+        with self._lock:
+            if self.frame is None or self.frame.empty:
+                return []
+            grouped = self.frame.groupby("segment").agg(
+                customers=("segment", "size"), avg_recency_days=("recency_days", "mean"),
+                avg_orders=("frequency", "mean"), avg_spent=("monetary", "mean"))
+        grouped = grouped.reindex([s for s in SEGMENTS if s in grouped.index]).round(1)
+        grouped = grouped.astype(object).where(grouped.notna(), None)
+        return grouped.reset_index().to_dict("records")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self, interval=REFRESH_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"⚠️  Segment refresh failed: {e}")
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name="segments", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_engine = SegmentEngine()
+
+
+def get_engine():
+    return _engine
+
+
+def start():
+    """Refresh segments now and every REFRESH_SECONDS in the background (idempotent)."""
+    _engine.start()
+
+
+def refresh():
+    return _engine.refresh()
+
+
+def summary():
+    return _engine.summary()
+
+
+def customer_ids(segment):
+    """Customers in a segment, from the persisted table (one query)."""
+    return segment_dao.customer_ids(segment)
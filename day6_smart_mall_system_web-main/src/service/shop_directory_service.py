@@ -0,0 +1,330 @@
+# src/service/shop_directory_service.py
+"""
+Shop directory: "shops near me / on this floor / in this category".
+
+Shop locations are free text. parse_location() understands
+
+    "Floor 2, Zone B"            floor 2, centre of zone B
+    "Ground Floor, Zone A"       floor 0 (also "GF", "LG", "Level 2", "2F", "B1")
+    "Floor 1, Zone C (12, 40)"   explicit x/y in metres inside the floor
+
+Zones are laid out ZONE_COLUMNS to a row, ZONE_SIZE metres square, so
+"Zone C" with two columns sits at (25, 75). Moving between floors costs
+FLOOR_METRES, roughly the walk to and ride on an escalator, so
+
+    distance = hypot(dx, dy) + FLOOR_METRES * |floor difference|
+
+Indexes, all in memory and updated per shop (add/remove) without a rebuild:
+
+    grid      (floor, cell x, cell y) -> shop ids, cells CELL_METRES wide
+    category  lower-cased category     -> shop ids
+    zone      (floor, zone)            -> shop ids
+
+nearest() searches rings of grid cells outwards, floor by floor, and
+stops when no unvisited cell can be closer than the n-th shop found.
+within() only visits the cells that overlap the radius (shrunk by the
+floor cost on other floors). A category filter whose shop set is
+smaller than the shops in those cells is answered from the category
+index directly.
+
+The directory follows the catalog's shop table: create_shop() adds the
+new shop at once, and sync() picks up changes from other processes at
+most every SYNC_SECONDS.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+
+from src.service import catalog_service
+
+ZONE_SIZE = 50.0
+ZONE_COLUMNS = 2
+FLOOR_METRES = 30.0
+CELL_METRES = 25.0
+SYNC_SECONDS = 5
+
+_FLOOR = re.compile(r"\b(?:floor|level|lvl|fl)\s*(-?\d+)\b|\b(-?\d+)\s*(?:f|fl|floor)\b|\bb(\d+)\b"
+                    r"|\b(ground|gf|lower ground|lg)\b", re.IGNORECASE)
+_ZONE = re.compile(r"\bzone\s*([a-z]|\d+)\b", re.IGNORECASE)
+_XY = re.compile(r"\(\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*\)")
+
+
+def _zone_index(zone):
+    return int(zone) - 1 if zone.isdigit() else ord(zone.upper()) - ord("A")
+
+
+def parse_location(text):
+    """(floor, zone, x, y) for a location string, or None when there is no floor."""
+    if not text:
+        return None
+    match = _FLOOR.search(text)
+    if not match:
+        return None
+    floor_no, floor_suffix, basement, ground = match.groups()
+    if ground:
+        floor = -1 if ground.lower() in ("lower ground", "lg") else 0
+    elif basement:
+        floor = -int(basement)
+    else:
+        floor = int(floor_no if floor_no is not None else floor_suffix)
+    zone_match = _ZONE.search(text)
+    zone = zone_match.group(1).upper() if zone_match else None
+    xy = _XY.search(text)
+    if xy:
+        x, y = float(xy.group(1)), float(xy.group(2))
+    elif zone is not None:
+        i = _zone_index(zone)
+        x = (i % ZONE_COLUMNS + 0.5) * ZONE_SIZE
+        y = (i // ZONE_COLUMNS + 0.5) * ZONE_SIZE
+    else:
+        x = y = ZONE_COLUMNS * ZONE_SIZE / 2
+    return floor, zone, x, y
+
+
+def _cell(x, y):
+    return int(math.floor(x / CELL_METRES)), int(math.floor(y / CELL_METRES))
+
+
+class ShopDirectory:
+    def __init__(self, source=None):
+        self.source = source     # callable returning every shop row; None = fed only through add()
+        self._shops = {}         # shop_id -> row
+        self._points = {}        # shop_id -> (floor, zone, x, y)
+        self._grid = {}          # (floor, cx, cy) -> set of shop ids
+        self._categories = {}    # category -> set of shop ids
+        self._zones = {}         # (floor, zone) -> set of shop ids
+        self._floors = {}        # floor -> number of located shops
+        self._bounds = {}        # floor -> occupied cell box (never shrinks; only bounds the search)
+        self._lock = threading.RLock()
+        self._synced_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+    def add(self, shop):
+        """Index one shop (or re-index it after a change)."""
+        with self._lock:
+            shop_id = shop["shop_id"]
+            if shop_id in self._shops:
+                self.remove(shop_id)
+            self._shops[shop_id] = shop
+            self._categories.setdefault((shop.get("category") or "").strip().lower(), set()).add(shop_id)
+            point = parse_location(shop.get("location"))
+            if point is None:
+                return
+            floor, zone, x, y = point
+            self._points[shop_id] = point
+            gx, gy = _cell(x, y)
+            self._grid.setdefault((floor, gx, gy), set()).add(shop_id)
+            min_x, min_y, max_x, max_y = self._bounds.get(floor, (gx, gy, gx, gy))
+            self._bounds[floor] = (min(min_x, gx), min(min_y, gy), max(max_x, gx), max(max_y, gy))
+            self._zones.setdefault((floor, zone), set()).add(shop_id)
+            self._floors[floor] = self._floors.get(floor, 0) + 1
+
+    def remove(self, shop_id):
+        with self._lock:
+            shop = self._shops.pop(shop_id, None)
+            if shop is None:
+                return
+            self._categories.get((shop.get("category") or "").strip().lower(), set()).discard(shop_id)
+            point = self._points.pop(shop_id, None)
+            if point is None:
+                return
+            floor, zone, x, y = point
+            self._grid.get((floor,) + _cell(x, y), set()).discard(shop_id)
+            self._zones.get((floor, zone), set()).discard(shop_id)
+            self._floors[floor] -= 1
+            if not self._floors[floor]:
+                del self._floors[floor]
+
+    def sync(self, rows=None, force=False):
+        """Apply the catalog's current shop rows: add new/changed shops, drop deleted ones."""
+        with self._lock:
+            if rows is None:
+                if self.source is None or (not force and time.monotonic() - self._synced_at < SYNC_SECONDS):
+                    return
+                rows = self.source()
+            seen = set()
+            for shop in rows:
+                seen.add(shop["shop_id"])
+                if self._shops.get(shop["shop_id"]) != shop:
+                    self.add(shop)
+            for shop_id in set(self._shops) - seen:
+                self.remove(shop_id)
+            self._synced_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def locate(self, origin):
+        """(floor, x, y) from a shop id, a location string or a (floor, x, y) tuple."""
+        if isinstance(origin, tuple):
+            return origin
+        if isinstance(origin, int) or (isinstance(origin, str) and origin.strip().isdigit()):
+            point = self._points.get(int(origin))
+            if point is None:
+                raise ValueError(f"Shop {origin} has no known location")
+            floor, _, x, y = point
+            return floor, x, y
+        point = parse_location(origin)
+        if point is None:
+            raise ValueError(f"Cannot read a floor from {origin!r}")
+        floor, _, x, y = point
+        return floor, x, y
+
+    def _distance(self, origin, shop_id):
+        floor, _, x, y = self._points[shop_id]
+        return math.hypot(x - origin[1], y - origin[2]) + FLOOR_METRES * abs(floor - origin[0])
+
+    def _candidates(self, category):
+        return None if category is None else self._categories.get(category.strip().lower(), set())
+
+    def _result(self, scored):
+        return [dict(self._shops[shop_id], distance_m=round(dist, 1),
+                     floor=self._points[shop_id][0], zone=self._points[shop_id][1])
+                for dist, shop_id in scored]
+
+    def nearest(self, origin, n=5, category=None, exclude_origin=True):
+        """The n closest shops (optionally of one category), nearest first."""
+        self.sync()
+        with self._lock:
+            start = self.locate(origin)
+            skip = int(origin) if exclude_origin and not isinstance(origin, tuple) and str(origin).strip().isdigit() else None
+            allowed = self._candidates(category)
+            if allowed is not None and len(allowed) <= 64:
+                # small category: scoring its shops beats walking the grid
+                scored = [(self._distance(start, s), s) for s in allowed if s in self._points and s != skip]
+                return self._result(heapq.nsmallest(n, scored))
+
+            best = []            # max-heap of (-distance, -shop_id)
+            cx, cy = _cell(start[1], start[2])
+            floors = sorted(self._floors, key=lambda f: abs(f - start[0]))
+            for floor in floors:
+                floor_cost = FLOOR_METRES * abs(floor - start[0])
+                if len(best) == n and floor_cost > -best[0][0]:
+                    break        # every shop on this floor and beyond is farther
+                ring = 0
+                while True:
+                    # nearest any point of ring r can be: (r - 1) cells away
+                    bound = floor_cost + max(ring - 1, 0) * CELL_METRES
+                    if len(best) == n and bound > -best[0][0]:
+                        break
+                    if ring > self._max_ring(floor, cx, cy):
+                        break
+                    for cell in self._ring(floor, cx, cy, ring):
+                        for shop_id in self._grid.get(cell, ()):
+                            if shop_id == skip or (allowed is not None and shop_id not in allowed):
+                                continue
+                            item = (-self._distance(start, shop_id), -shop_id)
+                            if len(best) < n:
+                                heapq.heappush(best, item)
+                            elif item > best[0]:
+                                heapq.heapreplace(best, item)
+                    ring += 1
+            return self._result(sorted((-d, -s) for d, s in best))
+
+    def within(self, origin, radius, category=None):
+        """Every shop within radius metres (optionally of one category), nearest first."""
+        self.sync()
+        with self._lock:
+            start = self.locate(origin)
+            allowed = self._candidates(category)
+            cells = list(self._cells_within(start, radius))
+            per_cell = len(self._points) / max(len(self._grid), 1)
+            if allowed is not None and len(allowed) <= len(cells) * per_cell:
+                pool = (s for s in allowed if s in self._points)
+            else:
+                pool = (shop_id for cell in cells for shop_id in self._grid.get(cell, ())
+                        if allowed is None or shop_id in allowed)
+            scored = sorted((d, s) for s in pool for d in (self._distance(start, s),) if d <= radius)
+            return self._result(scored)
+
+    def on_floor(self, floor, zone=None, category=None):
+        """Shops on a floor (and zone), optionally of one category, by shop id."""
+        self.sync()
+        with self._lock:
+            if zone is not None:
+                ids = set(self._zones.get((floor, zone.upper()), ()))
+            else:
+                ids = {s for (f, _), members in self._zones.items() if f == floor for s in members}
+            allowed = self._candidates(category)
+            if allowed is not None:
+                ids &= allowed
+            return [dict(self._shops[s], floor=floor, zone=self._points[s][1]) for s in sorted(ids)]
+
+    def in_category(self, category):
+        self.sync()
+        with self._lock:
+            return [dict(self._shops[s]) for s in sorted(self._candidates(category))]
+
+    def categories(self):
+        with self._lock:
+            return sorted(self._shops[next(iter(ids))].get("category") for c, ids in self._categories.items() if c and ids)
+
+    def floors(self):
+        with self._lock:
+            return sorted(self._floors)
+
+    # ------------------------------------------------------------------
+    # Grid helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _ring(floor, cx, cy, ring):
+        if ring == 0:
+            yield floor, cx, cy
+            return
+        for gx in range(cx - ring, cx + ring + 1):
+            yield floor, gx, cy - ring
+            yield floor, gx, cy + ring
+        for gy in range(cy - ring + 1, cy + ring):
+            yield floor, cx - ring, gy
+            yield floor, cx + ring, gy
+
+    def _cells_within(self, start, radius):
+        """Grid cells, on every floor in reach, that overlap the circle around start."""
+        origin_floor, x, y = start
+        for floor in self._floors:
+            reach = radius - FLOOR_METRES * abs(floor - origin_floor)
+            if reach < 0:
+                continue
+            (x0, y0), (x1, y1) = _cell(x - reach, y - reach), _cell(x + reach, y + reach)
+            for gx in range(x0, x1 + 1):
+                dx = max(gx * CELL_METRES - x, 0.0, x - (gx + 1) * CELL_METRES)
+                for gy in range(y0, y1 + 1):
+                    dy = max(gy * CELL_METRES - y, 0.0, y - (gy + 1) * CELL_METRES)
+                    if dx * dx + dy * dy <= reach * reach:
+                        yield floor, gx, gy
+
+    def _max_ring(self, floor, cx, cy):
+        """Rings beyond this hold no cells of the floor."""
+        min_x, min_y, max_x, max_y = self._bounds[floor]
+        return max(cx - min_x, max_x - cx, cy - min_y, max_y - cy)
+
+
+_directory = ShopDirectory(source=lambda: catalog_service.list_rows("shop"))
+
+
+def get_directory():
+    return _directory
+
+
+def add_shop(shop):
+    _directory.add(shop)
+
+
+def nearest(origin, n=5, category=None):
+    return _directory.nearest(origin, n, category)
+
+
+def within(origin, radius, category=None):
+    return _directory.within(origin, radius, category)
+
+
+def on_floor(floor, zone=None, category=None):
+    return _directory.on_floor(floor, zone, category)
+
+
+def in_category(category):
+    return _directory.in_category(category)
@@ -1,10 +1,31 @@
 from src.dao import shop_dao
+from src.service import catalog_service, shop_directory_service
 import streamlit as st
 def create_shop(name,owner,location, category):
-    return shop_dao.create_shop(name,owner,location, category)
+    shop = shop_dao.create_shop(name,owner,location, category)
+    catalog_service.touch("shop")
+    if shop.get("shop_id") is not None:
+        shop_directory_service.add_shop(shop)
+    return shop
 
 def list_shops():
-    return shop_dao.list_shops()
+    return catalog_service.list_rows("shop")
+
+def find_shops(near=None, radius=None, n=10, floor=None, zone=None, category=None):
+    """
+    Directory search: nearest n to `near` (shop id or location text), or all
+    within `radius` metres of it, or every shop on a floor/zone; each
+    optionally limited to one category. No criteria lists every shop.
+    """
+    if near:
+        if radius:
+            return shop_directory_service.within(near, radius, category)
+        return shop_directory_service.nearest(near, n, category)
+    if floor is not None:
+        return shop_directory_service.on_floor(floor, zone, category)
+    if category:
+        return shop_directory_service.in_category(category)
+    return list_shops()
 
 def get_shop(shop_id):
     shop = shop_dao.get_shop_by_id(shop_id)
@@ -0,0 +1,287 @@
+# src/service/stock_monitor_service.py
+"""
+Low-stock and projected-stockout monitoring.
+
+Every stock change (product_service.update_stock, checkout in
+order_service, new products) is passed to record_stock(). The monitor
+keeps, per product in memory:
+
+    stock       last known level
+    threshold   low-stock level (DEFAULT_THRESHOLD unless set)
+    rate        units sold per day, an exponentially decayed sum of sales
+                with time constant RATE_TAU_DAYS
+
+Days to stockout = stock / rate. All rates decay by the same factor, so
+the ordering by days-to-stockout only changes when a product's own
+stock or sales change. The "restock soon" ranking is therefore a heap
+updated in O(log n) per change, with stale entries skipped on read. It
+is never a scan of the product table.
+
+Alerts fire when a product crosses its threshold or its projected
+stockout falls within STOCKOUT_HORIZON_DAYS. They re-arm once the
+product recovers. Alerts are queued and written to the notification
+table in batches (type "Stock", cust_id NULL = admins) by a background
+thread.
+
+State is per process: each worker sees the changes it made itself, and
+starts from the catalog's current stock levels.
+"""
+import heapq
+import math
+import threading
+import time
+from datetime import date
+
+from src.dao import notification_dao
+
+DEFAULT_THRESHOLD = 10
+RATE_TAU_DAYS = 7.0
+STOCKOUT_HORIZON_DAYS = 3.0
+FLUSH_SECONDS = 30
+BATCH_SIZE = 100
+REBASE_EXPONENT = 50        # rebase the decay epoch before exp() gets large
+SECONDS_PER_DAY = 86400.0
+
+
+class StockMonitor:
+    def __init__(self, default_threshold=DEFAULT_THRESHOLD, tau_days=RATE_TAU_DAYS,
+                 horizon_days=STOCKOUT_HORIZON_DAYS, clock=time.time):
+        self.default_threshold = default_threshold
+        self.tau = tau_days * SECONDS_PER_DAY
+        self.horizon_days = horizon_days
+        self.clock = clock
+        self._epoch = clock()
+        self._stock = {}          # prod_id -> units
+        self._sold = {}           # prod_id -> decayed units sold, scaled to the epoch
+        self._thresholds = {}     # prod_id -> custom threshold
+        self._version = {}        # prod_id -> int, bumps invalidate older heap entries
+        self._heap = []           # (rank key, stock, version, prod_id)
+        self._alerted = {}        # prod_id -> {"low", "stockout"} currently raised
+        self._pending = []        # alerts waiting to be written
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.loaded = False
+
+    # ------------------------------------------------------------------
+    # Rates
+    # ------------------------------------------------------------------
+    def _scale(self, now):
+        return math.exp((now - self._epoch) / self.tau)
+
+    def _rebase(self, now):
+        """Move the epoch to now so the scaled counters stay small."""
+        factor = self._scale(now)
+        self._sold = {p: s / factor for p, s in self._sold.items()}
+        self._epoch = now
+        self._rebuild_heap()
+
+    def rate_per_day(self, prod_id):
+        """Current decayed sell-through in units per day."""
+        with self._lock:
+            scaled = self._sold.get(prod_id, 0.0)
+            return scaled / self._scale(self.clock()) * SECONDS_PER_DAY / self.tau
+
+    def days_to_stockout(self, prod_id):
+        rate = self.rate_per_day(prod_id)
+        with self._lock:
+            stock = self._stock.get(prod_id, 0)
+        if stock <= 0:
+            return 0.0
+        return stock / rate if rate > 0 else math.inf
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+    def _rank_key(self, prod_id):
+        # stock / scaled sales orders products exactly like days-to-stockout
+        stock = self._stock.get(prod_id, 0)
+        if stock <= 0:
+            return 0.0
+        sold = self._sold.get(prod_id, 0.0)
+        return stock / sold if sold > 0 else math.inf
+
+    def _push(self, prod_id):
+        version = self._version.get(prod_id, 0) + 1
+        self._version[prod_id] = version
+        key = self._rank_key(prod_id)
+        if key != math.inf or self._stock.get(prod_id, 0) <= self.threshold(prod_id):
+            heapq.heappush(self._heap, (key, self._stock.get(prod_id, 0), version, prod_id))
+        if len(self._heap) > 2 * len(self._stock) + 64:
+            # drop superseded entries once they outnumber the live ones
+            self._heap = [e for e in self._heap if self._version.get(e[3]) == e[2]]
+            heapq.heapify(self._heap)
+
+    def _rebuild_heap(self):
+        self._heap = []
+        for prod_id in self._stock:
+            self._push(prod_id)
+
+    def restock_soon(self, limit=20):
+        """Products ranked by projected stockout (soonest first), then low stock."""
+        with self._lock:
+            out, seen, keep = [], set(), []
+            while self._heap and len(out) < limit:
+                entry = heapq.heappop(self._heap)
+                key, stock, version, prod_id = entry
+                if self._version.get(prod_id) != version or prod_id in seen:
+                    continue   # superseded by a newer change
+                keep.append(entry)
+                seen.add(prod_id)
+                out.append(prod_id)
+            for entry in keep:
+                heapq.heappush(self._heap, entry)
+        rows = []
+        for prod_id in out:
+            days = self.days_to_stockout(prod_id)
+            rows.append({
+                "prod_id": prod_id,
+                "stock": self._stock.get(prod_id, 0),
+                "threshold": self.threshold(prod_id),
+                "rate_per_day": round(self.rate_per_day(prod_id), 2),
+                "days_to_stockout": None if days == math.inf else round(days, 1),
+            })
+        return rows
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def threshold(self, prod_id):
+        return self._thresholds.get(prod_id, self.default_threshold)
+
+    def set_threshold(self, prod_id, threshold):
+        with self._lock:
+            self._thresholds[prod_id] = int(threshold)
+            self._push(prod_id)
+            self._check(prod_id)
+
+    def load(self, products):
+        """Start from the catalog's stock levels (no alerts for the initial state)."""
+        with self._lock:
+            for prod in products:
+                self._stock[prod["prod_id"]] = int(prod.get("stock") or 0)
+            self._rebuild_heap()
+            for prod_id in self._stock:
+                self._check(prod_id, emit=False)
+            self.loaded = True
+
+    def record(self, prod_id, new_stock, sold=0):
+        """
+        A product's stock is now new_stock; sold > 0 when the change was a sale.
+        O(log n): updates the rate, re-ranks the product and checks alerts.
+        """
+        now = self.clock()
+        with self._lock:
+            if (now - self._epoch) / self.tau > REBASE_EXPONENT:
+                self._rebase(now)
+            if sold > 0:
+                self._sold[prod_id] = self._sold.get(prod_id, 0.0) + sold * self._scale(now)
+            self._stock[prod_id] = int(new_stock)
+            self._push(prod_id)
+            self._check(prod_id)
+
+    def _check(self, prod_id, emit=True):
+        stock = self._stock.get(prod_id, 0)
+        raised = self._alerted.setdefault(prod_id, set())
+        low = stock <= self.threshold(prod_id)
+        days = self.days_to_stockout(prod_id)
+        soon = days <= self.horizon_days
+
+        if low and "low" not in raised:
+            raised.add("low")
+            if emit:
+                self._pending.append((prod_id, f"Low stock: product {prod_id} has {stock} left "
+                                               f"(threshold {self.threshold(prod_id)})"))
+        elif not low:
+            raised.discard("low")
+
+        if soon and stock > 0 and "stockout" not in raised:
+            raised.add("stockout")
+            if emit:
+                self._pending.append((prod_id, f"Projected stockout: product {prod_id} runs out in about "
+                                               f"{days:.1f} days at {self.rate_per_day(prod_id):.1f}/day"))
+        elif not soon:
+            raised.discard("stockout")
+
+    # ------------------------------------------------------------------
+    # Alert delivery
+    # ------------------------------------------------------------------
+    def pending_alerts(self):
+        with self._lock:
+            return list(self._pending)
+
+    def flush(self):
+        """Write queued alerts to the notification table, BATCH_SIZE per insert."""
+        with self._lock:
+            alerts, self._pending = self._pending, []
+        today = str(date.today())
+        written = 0
+        try:
+            for i in range(0, len(alerts), BATCH_SIZE):
+                batch = alerts[i:i + BATCH_SIZE]
+                notification_dao.create_notifications([
+                    {"cust_id": None, "type": "Stock", "message": message, "related_id": prod_id,
+                     "notify_date": today, "read": False, "delivered": True}
+                    for prod_id, message in batch
+                ])
+                written += len(batch)
+        except Exception:
+            # keep what was not written for the next flush
+            with self._lock:
+                self._pending = alerts[written:] + self._pending
+            raise
+        return written
+
+    def start(self, products_loader, interval=FLUSH_SECONDS):
+        if self._thread and self._thread.is_alive():
+            return
+        if not self.loaded:
+            self.load(products_loader())
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"stock alert flush failed: {e}")
+
+        self._thread = threading.Thread(target=loop, name="stock-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_monitor = StockMonitor()
+
+
+def get_monitor():
+    return _monitor
+
+
+def _ensure_loaded():
+    if not _monitor.loaded:
+        from src.service import catalog_service
+        _monitor.load(catalog_service.list_rows("product"))
+
+
+def start():
+    """Load stock levels and start the alert flusher (idempotent)."""
+    from src.service import catalog_service
+    _monitor.start(lambda: catalog_service.list_rows("product"))
+
+
+def record_stock(prod_id, new_stock, sold=0):
+    _ensure_loaded()
+    _monitor.record(prod_id, new_stock, sold)
+
+
+def set_threshold(prod_id, threshold):
+    _ensure_loaded()
+    _monitor.set_threshold(prod_id, threshold)
+
+
+def restock_soon(limit=20):
+    _ensure_loaded()
+    return _monitor.restock_soon(limit)
@@ -8,11 +8,28 @@ from src.service import (
     sales_service,
     order_service,
     notification_service,
-    review_service
+    review_service,
+    scheduler_service,
+    catalog_service,
+    kiosk_service,
+    segmentation_service,
+    stock_monitor_service
 )
 from src.dao import customer_dao
+from src import routing
+
+# Deliver future-dated notifications; start() is a no-op on reruns
+scheduler_service.start()
+# Warm-start products, shops and sales from the on-disk snapshot
+catalog_service.start()
+# Track stock levels and queue low-stock / stockout alerts
+stock_monitor_service.start()
+# Keep RFM customer segments current for targeted notifications
+segmentation_service.start()
 
 # ---------------------- SESSION STATE ----------------------
+# reads stick to the primary for a few seconds after this session writes
+routing.bind(st.session_state)
 if "user" not in st.session_state:
     st.session_state.user = None
 
@@ -48,6 +65,21 @@ def get_menu():
 
 menu = st.sidebar.selectbox("📋 Menu", get_menu())
 
+# ---------------------- KIOSK STATUS ----------------------
+if kiosk_service.enabled():
+    kiosk = kiosk_service.status()
+    pending = kiosk["journal"].get("pending", 0) + kiosk["journal"].get("in_flight", 0)
+    if kiosk["online"]:
+        st.sidebar.success(f"🟢 Online · last sync {kiosk['last_sync']}")
+    else:
+        st.sidebar.warning("🟠 Offline · showing the local catalog")
+    st.sidebar.caption(f"{pending} change(s) waiting to sync, {kiosk['journal'].get('conflict', 0)} conflict(s)")
+    if st.sidebar.button("🔄 Sync now"):
+        if kiosk_service.sync():
+            st.sidebar.success("Synced")
+        else:
+            st.sidebar.error("Still offline")
+
 # ---------------------- LOGIN ----------------------
 if menu == "Login":
     st.subheader("🔑 Login")
@@ -164,14 +196,19 @@ elif menu == "Send Notification":
     st.subheader("📢 Send Notification")
     with st.form("send_notification_form"):
         cust_id = st.number_input("Customer ID (0 for all)", 0)
+        segment = st.selectbox("Or Customer Segment", [""] + segmentation_service.SEGMENTS)
         notif_type = st.text_input("Notification Type")
         message = st.text_area("Message")
         notify_date = st.date_input("Notify Date", date.today())
         submitted = st.form_submit_button("Send Notification")
         if submitted:
             try:
-                notification_service.create_notification(cust_id if cust_id != 0 else None, notif_type, message, notify_date)
-                st.success("📢 Notification sent!")
+                if segment:
+                    sent = notification_service.send_to_segment(segment, notif_type, message, notify_date)
+                    st.success(f"📢 Notification sent to {sent} customers in {segment}!")
+                else:
+                    notification_service.create_notification(cust_id if cust_id != 0 else None, notif_type, message, notify_date)
+                    st.success("📢 Notification sent!")
             except Exception as e:
                 st.error(str(e))
 
@@ -253,6 +290,9 @@ elif menu == "View Notifications":
     notifications = notification_service.get_notifications(cust_id)
     for n in notifications:
         st.success(f"{n['notify_date']} | {n['type']} | {n.get('message','')}")
+        if not n.get("read") and st.button("Mark as read", key=f"read_{n['notification_id']}"):
+            notification_service.mark_as_read(n["notification_id"])
+            st.rerun()
 
 # ---------------------- VIEW ORDERS / HISTORY ----------------------
 elif menu == "View Orders":
@@ -0,0 +1,88 @@
+# tools/bench_directory.py
+"""
+Query latency of the shop directory index against a full scan.
+
+Builds a directory of --shops synthetic shops spread over --floors floors
+(explicit coordinates, random categories), then times nearest-N,
+within-radius and category-filtered queries from random origins, and
+checks every answer against a brute-force scan of all shops.
+
+Usage:
+    python -m tools.bench_directory --shops 20000 --queries 2000 --output directory.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATEGORIES = ["Fashion", "Electronics", "Food", "Sports", "Home", "Books", "Toys", "Beauty"]
+
+
+def brute(directory, origin, key, limit=None):
+    from src.service import shop_directory_service as sds
+    floor, x, y = origin
+    scored = sorted((math.hypot(px - x, py - y) + sds.FLOOR_METRES * abs(f - floor), shop_id)
+                    for shop_id, (f, _, px, py) in directory._points.items() if key(shop_id))
+    return scored[:limit] if limit else scored
+
+
+def timed(fn, origins):
+    t0 = time.perf_counter()
+    results = [fn(o) for o in origins]
+    return (time.perf_counter() - t0) / len(origins) * 1e6, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shop directory index vs full scan")
+    parser.add_argument("--shops", type=int, default=20000)
+    parser.add_argument("--floors", type=int, default=6)
+    parser.add_argument("--size", type=float, default=400.0, help="floor width/depth in metres")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from src.service.shop_directory_service import ShopDirectory
+
+    rng = random.Random(3)
+    directory = ShopDirectory()
+    shops = [{"shop_id": i, "name": f"Shop {i}", "category": rng.choice(CATEGORIES),
+              "location": f"Floor {rng.randrange(args.floors)}, ({rng.uniform(0, args.size):.1f}, {rng.uniform(0, args.size):.1f})"}
+             for i in range(1, args.shops + 1)]
+    t0 = time.perf_counter()
+    directory.sync(shops)
+    build_ms = (time.perf_counter() - t0) * 1000
+    origins = [(rng.randrange(args.floors), rng.uniform(0, args.size), rng.uniform(0, args.size)) for _ in range(args.queries)]
+
+    cases = {
+        "nearest_10": (lambda o: directory.nearest(o, 10), lambda o: brute(directory, o, lambda s: True, 10)),
+        "nearest_10_category": (lambda o: directory.nearest(o, 10, "Food"),
+                                lambda o: brute(directory, o, lambda s: shops[s - 1]["category"] == "Food", 10)),
+        "within_40m": (lambda o: directory.within(o, 40), lambda o: [r for r in brute(directory, o, lambda s: True) if r[0] <= 40]),
+        "within_40m_category": (lambda o: directory.within(o, 40, "Books"),
+                                lambda o: [r for r in brute(directory, o, lambda s: shops[s - 1]["category"] == "Books") if r[0] <= 40]),
+    }
+    results = {"build_ms": round(build_ms, 1)}
+    for name, (indexed, scan) in cases.items():
+        index_us, answers = timed(indexed, origins)
+        scan_us, expected = timed(scan, origins[:200])
+        mismatches = sum(
+            [round(r["distance_m"], 1) for r in got] != [round(d, 1) for d, _ in want]
+            for got, want in zip(answers, expected))
+        results[name] = {"index_us": round(index_us, 1), "scan_us": round(scan_us, 1),
+                         "speedup": round(scan_us / index_us, 1), "mismatches": mismatches,
+                         "avg_results": round(sum(map(len, answers)) / len(answers), 1)}
+        print(f"{name:<22} {results[name]}")
+    print(f"build {results['build_ms']} ms for {args.shops} shops")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
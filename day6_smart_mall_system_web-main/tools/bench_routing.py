@@ -0,0 +1,178 @@
+# tools/bench_routing.py
+"""
+Checkout latency while admin listings run, with and without read routing.
+
+Starts the stand-in backend with a small connection pool (--pool), a
+per-row select cost and a lagged read replica. Then, for each mode, a
+fresh process runs --listers threads paging through the full product
+table while --buyers threads place orders:
+
+    primary: SUPABASE_READ_URL unset, everything hits the primary
+    routed:  SUPABASE_READ_URL = replica; selects go there unless the
+             session wrote in the last READ_STICKY_SECONDS
+
+The routed run also checks read-your-writes: a session that just
+updated a product's stock must read the new value at once, while
+another session may still see the replica's older copy.
+
+Usage:
+    python -m tools.bench_routing --duration 10 --pool 4 --lag-ms 300 --output routing.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_backend(args):
+    cmd = [sys.executable, "-m", "tools.standin_backend", "--port", str(args.port), "--seed", "small",
+           "--latency-ms", str(args.latency_ms), "--pool", str(args.pool), "--row-cost-us", str(args.row_cost_us),
+           "--replica-port", str(args.port + 1), "--replica-lag-ms", str(args.lag_ms),
+           "--rows", f"products={args.products}"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    urls = [f"http://127.0.0.1:{args.port}", f"http://127.0.0.1:{args.port + 1}"]
+    for _ in range(600):
+        try:
+            for url in urls:
+                urllib.request.urlopen(url + "/__admin/stats", timeout=1)
+            return proc, urls
+        except Exception:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("stand-in backend did not start")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else None
+
+
+# ----------------------------------------------------------------------
+# One mode, run in a child process (config is read at import time)
+# ----------------------------------------------------------------------
+def run_mode(args):
+    sys.path.insert(0, ROOT)
+    from src import routing
+    from src.dao import product_dao
+    from src.service import order_service, stock_monitor_service
+
+    stock_monitor_service.get_monitor().load([])   # not under test; skip the catalog bootstrap
+    stop = threading.Event()
+    checkout, listings, rejected = [], [], [0]
+    products = [p["prod_id"] for p in product_dao.list_products() if p["stock"] > 100]
+
+    def lister():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            sum(1 for _ in product_dao.iter_products())
+            listings.append(time.perf_counter() - t0)
+
+    def buyer(seed):
+        rng = random.Random(seed)
+        routing.bind({})          # one session per buyer
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                order_service.place_order(rng.randint(1, 100), 1, [{"prod_id": rng.choice(products), "quantity": 1}])
+            except ValueError:
+                rejected[0] += 1
+                continue
+            checkout.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=lister, daemon=True) for _ in range(args.listers)]
+    threads += [threading.Thread(target=buyer, args=(i,), daemon=True) for i in range(args.buyers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    result = {
+        "checkouts": len(checkout),
+        "checkout_p50_ms": round(percentile(checkout, 0.50) * 1000, 1),
+        "checkout_p95_ms": round(percentile(checkout, 0.95) * 1000, 1),
+        "checkouts_per_s": round(len(checkout) / args.duration, 1),
+        "listings": len(listings),
+        "listing_p50_ms": round(percentile(listings, 0.50) * 1000, 1) if listings else None,
+        "rejected": rejected[0],
+        "routing": routing.metrics(),
+    }
+    if os.environ.get("SUPABASE_READ_URL"):
+        result["read_your_writes"] = check_read_your_writes(products[0])
+    print(json.dumps(result))
+
+
+def check_read_your_writes(prod_id):
+    from src import routing
+    from src.dao import product_dao
+
+    writer, other = {}, {}
+    token = routing.bind(writer)
+    new_stock = product_dao.get_product_by_id(prod_id)["stock"] + 7
+    product_dao.update_stock(prod_id, new_stock)
+    own = product_dao.get_product_by_id(prod_id)["stock"]
+    routing.unbind(token)
+    token = routing.bind(other)
+    before_lag = product_dao.get_product_by_id(prod_id)["stock"]
+    time.sleep(routing.STICKY_SECONDS)
+    after_lag = product_dao.get_product_by_id(prod_id)["stock"]
+    routing.unbind(token)
+    return {"own_session_sees_write": own == new_stock,
+            "other_session_before_lag": before_lag == new_stock,
+            "other_session_after_lag": after_lag == new_stock}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkout latency with and without read routing")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--listers", type=int, default=3)
+    parser.add_argument("--buyers", type=int, default=4)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--pool", type=int, default=4)
+    parser.add_argument("--row-cost-us", type=float, default=100.0)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--lag-ms", type=float, default=300.0)
+    parser.add_argument("--port", type=int, default=54341)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--run", choices=["mode"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        return run_mode(args)
+
+    backend, (primary, replica) = start_backend(args)
+    results = {}
+    try:
+        for mode, read_url in (("primary", None), ("routed", replica)):
+            env = dict(os.environ, SUPABASE_URL=primary, DAO_HEDGE_READS="0",
+                       CATALOG_SNAPSHOT_DIR=os.path.join(ROOT, ".snapshots", "bench-routing"))
+            env.pop("SUPABASE_READ_URL", None)
+            if read_url:
+                env["SUPABASE_READ_URL"] = read_url
+                env.setdefault("READ_STICKY_SECONDS", str(max(1.0, 3 * args.lag_ms / 1000)))
+            cmd = [sys.executable, "-m", "tools.bench_routing", "--run", "mode",
+                   "--duration", str(args.duration), "--listers", str(args.listers), "--buyers", str(args.buyers)]
+            out = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+            if out.returncode:
+                raise RuntimeError(out.stderr)
+            out = out.stdout
+            results[mode] = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:<8} {results[mode]}")
+    finally:
+        backend.terminate()
+        backend.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# tools/bench_services.py
+"""
+Benchmark suite for the service layer (src/service/*).
+
+Seeds the in-process stand-in backend (--seed, --rows NAME=N) with a
+per-call latency (--latency-ms), then calls each public service
+function in CASES:
+
+    cold       the first call (catalog / price table / index still empty)
+    warm       --rounds further calls: min, median, mean, p95
+    round trips backend requests per warm call, counted by the stand-in
+
+Writes a JSON report tagged with the current git commit. Pass --compare
+with a report from another commit to print the change per function. With
+--fail-over PCT, the exit status is 1 when any median or round-trip count
+grows by more than PCT percent, so the check can gate a CI job.
+
+Volumes: --seed small runs in about a minute. --seed large (100k products,
+1M orders, 5M order_items) needs several GB of RAM and minutes to seed.
+
+Usage:
+    python -m tools.bench_services --seed medium --latency-ms 2 --output services.json
+    python -m tools.bench_services --seed medium --latency-ms 2 --compare services.json --fail-over 20
+    python -m tools.bench_services --only 'order_service\\.' --rounds 50
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+# a service call here may legitimately read a whole large table
+os.environ.setdefault("DAO_CALL_TIMEOUT", "600")
+os.environ.setdefault("DAO_HEDGE_READS", "0")   # one request per call, so round trips are exact
+
+from tools.standin_backend import ADMIN_EMAIL, PASSWORD, SEED_SIZES, StandinServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ----------------------------------------------------------------------
+# Cases: name -> function(ctx) making one call. ctx has random sample ids.
+# ----------------------------------------------------------------------
+def cases(svc):
+    (auth_service, customer_service, notification_service, order_item_service, order_service,
+     pricing_service, product_service, review_service, sales_service, segmentation_service,
+     shop_service, stock_monitor_service) = svc
+    today = str(date.today())
+    return {
+        "auth_service.login_user": lambda c: auth_service.login_user(ADMIN_EMAIL, PASSWORD),
+        "customer_service.list_customers": lambda c: customer_service.list_customers(),
+        "customer_service.get_customer": lambda c: customer_service.get_customer(c.cust_id()),
+        "customer_service.get_customer_by_email": lambda c: customer_service.get_customer_by_email(f"customer{c.cust_id()}@mall.test"),
+        "customer_service.iter_customers[1000]": lambda c: list(customer_service.iter_customers(limit=1000)),
+        "product_service.list_products": lambda c: product_service.list_products(),
+        "product_service.get_product": lambda c: product_service.get_product(c.prod_id()),
+        "product_service.filter_products": lambda c: product_service.filter_products({"brand": "Nike", "max_price": 1000}),
+        "product_service.iter_products[1000]": lambda c: list(product_service.iter_products(limit=1000)),
+        "product_service.update_stock": lambda c: product_service.update_stock(c.prod_id(), c.rng.randint(50, 200)),
+        "product_service.create_product": lambda c: product_service.create_product("Shirt", "Bench", "red", 199.0, 20),
+        "pricing_service.get_price_table": lambda c: pricing_service.get_price_table(),
+        "sales_service.list_sales": lambda c: sales_service.list_sales(),
+        "sales_service.get_sale": lambda c: sales_service.get_sale(c.sale_id()),
+        "sales_service.list_sales_with_products": lambda c: sales_service.list_sales_with_products(),
+        "sales_service.update_sale": lambda c: sales_service.update_sale(c.sale_id(), discount=c.rng.choice([10, 15, 20])),
+        "shop_service.list_shops": lambda c: shop_service.list_shops(),
+        "shop_service.find_shops[near]": lambda c: shop_service.find_shops(near=c.shop_id(), n=10),
+        "order_service.create_order": lambda c: order_service.create_order(
+            c.cust_id(), c.shop_id(), [{"prod_id": c.in_stock(), "quantity": 1}, {"prod_id": c.in_stock(), "quantity": 1}]),
+        "order_service.get_order_history": lambda c: order_service.get_order_history(c.cust_id()),
+        "order_service.list_orders": lambda c: order_service.list_orders(),
+        "order_item_service.list_items": lambda c: order_item_service.list_items(c.order_id()),
+        "review_service.create_review": lambda c: review_service.create_review(c.cust_id(), c.prod_id(), 4.0, "great quality bench"),
+        "review_service.view_reviews_for_product": lambda c: review_service.view_reviews_for_product(c.prod_id()),
+        "review_service.view_reviews_by_customer": lambda c: review_service.view_reviews_by_customer(c.cust_id()),
+        "review_service.search_reviews": lambda c: review_service.search_reviews("battery quality"),
+        "notification_service.create_notification": lambda c: notification_service.create_notification(c.cust_id(), "Sale", "bench", today),
+        "notification_service.get_notifications": lambda c: notification_service.get_notifications(c.cust_id()),
+        "notification_service.filter_notifications": lambda c: notification_service.filter_notifications(c.cust_id(), "Order"),
+        "notification_service.list_all_notifications": lambda c: notification_service.list_all_notifications(),
+        "segmentation_service.refresh": lambda c: segmentation_service.refresh(),
+        "stock_monitor_service.restock_soon": lambda c: stock_monitor_service.restock_soon(20),
+    }
+
+
+class Context:
+    """Random ids that exist in the seeded database."""
+
+    def __init__(self, spec, db, seed=11):
+        self.rng = random.Random(seed)
+        self.spec = spec
+        products = db.table("product").rows
+        self._in_stock = [p["prod_id"] for p in products if (p.get("stock") or 0) > 150] or [1]
+
+    def cust_id(self):
+        return self.rng.randint(1, self.spec["customers"])
+
+    def prod_id(self):
+        return self.rng.randint(1, self.spec["products"])
+
+    def shop_id(self):
+        return self.rng.randint(1, self.spec["shops"])
+
+    def sale_id(self):
+        return self.rng.randint(1, self.spec["sales"])
+
+    def order_id(self):
+        return self.rng.randint(1, self.spec["orders"])
+
+    def in_stock(self):
+        return self.rng.choice(self._in_stock)
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def run_case(fn, ctx, db, rounds, max_seconds):
+    def call():
+        before = db.stats["requests"]
+        t0 = time.perf_counter()
+        fn(ctx)
+        return time.perf_counter() - t0, db.stats["requests"] - before
+
+    cold_s, cold_trips = call()
+    times, trips = [], []
+    budget_end = time.perf_counter() + max_seconds
+    while len(times) < rounds and (len(times) < 3 or time.perf_counter() < budget_end):
+        elapsed, n = call()
+        times.append(elapsed)
+        trips.append(n)
+    ms = [t * 1000 for t in times]
+    return {
+        "cold_ms": round(cold_s * 1000, 2),
+        "cold_round_trips": cold_trips,
+        "rounds": len(ms),
+        "min_ms": round(min(ms), 2),
+        "median_ms": round(statistics.median(ms), 2),
+        "mean_ms": round(statistics.fmean(ms), 2),
+        "p95_ms": round(percentile(ms, 0.95), 2),
+        "round_trips": round(statistics.fmean(trips), 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ----------------------------------------------------------------------
+# Comparison
+# ----------------------------------------------------------------------
+def compare(old, new, fail_over=None):
+    """Print per-function change; returns the functions that regressed beyond fail_over %."""
+    def pct(a, b):
+        return (b - a) / a * 100 if a else 0.0
+
+    regressions = []
+    print(f"\n{'function':<48}{'med old':>10}{'med new':>10}{'Δ':>9}{'rt old':>8}{'rt new':>8}")
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(name), new["results"].get(name)
+        if not a or not b or "error" in a or "error" in b:
+            state = "error" if (a and "error" in a) or (b and "error" in b) else "only in " + ("new" if b else "old")
+            print(f"{name:<48}{'(' + state + ')':>45}")
+            continue
+        d_time, d_trips = pct(a["median_ms"], b["median_ms"]), pct(a["round_trips"], b["round_trips"])
+        flag = ""
+        if fail_over is not None and (d_time > fail_over or d_trips > fail_over):
+            regressions.append(name)
+            flag = "  ⚠️"
+        print(f"{name:<48}{a['median_ms']:>10}{b['median_ms']:>10}{d_time:>+8.1f}%"
+              f"{a['round_trips']:>8}{b['round_trips']:>8}{flag}")
+    print(f"\ncommits {old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every public service function against the stand-in backend")
+    parser.add_argument("--seed", choices=sorted(SEED_SIZES), default="small")
+    parser.add_argument("--rows", nargs="*", default=[], metavar="NAME=N", help="override seed sizes, e.g. orders=200000")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="injected backend latency per call")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="stop a case after this long (min 3 rounds)")
+    parser.add_argument("--only", help="regex: run only matching functions")
+    parser.add_argument("--output", default="bench_services.json")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    parser.add_argument("--fail-over", type=float, help="exit 1 if a median or round-trip count grows by more than this %%")
+    args = parser.parse_args()
+
+    spec = dict(SEED_SIZES[args.seed])
+    for item in args.rows:
+        name, _, count = item.partition("=")
+        if name not in spec:
+            parser.error(f"unknown seed size {name!r}; choose from {sorted(spec)}")
+        spec[name] = int(count)
+
+    print(f"🌱 Seeding stand-in: {spec}")
+    t0 = time.perf_counter()
+    backend = StandinServer(latency_ms=0, seed=spec).start()
+    print(f"   seeded in {time.perf_counter() - t0:.1f}s")
+    os.environ["SUPABASE_URL"] = backend.url
+    os.environ.setdefault("CATALOG_SNAPSHOT_DIR", os.path.join(ROOT, ".snapshots", "bench-services"))
+    sys.path.insert(0, ROOT)
+    from src.service import (auth_service, customer_service, notification_service, order_item_service,
+                             order_service, pricing_service, product_service, review_service, sales_service,
+                             segmentation_service, shop_service, stock_monitor_service)
+
+    backend.db.latency_ms = args.latency_ms
+    ctx = Context(spec, backend.db)
+    selected = {name: fn for name, fn in cases((
+        auth_service, customer_service, notification_service, order_item_service, order_service,
+        pricing_service, product_service, review_service, sales_service, segmentation_service,
+        shop_service, stock_monitor_service)).items() if not args.only or re.search(args.only, name)}
+
+    results = {}
+    try:
+        for name, fn in selected.items():
+            try:
+                results[name] = run_case(fn, ctx, backend.db, args.rounds, args.max_seconds)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+            r = results[name]
+            if "error" in r:
+                print(f"{name:<48} ❌ {r['error']}")
+            else:
+                print(f"{name:<48} median {r['median_ms']:>9} ms  p95 {r['p95_ms']:>9} ms  "
+                      f"cold {r['cold_ms']:>9} ms  trips {r['round_trips']}")
+    finally:
+        backend.stop()
+
+    report = {
+        "meta": {"created_at": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+                 "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "fail_over")},
+                 "seed": spec},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.fail_over)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions over {args.fail_over}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
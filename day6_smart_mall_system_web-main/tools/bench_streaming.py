@@ -0,0 +1,115 @@
+# tools/bench_streaming.py
+"""
+Time-to-first-byte and peak memory of the admin table views, buffered vs
+streamed.
+
+The stand-in backend runs in its own process, seeded with --rows rows in
+the product, customer and notification tables. The Flask app runs
+in-process so tracemalloc sees only its allocations.
+
+    buffered: fetch every page into a list, then render_template (the old path)
+    streamed: GET the route, which pages through the DAO iterator and
+              flushes the template as rows arrive
+
+Usage:
+    python -m tools.bench_streaming --rows 100000 --latency-ms 10 --output streaming.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VIEWS = {
+    "/product_table": ("product_table.html", "products", "product_service", "iter_products"),
+    "/view_customers": ("view_customers.html", "customers", "customer_service", "iter_customers"),
+    "/admin/notifications": ("admin_notifications.html", "notifications", "notification_service", "iter_all_notifications"),
+}
+
+
+def start_backend(port, rows, latency_ms):
+    cmd = [sys.executable, "-m", "tools.standin_backend", "--port", str(port), "--seed", "tiny",
+           "--latency-ms", str(latency_ms),
+           "--rows", f"products={rows}", f"customers={rows}", f"notifications={rows}"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(1200):
+        try:
+            urllib.request.urlopen(url + "/__admin/stats", timeout=1)
+            return proc, url
+        except Exception:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("stand-in backend did not start")
+
+
+def measure(fn):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    ttfb, size = fn(t0)
+    total = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ttfb_ms": round(ttfb * 1000, 1), "total_ms": round(total * 1000, 1),
+            "peak_mib": round(peak / 2 ** 20, 2), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buffered vs streamed admin tables")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=54331)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    backend, url = start_backend(args.port, args.rows, args.latency_ms)
+    os.environ["SUPABASE_URL"] = url
+    sys.path.insert(0, ROOT)
+    try:
+        import app as web
+        from flask import render_template
+
+        client = web.app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"], sess["role"] = 1, "admin"
+
+        results = {}
+        for path, (template, name, service, func) in VIEWS.items():
+            iterate = getattr(getattr(web, service), func)
+
+            def buffered(t0):
+                with web.app.test_request_context(path):
+                    rows = list(iterate())
+                    html = render_template(template, **{name: rows})
+                return time.perf_counter() - t0, len(html.encode())
+
+            def streamed(t0):
+                resp = client.get(path, buffered=False)
+                ttfb, size = None, 0
+                for chunk in resp.response:
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - t0
+                    size += len(chunk)
+                resp.close()
+                return ttfb, size
+
+            results[path] = {"buffered": measure(buffered), "streamed": measure(streamed)}
+            print(f"{path:<22} buffered {results[path]['buffered']}")
+            print(f"{'':<22} streamed {results[path]['streamed']}")
+    finally:
+        backend.terminate()
+        backend.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
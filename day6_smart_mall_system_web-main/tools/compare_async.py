@@ -0,0 +1,107 @@
+# tools/compare_async.py
+"""
+Requests/sec of the Flask app (app.py) vs the ASGI app (asgi_app.py).
+
+Both apps are started as subprocesses against the same local stand-in
+backend (tools/standin_backend.py) with an injected per-call latency,
+then hammered with the same concurrent admin session for a fixed time.
+Run the stand-in in its own process (--backend-url) on multi-core boxes so
+it does not share a GIL with the load generator.
+
+Usage:
+    python -m tools.compare_async --latency-ms 20 --concurrency 32 --duration 15
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+
+from tools.loadtest import login, start_app
+from tools.standin_backend import StandinServer
+
+PATHS = ["/dashboard", "/api/products", "/view_sales", "/product_table"]
+
+
+def hammer(base, concurrency, duration):
+    openers = [login(base) for _ in range(concurrency)]
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(opener, offset):
+        i = offset
+        while time.perf_counter() < stop_at:
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                opener.open(base + path, timeout=30).read()
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies.append(elapsed)
+            except (urllib.error.URLError, OSError):
+                with lock:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(o, n)) for n, o in enumerate(openers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1) if latencies else None
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / wall, 1),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask vs ASGI throughput on the stand-in backend")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--seed", default="small")
+    parser.add_argument("--backend-url", help="use an already running stand-in instead of an in-process one")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    backend = None
+    if args.backend_url:
+        backend_url = args.backend_url
+    else:
+        backend = StandinServer(latency_ms=args.latency_ms, seed=args.seed).start()
+        backend_url = backend.url
+
+    results = {}
+    try:
+        for kind, port in (("flask", 5101), ("asgi", 5102)):
+            proc, base = start_app(kind, port, backend_url)
+            try:
+                results[kind] = hammer(base, args.concurrency, args.duration)
+            finally:
+                proc.terminate()
+                proc.wait()
+            print(f"{kind:>6}: {results[kind]}")
+    finally:
+        if backend:
+            backend.stop()
+
+    if results["flask"]["rps"]:
+        print(f"\n⚡ ASGI / Flask throughput: {results['asgi']['rps'] / results['flask']['rps']:.2f}x")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+# tools/loadtest.py
+"""
+Load test for the smart mall web app.
+
+Starts app.py (or asgi_app.py) against the local stand-in backend with a
+configurable injected latency, then drives scripted user journeys from N
+virtual users that are ramped up over --ramp seconds:
+
+    customer: signup -> login -> search -> add review -> view history
+    admin:    login -> add product -> send notification
+
+Writes a JSON report with overall throughput and, per route, request
+count, error rate and p50/p95/p99 latency. Pass --compare with an older
+report to print the change per route.
+
+Usage:
+    python -m tools.loadtest --concurrency 20 --ramp 5 --duration 30 --latency-ms 25 --output report.json
+    python -m tools.loadtest ... --compare baseline.json
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from tools.standin_backend import ADMIN_EMAIL, PASSWORD, SEED_SIZES, StandinServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ----------------------------------------------------------------------
+# App process
+# ----------------------------------------------------------------------
+def start_app(kind, port, backend_url):
+    """Start app.py ("flask") or asgi_app.py ("asgi") and wait until it answers."""
+    env = dict(os.environ, SUPABASE_URL=backend_url)
+    if kind == "flask":
+        cmd = [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port), "--no-reload", "--with-threads"]
+    else:
+        cmd = [sys.executable, "-m", "hypercorn", "asgi_app:app", "--bind", f"127.0.0.1:{port}"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            urllib.request.urlopen(base + "/login", timeout=1)
+            return proc, base
+        except Exception:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{kind} app did not start on port {port}")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def new_session(follow_redirects=True):
+    jar = http.cookiejar.CookieJar()
+    handlers = [urllib.request.HTTPCookieProcessor(jar)]
+    if not follow_redirects:
+        handlers.append(_NoRedirect())
+    return urllib.request.build_opener(*handlers)
+
+
+def login(base, email=ADMIN_EMAIL, password=PASSWORD):
+    opener = new_session()
+    data = urllib.parse.urlencode({"email": email, "password": password}).encode()
+    opener.open(base + "/login", data=data, timeout=10)
+    return opener
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(q * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+# ----------------------------------------------------------------------
+# Recording
+# ----------------------------------------------------------------------
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def call(self, opener, base, route, path=None, form=None):
+        """Issue one request; 2xx and 3xx count as success."""
+        path = path or route.split(" ", 1)[1]
+        data = urllib.parse.urlencode(form).encode() if form is not None else None
+        t0 = time.perf_counter()
+        ok, detail = True, None
+        try:
+            with opener.open(base + path, data=data, timeout=60) as resp:
+                resp.read()
+        except urllib.error.HTTPError as e:
+            e.read()
+            if e.code >= 400:
+                ok, detail = False, f"HTTP {e.code}"
+        except (urllib.error.URLError, OSError) as e:
+            ok, detail = False, str(e)
+        elapsed = time.perf_counter() - t0
+        with self.lock:
+            self.latencies[route].append(elapsed)
+            if not ok:
+                self.errors[route] += 1
+                self.error_samples.setdefault(route, detail)
+        return ok
+
+    def report(self, wall_seconds):
+        routes = {}
+        total = errors = 0
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            count, failed = len(values), self.errors.get(route, 0)
+            total += count
+            errors += failed
+            ms = lambda v: round(v * 1000, 2) if v is not None else None
+            routes[route] = {
+                "count": count,
+                "errors": failed,
+                "error_rate": round(failed / count, 4) if count else 0.0,
+                "rps": round(count / wall_seconds, 2),
+                "mean_ms": ms(sum(values) / count) if count else None,
+                "p50_ms": ms(percentile(values, 0.50)),
+                "p95_ms": ms(percentile(values, 0.95)),
+                "p99_ms": ms(percentile(values, 0.99)),
+                "max_ms": ms(values[-1]) if values else None,
+            }
+            if route in self.error_samples:
+                routes[route]["first_error"] = self.error_samples[route]
+        summary = {
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "throughput_rps": round(total / wall_seconds, 2),
+            "wall_seconds": round(wall_seconds, 2),
+        }
+        return summary, routes
+
+
+# ----------------------------------------------------------------------
+# Journeys
+# ----------------------------------------------------------------------
+SEARCH_TERMS = ["Shirt", "Shoes", "Bag", "Watch", "Phone", "Lamp"]
+REVIEW_TEXT = ["great quality", "zipper broke after a week", "late delivery", "fits well", "colour faded"]
+
+
+def customer_journey(rec, base, rng, seed_spec):
+    opener = new_session(follow_redirects=False)
+    email = f"lt-{uuid.uuid4().hex[:12]}@mall.test"
+    rec.call(opener, base, "POST /signup", form={"name": email.split("@")[0], "email": email,
+                                                 "password": PASSWORD, "role": "customer"})
+    rec.call(opener, base, "POST /login", form={"email": email, "password": PASSWORD})
+    rec.call(opener, base, "POST /search_product", form={"prod_type": rng.choice(SEARCH_TERMS)})
+    rec.call(opener, base, "POST /add_review", form={"prod_id": rng.randint(1, max(seed_spec["products"], 1)),
+                                                     "rating": rng.randint(1, 5),
+                                                     "comment": rng.choice(REVIEW_TEXT)})
+    rec.call(opener, base, "GET /view_history")
+
+
+def admin_journey(rec, base, rng, seed_spec):
+    opener = new_session(follow_redirects=False)
+    rec.call(opener, base, "POST /login", form={"email": ADMIN_EMAIL, "password": PASSWORD})
+    rec.call(opener, base, "POST /add_product", form={"prod_type": rng.choice(SEARCH_TERMS), "brand": "loadtest",
+                                                      "color": "multi", "price": round(rng.uniform(50, 500), 2),
+                                                      "stock": rng.randint(1, 50)})
+    notify = date.today() + timedelta(days=rng.randint(0, 10))
+    rec.call(opener, base, "POST /send_notification", form={"cust_id": rng.randint(1, max(seed_spec["customers"], 1)),
+                                                            "type": "Offer", "message": "load test",
+                                                            "notify_date": notify.isoformat()})
+
+
+def run_load(base, concurrency, ramp, duration, admin_ratio, seed_spec, rng_seed=1):
+    rec = Recorder()
+    started = time.perf_counter()
+    stop_at = started + ramp + duration
+
+    def user(n):
+        rng = random.Random(rng_seed + n)
+        delay = ramp * n / max(concurrency, 1)
+        time.sleep(delay)
+        while time.perf_counter() < stop_at:
+            if rng.random() < admin_ratio:
+                admin_journey(rec, base, rng, seed_spec)
+            else:
+                customer_journey(rec, base, rng, seed_spec)
+
+    threads = [threading.Thread(target=user, args=(n,), daemon=True) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return rec.report(time.perf_counter() - started)
+
+
+# ----------------------------------------------------------------------
+# Comparison
+# ----------------------------------------------------------------------
+def compare(old, new):
+    """Print per-route change between two reports (negative latency delta = faster)."""
+    def pct(a, b):
+        return f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+
+    print(f"\n{'route':<26}{'p95 old':>10}{'p95 new':>10}{'Δp95':>9}{'rps old':>10}{'rps new':>10}{'Δrps':>9}")
+    for route in sorted(set(old["routes"]) | set(new["routes"])):
+        a, b = old["routes"].get(route), new["routes"].get(route)
+        if not a or not b:
+            print(f"{route:<26}{'(only in ' + ('new' if b else 'old') + ')':>40}")
+            continue
+        print(f"{route:<26}{a['p95_ms']:>10}{b['p95_ms']:>10}{pct(a['p95_ms'], b['p95_ms']):>9}"
+              f"{a['rps']:>10}{b['rps']:>10}{pct(a['rps'], b['rps']):>9}")
+    so, sn = old["summary"], new["summary"]
+    print(f"\nthroughput {so['throughput_rps']} -> {sn['throughput_rps']} rps ({pct(so['throughput_rps'], sn['throughput_rps'])}), "
+          f"error rate {so['error_rate']} -> {sn['error_rate']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the smart mall web app against the stand-in backend")
+    parser.add_argument("--app", choices=["flask", "asgi"], default="flask")
+    parser.add_argument("--port", type=int, default=5111)
+    parser.add_argument("--concurrency", type=int, default=20, help="number of virtual users")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds to start all users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds at full concurrency")
+    parser.add_argument("--admin-ratio", type=float, default=0.1, help="share of journeys that are admin journeys")
+    parser.add_argument("--latency-ms", type=float, default=25.0, help="injected backend latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--seed", choices=sorted(SEED_SIZES), default="small")
+    parser.add_argument("--backend-url", help="use an already running stand-in instead of an in-process one")
+    parser.add_argument("--output", default="loadtest_report.json")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    backend = None
+    if args.backend_url:
+        backend_url = args.backend_url
+    else:
+        backend = StandinServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed).start()
+        backend_url = backend.url
+
+    try:
+        proc, base = start_app(args.app, args.port, backend_url)
+        try:
+            print(f"🚦 {args.concurrency} users, ramp {args.ramp}s, {args.duration}s at {args.latency_ms}ms backend latency ...")
+            summary, routes = run_load(base, args.concurrency, args.ramp, args.duration,
+                                       args.admin_ratio, SEED_SIZES[args.seed])
+        finally:
+            proc.terminate()
+            proc.wait()
+    finally:
+        if backend:
+            backend.stop()
+
+    report = {
+        "meta": {"created_at": datetime.now().isoformat(timespec="seconds"),
+                 "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")}},
+        "summary": summary,
+        "routes": routes,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(summary, indent=2))
+    for route, stats in routes.items():
+        print(f"{route:<26} n={stats['count']:<6} err={stats['error_rate']:<7} "
+              f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms")
+    print(f"📝 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,647 @@
+# tools/standin_backend.py
+"""
+Local stand-in for the Supabase REST API (PostgREST subset).
+
+Serves /rest/v1/<table> from in-memory tables so app.py, streamlit_app.py
+and the async app can run against it unchanged -- point SUPABASE_URL at
+http://127.0.0.1:<port>. Supports the query features the DAO layer uses:
+select, eq/neq/gt/gte/lt/lte/like/ilike/in/is filters, order, offset/limit,
+insert, upsert (on_conflict), update, delete, count=exact and text/csv.
+
+Every request can be slowed down by an injected latency (plus jitter) to
+mimic the network hop to the hosted database. A share of requests
+(--slow-rate) can be held for --slow-ms to produce a latency tail. Request counts per
+table/method are exposed at GET /__admin/stats.
+
+--pool caps how many requests the database works on at once (the rest
+queue), and --row-cost-us charges selects per row returned, so heavy
+listings and checkout writes compete the way they do on one Postgres.
+
+--replica-port starts a second, read-only server that applies the
+primary's writes --replica-lag-ms later, to exercise SUPABASE_READ_URL
+routing (src/routing.py).
+
+Usage:
+    python -m tools.standin_backend --port 54321 --latency-ms 25 --seed small
+    python -m tools.standin_backend --pool 4 --row-cost-us 50 --replica-port 54322 --replica-lag-ms 500
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+PRIMARY_KEYS = {
+    "users": "user_id",
+    "customer": "cust_id",
+    "shop": "shop_id",
+    "sales": "sale_id",
+    "product": "prod_id",
+    "orders": "order_id",
+    "order_items": "order_item_id",
+    "notification": "notification_id",
+    "reviews": "review_id",
+    "customer_segment": "cust_id",
+}
+
+SEED_SIZES = {
+    "tiny": dict(customers=20, shops=5, sales=3, products=50, orders=40, items_per_order=2, reviews=60, notifications=40),
+    "small": dict(customers=500, shops=40, sales=10, products=2000, orders=3000, items_per_order=3, reviews=4000, notifications=2000),
+    "medium": dict(customers=10000, shops=200, sales=50, products=20000, orders=50000, items_per_order=3, reviews=50000, notifications=20000),
+    # service benchmark volumes (tools/bench_services.py): several GB of RAM
+    "large": dict(customers=100000, shops=500, sales=100, products=100000, orders=1000000, items_per_order=5, reviews=500000, notifications=200000),
+}
+
+# tables whose updated_at is maintained like the production trigger does
+TIMESTAMPED = {"product", "shop", "sales"}
+
+ADMIN_EMAIL = "admin@mall.test"
+CUSTOMER_EMAIL = "customer@mall.test"
+PASSWORD = "password"
+
+
+def _norm(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _now():
+    return datetime.now().isoformat(timespec="microseconds")
+
+
+def _coerce(raw, sample):
+    """Convert a filter literal to the type of the stored value."""
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, (int, float)):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _like_to_regex(pattern, flags=0):
+    parts = [re.escape(p) for p in pattern.split("%")]
+    return re.compile("^" + ".*".join(parts) + "$", flags | re.DOTALL)
+
+
+class Table:
+    def __init__(self, name, pk):
+        self.name = name
+        self.pk = pk
+        self.rows = []
+        self.by_pk = {}
+        self.next_id = 1
+        self._indexes = {}   # column -> {normalized value: [rows]}
+
+    def insert(self, row):
+        row = dict(row)
+        if row.get(self.pk) is None:
+            row[self.pk] = self.next_id
+        self.next_id = max(self.next_id, int(row[self.pk]) + 1)
+        self.rows.append(row)
+        self.by_pk[_norm(row[self.pk])] = row
+        for column, index in self._indexes.items():
+            index.setdefault(_norm(row.get(column)), []).append(row)
+        return row
+
+    def invalidate(self):
+        self._indexes = {}
+
+    def lookup(self, column, value):
+        if column == self.pk:
+            row = self.by_pk.get(value)
+            return [row] if row is not None else []
+        index = self._indexes.get(column)
+        if index is None:
+            index = {}
+            for row in self.rows:
+                index.setdefault(_norm(row.get(column)), []).append(row)
+            self._indexes[column] = index
+        return index.get(value, [])
+
+    def delete(self, doomed):
+        ids = {id(r) for r in doomed}
+        self.rows = [r for r in self.rows if id(r) not in ids]
+        for row in doomed:
+            self.by_pk.pop(_norm(row[self.pk]), None)
+        self.invalidate()
+
+
+class StandinDB:
+    def __init__(self):
+        self.tables = {name: Table(name, pk) for name, pk in PRIMARY_KEYS.items()}
+        self.lock = threading.RLock()
+        self.latency_ms = 0.0
+        self.jitter_ms = 0.0
+        self.slow_rate = 0.0
+        self.slow_ms = 0.0
+        self.row_cost_us = 0.0
+        self.stats = Counter()
+        self.replicas = []          # ReplicaDBs fed with every committed change
+        self._pool = None
+
+    def set_pool(self, size):
+        """Let at most `size` requests run at once (None = unlimited)."""
+        self._pool = threading.BoundedSemaphore(size) if size else None
+
+    def slot(self):
+        return self._pool if self._pool is not None else nullcontext()
+
+    def _publish(self, name, rows, deleted=False):
+        for replica in self.replicas:
+            replica.enqueue(name, rows, deleted)
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = Table(name, "id")
+        return self.tables[name]
+
+    # ------------------------------------------------------------------
+    # Query evaluation
+    # ------------------------------------------------------------------
+    def _filter(self, table, filters):
+        candidates = None
+        rest = []
+        for column, op, raw in filters:
+            if op == "eq" and candidates is None:
+                candidates = table.lookup(column, raw)
+            else:
+                rest.append((column, op, raw))
+        rows = table.rows if candidates is None else candidates
+        for column, op, raw in rest:
+            rows = [r for r in rows if self._match(r.get(column), op, raw)]
+        return list(rows)
+
+    def _match(self, value, op, raw):
+        if op == "is":
+            return (value is None) if raw == "null" else _norm(value) == raw.lower()
+        if op == "in":
+            options = {v.strip().strip('"') for v in raw.strip("()").split(",")}
+            return _norm(value) in options
+        if value is None:
+            return False
+        if op == "eq":
+            return _norm(value) == raw
+        if op == "neq":
+            return _norm(value) != raw
+        if op in ("like", "ilike"):
+            regex = _like_to_regex(raw.replace("*", "%"), re.IGNORECASE if op == "ilike" else 0)
+            return bool(regex.match(str(value)))
+        target = _coerce(raw, value)
+        left = float(value) if isinstance(target, float) else str(value)
+        if op == "gt":
+            return left > target
+        if op == "gte":
+            return left >= target
+        if op == "lt":
+            return left < target
+        if op == "lte":
+            return left <= target
+        return True
+
+    @staticmethod
+    def _sort(rows, order):
+        for part in reversed([p for p in order.split(",") if p]):
+            bits = part.split(".")
+            column, desc = bits[0], "desc" in bits[1:]
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=desc)
+            rows = present + missing
+        return rows
+
+    @staticmethod
+    def _project(rows, select):
+        if not select or select.strip() == "*":
+            return [dict(r) for r in rows]
+        columns = [c.strip() for c in select.split(",") if c.strip()]
+        return [{c: r.get(c) for c in columns} for r in rows]
+
+    def select(self, name, params):
+        with self.lock:
+            table = self.table(name)
+            rows = self._filter(table, params["filters"])
+            total = len(rows)
+            if params.get("order"):
+                rows = self._sort(rows, params["order"])
+            offset = int(params.get("offset") or 0)
+            limit = params.get("limit")
+            rows = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+            return self._project(rows, params.get("select")), total, offset
+
+    def insert(self, name, payload, on_conflict=None):
+        records = payload if isinstance(payload, list) else [payload]
+        out = []
+        with self.lock:
+            table = self.table(name)
+            for record in records:
+                record = self._with_defaults(name, record)
+                existing = None
+                if on_conflict:
+                    key = _norm(record.get(on_conflict))
+                    matches = table.lookup(on_conflict, key)
+                    existing = matches[0] if matches else None
+                if existing is not None:
+                    existing.update(record)
+                    table.invalidate()
+                    out.append(dict(existing))
+                else:
+                    out.append(dict(table.insert(record)))
+            self._publish(name, out)
+        return out
+
+    def update(self, name, params, changes):
+        with self.lock:
+            table = self.table(name)
+            rows = self._filter(table, params["filters"])
+            if name in TIMESTAMPED:
+                changes = dict(changes, updated_at=_now())
+            for row in rows:
+                row.update(changes)
+            if rows:
+                table.invalidate()
+            out = [dict(r) for r in rows]
+            self._publish(name, out)
+            return out
+
+    def delete(self, name, params):
+        with self.lock:
+            table = self.table(name)
+            rows = self._filter(table, params["filters"])
+            table.delete(rows)
+            out = [dict(r) for r in rows]
+            self._publish(name, out, deleted=True)
+            return out
+
+    @staticmethod
+    def _with_defaults(name, record):
+        record = dict(record)
+        now = datetime.now().isoformat(timespec="seconds")
+        if name == "reviews":
+            record.setdefault("created_at", now)
+        elif name == "orders":
+            record.setdefault("order_date", now)
+        elif name == "customer":
+            record.setdefault("loyalty_points", 0)
+        if name in TIMESTAMPED:
+            record["updated_at"] = _now()
+        return record
+
+    # ------------------------------------------------------------------
+    # Seeding
+    # ------------------------------------------------------------------
+    def seed(self, customers=20, shops=5, sales=3, products=50, orders=40,
+             items_per_order=2, reviews=60, notifications=40, rng_seed=7):
+        rng = random.Random(rng_seed)
+        hashed = hashlib.sha256(PASSWORD.encode()).hexdigest()
+        types = ["Shirt", "Jeans", "Shoes", "Bag", "Watch", "Jacket", "Dress", "Phone", "Headphones", "Lamp"]
+        brands = ["local", "Nike", "Puma", "Levis", "Zara", "Apple", "Sony", "Boat", "Titan", "H&M"]
+        colors = ["red", "blue", "black", "white", "green", "multi"]
+        categories = ["Fashion", "Electronics", "Food", "Sports", "Home", "Books"]
+        words = ["great", "quality", "broken", "zipper", "late", "delivery", "fits", "well", "cheap",
+                 "material", "fast", "shipping", "color", "faded", "excellent", "battery", "poor", "value"]
+        today = date.today()
+        with self.lock:
+            stamp = _now()
+            insert = lambda name, row: self.table(name).insert(
+                dict(row, updated_at=stamp) if name in TIMESTAMPED else row)
+            insert("users", {"email": ADMIN_EMAIL, "password": hashed, "role": "admin"})
+            insert("users", {"email": CUSTOMER_EMAIL, "password": hashed, "role": "customer"})
+            for i in range(1, customers + 1):
+                insert("customer", {"name": f"customer{i}", "email": f"customer{i}@mall.test",
+                                    "phone": f"98{i:08d}", "loyalty_points": rng.randint(0, 500)})
+            for i in range(1, shops + 1):
+                insert("shop", {"name": f"Shop {i}", "owner": f"Owner {i}",
+                                "location": f"Floor {rng.randint(0, 3)}, Zone {rng.choice('ABCD')}",
+                                "category": rng.choice(categories)})
+            for i in range(1, sales + 1):
+                insert("sales", {"sale_name": f"Sale {i}", "discount": float(rng.choice([5, 10, 15, 20, 25, 40]))})
+            for i in range(1, products + 1):
+                on_sale = sales > 0 and rng.random() < 0.2
+                insert("product", {"prod_type": rng.choice(types), "brand": rng.choice(brands),
+                                   "color": rng.choice(colors), "price": round(rng.uniform(50, 5000), 2),
+                                   "stock": rng.randint(0, 200), "on_sale": on_sale,
+                                   "sale_id": rng.randint(1, sales) if on_sale else None})
+            item_table = self.table("order_items")
+            for i in range(1, orders + 1):
+                placed = today - timedelta(days=rng.randint(0, 720))
+                total = 0.0
+                for _ in range(items_per_order):
+                    prod_id = rng.randint(1, max(products, 1))
+                    qty = rng.randint(1, 3)
+                    price = round(rng.uniform(50, 5000), 2)
+                    total += qty * price
+                    item_table.insert({"order_id": i, "prod_id": prod_id, "quantity": qty, "price": price})
+                insert("orders", {"cust_id": rng.randint(1, max(customers, 1)), "shop_id": rng.randint(1, max(shops, 1)),
+                                  "total_amount": round(total, 2), "order_date": placed.isoformat(),
+                                  "return_due_date": (placed + timedelta(days=14)).isoformat()})
+            for i in range(1, reviews + 1):
+                insert("reviews", {"cust_id": rng.randint(1, max(customers, 1)), "prod_id": rng.randint(1, max(products, 1)),
+                                   "rating": float(rng.randint(1, 5)),
+                                   "comment": " ".join(rng.choice(words) for _ in range(rng.randint(3, 12))),
+                                   "created_at": (today - timedelta(days=rng.randint(0, 365))).isoformat()})
+            for i in range(1, notifications + 1):
+                notify = today + timedelta(days=rng.randint(-30, 30))
+                insert("notification", {"cust_id": rng.randint(1, max(customers, 1)), "type": rng.choice(["Order", "Sale", "Reminder"]),
+                                        "message": f"Notification {i}", "related_id": None,
+                                        "notify_date": notify.isoformat(), "read": False,
+                                        "delivered": notify <= today})
+
+
+class ReadOnlyError(Exception):
+    """Writes sent to a replica (Postgres SQLSTATE 25006)."""
+
+
+class ReplicaDB(StandinDB):
+    """
+    Read-only copy of a primary StandinDB. Every write committed on the
+    primary becomes visible here lag_ms later, in commit order, like
+    streaming replication.
+    """
+
+    def __init__(self, primary, lag_ms=0.0):
+        super().__init__()
+        self.lag_ms = lag_ms
+        self._pending = deque()     # (apply_at, table, rows, deleted)
+        with primary.lock:
+            for name, source in primary.tables.items():
+                table = self.table(name)
+                table.pk = source.pk
+                for row in source.rows:
+                    table.insert(dict(row))
+                table.next_id = source.next_id
+            primary.replicas.append(self)
+
+    def enqueue(self, name, rows, deleted):
+        with self.lock:
+            self._pending.append((time.monotonic() + self.lag_ms / 1000.0, name, rows, deleted))
+
+    def catch_up(self):
+        now = time.monotonic()
+        with self.lock:
+            while self._pending and self._pending[0][0] <= now:
+                _, name, rows, deleted = self._pending.popleft()
+                table = self.table(name)
+                if deleted:
+                    table.delete([r for r in (table.by_pk.get(_norm(row[table.pk])) for row in rows) if r is not None])
+                    continue
+                for row in rows:
+                    existing = table.by_pk.get(_norm(row[table.pk]))
+                    if existing is not None:
+                        existing.update(row)
+                        table.invalidate()
+                    else:
+                        table.insert(dict(row))
+
+    def select(self, name, params):
+        self.catch_up()
+        return super().select(name, params)
+
+    def insert(self, name, payload, on_conflict=None):
+        raise ReadOnlyError("cannot execute INSERT in a read-only transaction")
+
+    def update(self, name, params, changes):
+        raise ReadOnlyError("cannot execute UPDATE in a read-only transaction")
+
+    def delete(self, name, params):
+        raise ReadOnlyError("cannot execute DELETE in a read-only transaction")
+
+
+def _parse_params(query):
+    params = {"filters": []}
+    for key, value in parse_qsl(query, keep_blank_values=True):
+        if key in ("select", "order", "offset", "limit", "on_conflict", "columns"):
+            params[key] = value
+        elif "." in value:
+            op, _, raw = value.partition(".")
+            params["filters"].append((key, op, raw))
+    return params
+
+
+def _to_csv(rows):
+    if not rows:
+        return ""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(rows[0].keys()))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def make_handler(db):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # headers and body go out as separate writes; don't let Nagle +
+            # delayed ACK add ~40ms to every keep-alive request
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers=None, content_type="application/json"):
+            data = body if isinstance(body, bytes) else (body if isinstance(body, str) else json.dumps(body, default=str)).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"null") if length else None
+
+        def _delay(self):
+            delay = db.latency_ms + (random.uniform(0, db.jitter_ms) if db.jitter_ms else 0.0)
+            if db.slow_rate and random.random() < db.slow_rate:
+                delay += db.slow_ms
+            if delay > 0:
+                time.sleep(delay / 1000.0)
+
+        def _route(self, method):
+            parts = urlsplit(self.path)
+            if parts.path.startswith("/__admin/"):
+                return self._admin(method, parts.path[len("/__admin/"):])
+            if not parts.path.startswith("/rest/v1/"):
+                return self._send(404, {"message": "not found"})
+            name = parts.path[len("/rest/v1/"):].strip("/")
+            params = _parse_params(parts.query)
+            prefer = self.headers.get("Prefer", "")
+            with db.lock:
+                db.stats[f"{method} {name}"] += 1
+                db.stats["requests"] += 1
+            with db.slot():
+                self._delay()
+                try:
+                    return self._execute(method, name, params, prefer)
+                except ReadOnlyError as e:
+                    return self._send(405, {"code": "25006", "message": str(e)})
+
+        def _execute(self, method, name, params, prefer):
+            if method == "GET" or method == "HEAD":
+                rows, total, offset = db.select(name, params)
+                if db.row_cost_us and rows:
+                    time.sleep(len(rows) * db.row_cost_us / 1e6)
+                end = offset + len(rows) - 1
+                headers = {"Content-Range": f"{offset}-{max(end, offset)}/{total if 'count=' in prefer else '*'}"}
+                if "text/csv" in (self.headers.get("Accept") or ""):
+                    return self._send(200, _to_csv(rows), headers, "text/csv")
+                return self._send(200, rows, headers)
+            if method == "POST":
+                payload = self._body()
+                on_conflict = params.get("on_conflict") if "merge-duplicates" in prefer or "on_conflict" in params else None
+                rows = db.insert(name, payload, on_conflict)
+                return self._send(201, rows if "return=minimal" not in prefer else b"")
+            if method == "PATCH":
+                rows = db.update(name, params, self._body() or {})
+                return self._send(200, rows if "return=minimal" not in prefer else b"")
+            if method == "DELETE":
+                rows = db.delete(name, params)
+                return self._send(200, rows if "return=minimal" not in prefer else b"")
+            return self._send(405, {"message": "method not allowed"})
+
+        def _admin(self, method, action):
+            if action == "stats":
+                with db.lock:
+                    return self._send(200, dict(db.stats))
+            if action == "reset_stats":
+                with db.lock:
+                    db.stats.clear()
+                return self._send(200, {"status": "ok"})
+            if action == "latency" and method == "POST":
+                body = self._body() or {}
+                db.latency_ms = float(body.get("latency_ms", db.latency_ms))
+                db.jitter_ms = float(body.get("jitter_ms", db.jitter_ms))
+                db.slow_rate = float(body.get("slow_rate", db.slow_rate))
+                db.slow_ms = float(body.get("slow_ms", db.slow_ms))
+                db.row_cost_us = float(body.get("row_cost_us", db.row_cost_us))
+                if isinstance(db, ReplicaDB):
+                    db.lag_ms = float(body.get("lag_ms", db.lag_ms))
+                return self._send(200, {"latency_ms": db.latency_ms, "jitter_ms": db.jitter_ms,
+                                        "slow_rate": db.slow_rate, "slow_ms": db.slow_ms,
+                                        "row_cost_us": db.row_cost_us})
+            return self._send(404, {"message": "unknown admin action"})
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_HEAD(self):
+            self._route("HEAD")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def do_PATCH(self):
+            self._route("PATCH")
+
+        def do_DELETE(self):
+            self._route("DELETE")
+
+    return Handler
+
+
+class StandinServer:
+    """In-process stand-in backend running on a background thread."""
+
+    def __init__(self, port=0, latency_ms=0.0, jitter_ms=0.0, seed="tiny", db=None):
+        self.db = db if db is not None else StandinDB()
+        self.db.latency_ms = latency_ms
+        self.db.jitter_ms = jitter_ms
+        if seed and db is None:
+            spec = SEED_SIZES[seed] if isinstance(seed, str) else seed
+            self.db.seed(**spec)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), make_handler(self.db))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start_replica(self, port=0, lag_ms=0.0, latency_ms=None):
+        """Start a read-only replica of this server's database (see ReplicaDB)."""
+        replica = StandinServer(port, self.db.latency_ms if latency_ms is None else latency_ms,
+                                self.db.jitter_ms, seed=None, db=ReplicaDB(self.db, lag_ms))
+        return replica.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase REST stand-in")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests held for --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    parser.add_argument("--pool", type=int, default=0, help="requests served at once (0 = unlimited)")
+    parser.add_argument("--row-cost-us", type=float, default=0.0, help="extra time per row returned by a select")
+    parser.add_argument("--replica-port", type=int, default=0, help="also serve a read-only replica on this port")
+    parser.add_argument("--replica-lag-ms", type=float, default=500.0)
+    parser.add_argument("--replica-latency-ms", type=float, default=None)
+    parser.add_argument("--seed", choices=sorted(SEED_SIZES), default="small")
+    parser.add_argument("--rows", nargs="*", default=[], metavar="NAME=N",
+                        help="override seed sizes, e.g. products=100000 customers=50000")
+    args = parser.parse_args()
+
+    spec = dict(SEED_SIZES[args.seed])
+    for item in args.rows:
+        name, _, count = item.partition("=")
+        if name not in spec:
+            parser.error(f"unknown seed size {name!r}; choose from {sorted(spec)}")
+        spec[name] = int(count)
+
+    server = StandinServer(args.port, args.latency_ms, args.jitter_ms, spec)
+    server.db.slow_rate, server.db.slow_ms = args.slow_rate, args.slow_ms
+    server.db.row_cost_us = args.row_cost_us
+    server.db.set_pool(args.pool)
+    print(f"🧪 Stand-in backend on {server.url} (latency {args.latency_ms}ms ± {args.jitter_ms}ms, seed={args.seed})")
+    print(f"   export SUPABASE_URL={server.url}")
+    if args.replica_port:
+        replica = server.start_replica(args.replica_port, args.replica_lag_ms, args.replica_latency_ms)
+        replica.db.row_cost_us = args.row_cost_us
+        print(f"🧪 Read replica on {replica.url} (lag {args.replica_lag_ms}ms)")
+        print(f"   export SUPABASE_READ_URL={replica.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+'''Helpers shared by the day13 / day14 ETL scripts.
+
+The scripts run from their own scripts/ folder, so they add the repo root
+to sys.path before importing:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+    from etl_common import streaming
+'''
@@ -0,0 +1,124 @@
+'''BENCHMARK (etl_common/bench_loader.py)
+Load throughput against the local stand-in (etl_common/standin.py), and a
+check that every row lands exactly once while the stand-in injects 503s
+and rejects oversized bodies.
+
+Modes, each into a fresh table:
+  sequential   one batch of 200 at a time (what load.py used to do)
+  concurrent   `--workers` batches of 200 in flight
+  adaptive     `--workers` in flight, batch size adapted to latency/payload
+  resume       checkpointed upsert (etl_common/checkpoint.py) with a few bad
+               rows; the first run dies once --crash-at of the rows are in, the
+               rerun must finish without duplicates and dead-letter the bad rows
+
+Usage (from the repo root):
+python -m etl_common.bench_loader --rows 50000 --latency-ms 30 --fail-rate 0.02 --output bench_loader.json
+'''
+import argparse
+import json
+import os
+import tempfile
+
+import pandas as pd
+from supabase import create_client
+
+from etl_common import bulk_loader, checkpoint
+from etl_common.standin import StandinServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGED = os.path.join(ROOT, "day13", "ETL_telco_customer", "data", "staged", "telco_customers_transformed.csv")
+
+
+def sample_rows(rows):
+    base = pd.read_csv(STAGED)
+    base.columns = [c.lower() for c in base.columns]
+    frame = pd.concat([base] * (rows // len(base) + 1), ignore_index=True).iloc[:rows]
+    return frame.assign(row_no=range(rows))
+
+
+class Crash(Exception):
+    pass
+
+
+def resume_check(client, server, frame, args):
+    table = "bench_resume"
+    frame = frame.astype({"tenure": object})
+    bad = list(range(17, len(frame), max(len(frame) // 3, 1)))[:3]
+    frame.loc[bad, "tenure"] = "n/a"
+    work = tempfile.mkdtemp(prefix="bench-loader-")
+    source = os.path.join(work, "staged.csv")
+    frame.to_csv(source, index=False)
+    paths = dict(manifest_path=os.path.join(work, "manifest.json"), dead_letter_path=os.path.join(work, "dead_letter.csv"))
+    table_rows = lambda: len(server.db.tables.get(table, []))
+
+    def dying_log(line):
+        # dies after a batch was stored but before it was checkpointed
+        if line.startswith("✅ Inserted") and table_rows() >= args.crash_at * len(frame):
+            raise Crash()
+
+    options = dict(workers=args.workers, batch_size=200, backoff_seconds=0.05, key_column="row_no")
+    try:
+        checkpoint.load_resumable(client, table, frame, source, log=dying_log, **paths, **options)
+    except Crash:
+        pass
+    first_requests = server.db.stats["requests"]
+    with open(paths["manifest_path"]) as f:
+        committed_after_crash = json.load(f)["committed_rows"]
+    report = checkpoint.load_resumable(client, table, frame, source, log=lambda *_: None, **paths, **options)
+    stored = [row["row_key"] for row in server.db.rows(table)]
+    dead = pd.read_csv(paths["dead_letter_path"])
+    return dict(report.as_dict(), committed_after_crash=committed_after_crash,
+                rerun_requests=server.db.stats["requests"] - first_requests, stored=len(stored),
+                duplicates=len(stored) - len(set(stored)), expected=len(frame) - len(bad),
+                dead_letter_rows=sorted(dead["row_position"].tolist()), bad_rows=bad)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk loader throughput against the local stand-in")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--row-cost-us", type=float, default=50.0)
+    parser.add_argument("--pool", type=int, default=4)
+    parser.add_argument("--max-body-bytes", type=int, default=512_000)
+    parser.add_argument("--fail-rate", type=float, default=0.02)
+    parser.add_argument("--modes", nargs="*", default=["sequential", "concurrent", "adaptive", "resume"])
+    parser.add_argument("--crash-at", type=float, default=0.4, help="resume mode: share of rows stored when the first run dies")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    frame = sample_rows(args.rows)
+    server = StandinServer(latency_ms=args.latency_ms, row_cost_us=args.row_cost_us, pool=args.pool,
+                           max_body_bytes=args.max_body_bytes, fail_rate=args.fail_rate,
+                           column_types={"tenure": int}).start()
+    client = create_client(server.url, "stand-in-key")
+    modes = {
+        "sequential": dict(workers=1, batch_size=200, adaptive=False),
+        "concurrent": dict(workers=args.workers, batch_size=200, adaptive=False),
+        "adaptive": dict(workers=args.workers, batch_size=200, adaptive=True),
+    }
+    results = {}
+    try:
+        for mode in args.modes:
+            if mode == "resume":
+                results[mode] = resume_check(client, server, frame, args)
+                print(f"✅ {mode:<11} {results[mode]}")
+                continue
+            table = f"bench_{mode}"
+            report = bulk_loader.insert_rows(client, table, frame, backoff_seconds=0.05, log=lambda *_: None,
+                                             **modes[mode])
+            stored = [row["row_no"] for row in server.db.rows(table)]
+            results[mode] = dict(report.as_dict(), stored=len(stored), duplicates=len(stored) - len(set(stored)),
+                                 missing=args.rows - len(set(stored)))
+            print(f"✅ {mode:<11} {results[mode]}")
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
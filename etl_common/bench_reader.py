@@ -0,0 +1,93 @@
+'''BENCHMARK (etl_common/bench_reader.py)
+Full-table reads against the local stand-in (etl_common/standin.py), which
+caps every GET at --max-rows like Supabase does.
+
+Modes:
+  select_all   select("*").execute(), what analysis.py / validate.py used to do
+  paged_1      table_reader.read_table with one worker
+  paged_N      table_reader.read_table with --workers workers
+  aggregate    churn counts built page by page with table_reader.aggregate
+
+Each mode reports the rows it got (the table holds --rows), requests, seconds
+and rows/sec.
+
+Usage (from the repo root):
+python -m etl_common.bench_reader --rows 50000 --latency-ms 30 --output bench_reader.json
+'''
+import argparse
+import json
+import time
+from collections import Counter
+
+import pandas as pd
+from supabase import create_client
+
+from etl_common import table_reader
+from etl_common.bench_loader import sample_rows
+from etl_common.bulk_loader import json_rows, records
+from etl_common.standin import StandinServer
+
+TABLE = "telco_customer_data"
+
+
+class ChurnCounts:
+    def __init__(self):
+        self.counts = Counter()
+
+    def update(self, page):
+        self.counts.update(page["churn"].value_counts().to_dict())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paged table reads against the local stand-in")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--row-cost-us", type=float, default=5.0)
+    parser.add_argument("--pool", type=int, default=4)
+    parser.add_argument("--max-rows", type=int, default=1000)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    frame = sample_rows(args.rows)
+    server = StandinServer(pool=args.pool, max_rows=args.max_rows).start()
+    server.db.insert(TABLE, records(*json_rows(frame)))
+    server.db.latency_ms, server.db.row_cost_us = args.latency_ms, args.row_cost_us
+    client = create_client(server.url, "stand-in-key")
+    quiet = lambda *_: None
+    modes = {
+        "select_all": lambda: pd.DataFrame(client.table(TABLE).select("*").execute().data),
+        "paged_1": lambda: table_reader.read_table(client, TABLE, page_size=args.page_size, workers=1, log=quiet),
+        f"paged_{args.workers}": lambda: table_reader.read_table(client, TABLE, page_size=args.page_size,
+                                                                 workers=args.workers, log=quiet),
+        "aggregate": lambda: table_reader.aggregate(client, TABLE, ChurnCounts(), page_size=args.page_size,
+                                                    workers=args.workers),
+    }
+    expected_churn = frame["churn"].value_counts().to_dict()
+    results = {}
+    try:
+        for mode, read in modes.items():
+            before = server.db.stats["requests"]
+            t0 = time.perf_counter()
+            out = read()
+            seconds = time.perf_counter() - t0
+            if isinstance(out, ChurnCounts):
+                rows, complete = sum(out.counts.values()), dict(out.counts) == expected_churn
+            else:
+                rows = len(out)
+                complete = rows == args.rows and (mode == "select_all" or out["id"].is_unique)
+            results[mode] = {"rows": rows, "complete": complete, "requests": server.db.stats["requests"] - before,
+                             "seconds": round(seconds, 3), "rows_per_s": round(rows / seconds, 1)}
+            print(f"{'✅' if complete else '❌'} {mode:<11} {results[mode]}")
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
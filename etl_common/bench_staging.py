@@ -0,0 +1,64 @@
+'''BENCHMARK (etl_common/bench_staging.py)
+Staged file size and read/write time, CSV vs Parquet (etl_common/staging.py),
+on the telco staged data repeated to --rows rows. Also checks that the
+Parquet round trip gives back the same frame and the same CSV text.
+
+Usage (from the repo root):
+python -m etl_common.bench_staging --rows 1000000 --output bench_staging.json
+'''
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from etl_common import staging
+from etl_common.bench_loader import STAGED
+
+CATEGORIES = ["gender", "Partner", "Dependents", "PhoneService", "MultipleLines", "InternetService",
+              "OnlineSecurity", "OnlineBackup", "DeviceProtection", "TechSupport", "StreamingTV",
+              "StreamingMovies", "Contract", "PaperlessBilling", "PaymentMethod", "Churn",
+              "tenure_group", "monthly_charge_segment"]
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs Parquet staging")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    base = pd.read_csv(STAGED)
+    frame = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).iloc[:args.rows]
+    frame["contract_type_code"] = frame["contract_type_code"].astype("Int8")
+    work = tempfile.mkdtemp(prefix="bench-staging-")
+    results = {}
+    for fmt in ("csv", "parquet"):
+        path = os.path.join(work, "staged." + fmt)
+        _, write_s = timed(staging.write, frame.copy(), path, CATEGORIES, export=False)
+        back, read_s = timed(staging.read, path)
+        results[fmt] = {"bytes": os.path.getsize(path), "write_s": round(write_s, 3), "read_s": round(read_s, 3),
+                        "memory_bytes": int(back.memory_usage(deep=True).sum()),
+                        "dtypes_kept": {c: str(back[c].dtype) for c in ("Contract", "contract_type_code", "tenure_group")}}
+        if fmt == "parquet":
+            results[fmt]["same_csv_text"] = back.to_csv(index=False) == frame.to_csv(index=False)
+        print(f"✅ {fmt:<8} {results[fmt]}")
+    results["size_ratio"] = round(results["csv"]["bytes"] / results["parquet"]["bytes"], 2)
+    results["read_speedup"] = round(results["csv"]["read_s"] / results["parquet"]["read_s"], 2)
+    print(f"📈 Parquet is {results['size_ratio']}x smaller and reads {results['read_speedup']}x faster")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+        print(f"✅ Results saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+'''BULK LOADER (etl_common/bulk_loader.py)
+Concurrent, adaptive batch loads into a Supabase / PostgREST table.
+
+insert_rows(client, table, data) sends the rows of a DataFrame (or of an
+iterable of DataFrame chunks, e.g. pd.read_csv(..., chunksize=N)):
+
+  - Each chunk is converted to JSON-ready rows once (NaN/NA -> None);
+    batches are slices of that, not copies of the frame.
+  - Up to `workers` batches are in flight at once (thread pool).
+  - Batch size adapts (AIMD): it grows by `batch_size` rows while batches
+    finish under `target_seconds`, and halves when they are slower, needed
+    a retry or failed. It never goes over max_payload_bytes per request
+    (estimated from the JSON size of the chunk's first rows).
+  - Retryable errors (connection refused, 429/502/503/504, deadlocks,
+    statement timeouts) are retried with exponential backoff and full
+    jitter. A 413 splits the batch in two and lowers the payload cap to
+    the half that fit. Other errors fail the batch and
+    the load moves on; the failed row ranges are in the report.
+  - A timeout after the request was sent is ambiguous (the insert may have
+    committed), so it is retried only with retry_ambiguous=True, which is
+    safe when `send` upserts on a row key.
+  - With isolate_rows=True, a batch refused for a bad value or constraint
+    (SQLSTATE class 22/23) is bisected until the refused rows are alone;
+    they are reported as rejected and the rest of the batch is stored.
+
+It returns a LoadReport (rows, batches, retries, rows/sec, failures).
+'''
+import json
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+try:
+    import httpx
+except ImportError:       # only needed to classify network errors
+    httpx = None
+
+RETRYABLE_STATUS = {"408", "429", "502", "503", "504", "520"}
+# PostgREST connection errors, serialization failure, deadlock, statement
+# timeout, too many connections, connection exceptions (class 08)
+RETRYABLE_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "40001", "40P01", "57014", "53300"}
+
+
+class BatchError(Exception):
+    def __init__(self, start, end, error):
+        super().__init__(f"rows {start + 1}-{end}: {error}")
+        self.start, self.end, self.error = start, end, error
+
+
+def classify(error):
+    '''"retry", "ambiguous" (sent, outcome unknown), "too_large", "row" or "fatal".'''
+    if httpx is not None:
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return "retry"
+        if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+            return "ambiguous"
+    code = str(getattr(error, "code", "") or "")
+    if code == "413" or "Too Large" in str(error):
+        return "too_large"
+    if code[:2] in ("22", "23"):     # data exception / constraint violation: some row is bad
+        return "row"
+    if code in RETRYABLE_STATUS or code in RETRYABLE_CODES or code.startswith("08"):
+        return "retry"
+    return "fatal"
+
+
+class Batch:
+    '''One request: rows start:end of the load, with their frame index labels.'''
+
+    def __init__(self, start, labels, rows):
+        self.start, self.end = start, start + len(rows)
+        self.labels = labels
+        self.rows = rows
+        self.seconds = 0.0
+        self.retries = 0
+        self.splits = 0
+        self.rejected = []       # (position in batch, error): rows refused on their own
+        self.error = None        # the whole batch failed
+
+
+class LoadReport:
+    def __init__(self):
+        self.rows = 0            # rows committed
+        self.batches = 0
+        self.retries = 0
+        self.splits = 0
+        self.failures = []       # BatchError per failed batch
+        self.rejected = []       # (index label, error) per row refused on its own (isolate_rows)
+        self.seconds = 0.0
+        self.batch_sizes = []    # size chosen for each batch, in order
+
+    @property
+    def failed_rows(self):
+        return sum(f.end - f.start for f in self.failures)
+
+    @property
+    def rows_per_s(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {"rows": self.rows, "batches": self.batches, "retries": self.retries, "splits": self.splits,
+                "failed_batches": len(self.failures), "failed_rows": self.failed_rows, "rejected_rows": len(self.rejected),
+                "seconds": round(self.seconds, 3), "rows_per_s": round(self.rows_per_s, 1),
+                "final_batch_size": self.batch_sizes[-1] if self.batch_sizes else None}
+
+
+def records(columns, values):
+    return [dict(zip(columns, row)) for row in values]
+
+
+def json_rows(frame):
+    '''Columns and rows (lists of plain Python values, None for missing).'''
+    values = frame.to_numpy(dtype=object)
+    values[frame.isna().to_numpy()] = None
+    return list(frame.columns), values.tolist()
+
+
+class BulkLoader:
+    def __init__(self, send, workers=4, batch_size=200, min_batch=10, max_batch=5000, target_seconds=1.0,
+                 max_payload_bytes=1_000_000, retries=5, backoff_seconds=0.5, max_backoff_seconds=30.0,
+                 adaptive=True, retry_ambiguous=False, isolate_rows=False, on_batch=None, log=print):
+        self.send = send                      # send(list_of_row_dicts); raises on error
+        self.workers = workers
+        self.batch_size = batch_size
+        self.min_batch = min(min_batch, batch_size)
+        self.max_batch = max(max_batch, batch_size)
+        self.target_seconds = target_seconds
+        self.max_payload_bytes = max_payload_bytes
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.adaptive = adaptive
+        self.retry_ambiguous = retry_ambiguous
+        self.isolate_rows = isolate_rows
+        self.on_batch = on_batch              # on_batch(Batch) when a batch is done, main thread
+        self.log = log
+        self._size = batch_size
+        self._payload_cap = self.max_batch
+
+    # ------------------------------------------------------------------
+    # Sending one batch (worker thread)
+    # ------------------------------------------------------------------
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+    def _send_rows(self, batch, rows, base):
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            try:
+                self.send(rows)
+                batch.seconds = max(batch.seconds, time.perf_counter() - t0)
+                return
+            except Exception as e:
+                kind = classify(e)
+                if kind == "row" and not self.isolate_rows:
+                    kind = "fatal"
+                if kind in ("too_large", "row") and len(rows) > 1:
+                    # bisect: find the part that fits / the rows the server refuses
+                    batch.splits += kind == "too_large"
+                    half = len(rows) // 2
+                    self._send_rows(batch, rows[:half], base)
+                    self._send_rows(batch, rows[half:], base + half)
+                    return
+                if kind == "row":
+                    batch.rejected.append((base, e))
+                    return
+                if kind == "retry" or (kind == "ambiguous" and self.retry_ambiguous):
+                    if attempt < self.retries:
+                        time.sleep(self._backoff(attempt))
+                        attempt += 1
+                        batch.retries += 1
+                        continue
+                raise
+
+    def _send_batch(self, batch):
+        self._send_rows(batch, batch.rows, 0)
+        return batch
+
+    # ------------------------------------------------------------------
+    # Batch sizing (main thread)
+    # ------------------------------------------------------------------
+    def _next_size(self):
+        return min(self._payload_cap, max(self.min_batch, self._size))
+
+    def _adapt(self, healthy):
+        '''Additive increase after a fast clean batch, halve otherwise.'''
+        if not self.adaptive:
+            return
+        if healthy:
+            self._size = min(self.max_batch, self._size + self.batch_size)
+        else:
+            self._size = max(self.min_batch, self._size // 2)
+
+    def _estimate_payload(self, columns, values):
+        sample = values[:100]
+        if not sample or not self.max_payload_bytes:
+            return
+        per_row = len(json.dumps(records(columns, sample), default=str)) / len(sample)
+        self._payload_cap = max(1, int(self.max_payload_bytes / per_row))
+
+    # ------------------------------------------------------------------
+    # Load
+    # ------------------------------------------------------------------
+    def load(self, data):
+        report = LoadReport()
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        pending = {}
+        t0 = time.perf_counter()
+
+        def collect(done):
+            for future in done:
+                batch = pending.pop(future)
+                batch.rows = None
+                try:
+                    future.result()
+                except Exception as e:
+                    batch.error = e
+                    report.failures.append(BatchError(batch.start, batch.end, e))
+                    self.log(f"⚠️  Error in rows {batch.start + 1}-{batch.end}: {e}")
+                    self._adapt(False)
+                    if self.on_batch:
+                        self.on_batch(batch)
+                    continue
+                size = batch.end - batch.start
+                report.rows += size - len(batch.rejected)
+                report.retries += batch.retries
+                report.splits += batch.splits
+                report.rejected += [(batch.labels[i], e) for i, e in batch.rejected]
+                if batch.splits:   # the server's body limit is below our estimate: stay under it from now on
+                    self._payload_cap = max(1, min(self._payload_cap, size // 2))
+                self._adapt(not batch.retries and not batch.splits and batch.seconds <= self.target_seconds)
+                rejected = f", {len(batch.rejected)} rejected" if batch.rejected else ""
+                self.log(f"✅ Inserted rows {batch.start + 1}-{batch.end} ({size} rows, {batch.seconds * 1000:.0f} ms{rejected})")
+                if self.on_batch:
+                    self.on_batch(batch)
+
+        offset = 0
+        with ThreadPoolExecutor(self.workers) as pool:
+            for chunk in chunks:
+                columns, values = json_rows(chunk)
+                labels = chunk.index.to_numpy()
+                self._estimate_payload(columns, values)
+                i = 0
+                while i < len(values):
+                    while len(pending) >= self.workers:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                    size = self._next_size()
+                    batch = Batch(offset + i, labels[i:i + size], records(columns, values[i:i + size]))
+                    pending[pool.submit(self._send_batch, batch)] = batch
+                    report.batches += 1
+                    report.batch_sizes.append(batch.end - batch.start)
+                    i += batch.end - batch.start
+                offset += len(values)
+            while pending:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+
+        report.seconds = time.perf_counter() - t0
+        return report
+
+
+def insert_rows(client, table, data, **options):
+    '''Insert a DataFrame (or DataFrame chunks) into table; returns a LoadReport.'''
+    def send(rows):
+        client.table(table).insert(rows, returning="minimal").execute()
+
+    return _run(send, data, options)
+
+
+def upsert_rows(client, table, data, on_conflict, **options):
+    '''Upsert on the on_conflict key: idempotent, so ambiguous timeouts are retried.'''
+    def send(rows):
+        client.table(table).upsert(rows, on_conflict=on_conflict, returning="minimal").execute()
+
+    options.setdefault("retry_ambiguous", True)
+    return _run(send, data, options)
+
+
+def _run(send, data, options):
+    report = BulkLoader(send, **options).load(data)
+    options.get("log", print)(
+        f"📈 {report.rows} rows in {report.seconds:.1f}s ({report.rows_per_s:,.0f} rows/sec), {report.batches} batches, "
+        f"{report.retries} retries, {len(report.failures)} failed batches, {len(report.rejected)} rejected rows")
+    return report
@@ -0,0 +1,149 @@
+'''CHECKPOINTS (etl_common/checkpoint.py)
+Resumable, idempotent loads.
+
+load_resumable(client, table, frame, source, manifest_path, dead_letter_path)
+  - gives every row a deterministic row_key: a natural key column when
+    there is one (e.g. customerID), else a hash of the row's content plus
+    its occurrence number among identical rows (so true duplicates stay)
+  - upserts on row_key, so re-sending a row never duplicates it
+  - records the committed row ranges (positions in the staged file) in a
+    JSON manifest after every batch
+  - writes the rows the server refused (bad value / constraint, isolated
+    row by row) and the rows of batches that failed for good to a
+    dead-letter CSV, with the error and the row position
+
+A rerun on the same staged file skips the committed ranges and retries
+only the rest (the failed and dead-lettered rows, and whatever was not
+reached). If the staged file changed, the manifest starts over; the
+upserts keep that safe.
+
+The table needs the key column with a unique index:
+    ALTER TABLE <table> ADD COLUMN IF NOT EXISTS row_key TEXT;
+    CREATE UNIQUE INDEX IF NOT EXISTS <table>_row_key ON <table> (row_key);
+'''
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from etl_common import bulk_loader
+
+KEY_COLUMN = "row_key"
+
+
+def row_keys(frame, key_column=None):
+    '''Deterministic key per row.'''
+    if key_column:
+        return frame[key_column].astype(str)
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    occurrence = hashes.groupby(hashes).cumcount()
+    return pd.Series([f"{h:016x}-{n}" for h, n in zip(hashes.to_numpy(), occurrence.to_numpy())], index=frame.index)
+
+
+def fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _runs(positions):
+    '''Sorted int positions -> [[start, end), ...] of consecutive runs.'''
+    positions = np.sort(np.asarray(positions, dtype="int64"))
+    if not len(positions):
+        return []
+    breaks = np.flatnonzero(np.diff(positions) != 1)
+    starts = np.concatenate(([positions[0]], positions[breaks + 1]))
+    ends = np.concatenate((positions[breaks], [positions[-1]])) + 1
+    return [[int(s), int(e)] for s, e in zip(starts, ends)]
+
+
+class Manifest:
+    def __init__(self, path, table, source, key_column, rows):
+        self.path = path
+        self.state = {"table": table, "source": os.path.abspath(source), "fingerprint": fingerprint(source),
+                      "key": key_column or "content hash", "rows": rows, "committed": []}
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if all(saved.get(k) == self.state[k] for k in ("table", "fingerprint", "key", "rows")):
+                self.state["committed"] = saved.get("committed", [])
+
+    @property
+    def committed_rows(self):
+        return sum(end - start for start, end in self.state["committed"])
+
+    def pending_mask(self):
+        mask = np.ones(self.state["rows"], dtype=bool)
+        for start, end in self.state["committed"]:
+            mask[start:end] = False
+        return mask
+
+    def add(self, positions):
+        merged = []
+        for start, end in sorted(self.state["committed"] + _runs(positions)):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.state["committed"] = merged
+
+    def save(self):
+        self.state["committed_rows"] = self.committed_rows
+        self.state["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def load_resumable(client, table, frame, source, manifest_path, dead_letter_path, key_column=None, columns=None,
+                   **options):
+    '''Upsert frame (the rows of the staged file `source`) into table, resuming
+    from manifest_path. columns limits what is sent (row_key is always sent).
+    Returns the LoadReport of this run (None if nothing was left).'''
+    log = options.get("log", print)
+    frame = frame.reset_index(drop=True)
+    frame[KEY_COLUMN] = row_keys(frame.drop(columns=[KEY_COLUMN], errors="ignore"), key_column)
+    manifest = Manifest(manifest_path, table, source, key_column, len(frame))
+    pending = frame[manifest.pending_mask()]
+    if pending.empty:
+        log(f"✅ Nothing to load: all {len(frame)} rows already committed (manifest {manifest_path})")
+        return None
+    if manifest.committed_rows:
+        log(f"⏩ Resuming: {manifest.committed_rows} rows already committed, {len(pending)} to load")
+
+    dead = []                        # (row position, error)
+
+    def on_batch(batch):
+        if batch.error is not None:
+            dead.extend((label, str(batch.error)) for label in batch.labels)
+            return
+        rejected = {batch.labels[i]: str(e) for i, e in batch.rejected}
+        dead.extend(rejected.items())
+        manifest.add([label for label in batch.labels if label not in rejected])
+        manifest.save()
+
+    try:
+        send = pending[list(columns) + [KEY_COLUMN]] if columns else pending
+        report = bulk_loader.upsert_rows(client, table, send, on_conflict=KEY_COLUMN, isolate_rows=True,
+                                         on_batch=on_batch, **options)
+    finally:
+        manifest.save()
+        write_dead_letter(frame, dead, dead_letter_path, log)
+    return report
+
+
+def write_dead_letter(frame, dead, path, log=print):
+    if not dead:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    positions = [position for position, _ in dead]
+    rows = frame.loc[positions].assign(error=[error for _, error in dead], row_position=positions)
+    rows.sort_values("row_position").to_csv(path, index=False)
+    log(f"🪦 {len(rows)} rows written to dead-letter file: {path}")
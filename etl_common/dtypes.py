@@ -0,0 +1,95 @@
+'''DTYPE PLAN (etl_common/dtypes.py)
+Compact dtypes for a frame, applied when it is read and undone before it
+is written, so the files a stage writes stay the same.
+
+    plan = DtypePlan(category=["Contract", ...],    # enumerations
+                     yes_no=["Churn", ...],         # "Yes"/"No" -> bool
+                     ints={"tenure": "int16"},      # fixed width per column
+                     float32={"MonthlyCharges": 2}) # decimals that must survive
+    df = plan.apply(df)          # after reading
+    ...
+    df = plan.restore(df)        # before writing: "Yes"/"No", int64 and float64 again
+
+A column only changes when the values allow it: a Yes/No column with any
+other value becomes a category, an int column keeps int64 if a value does
+not fit its width, and a float column goes to float32 only if every value
+still rounds to itself at the given decimals (restore rounds it back, so
+the written text is unchanged). Missing columns are skipped.
+
+The int widths are fixed rather than the smallest that fits each frame:
+chunks of one file must agree on their dtypes, or writing them to one
+Parquet file fails. restore() widens them back to int64 as well.
+
+memory_report(before, after) compares memory_usage(deep=True) per column.
+'''
+import numpy as np
+import pandas as pd
+
+YES_NO = {"Yes": True, "No": False}
+
+
+class DtypePlan:
+    def __init__(self, category=(), yes_no=(), ints=(), float32=None):
+        self.category = list(category)
+        self.yes_no = list(yes_no)
+        self.ints = dict(ints or {})
+        self.float32 = dict(float32 or {})
+
+    def lower(self):
+        '''The same plan for lowercased column names (as stored in Supabase).'''
+        return DtypePlan([c.lower() for c in self.category], [c.lower() for c in self.yes_no],
+                         {c.lower(): d for c, d in self.ints.items()}, {c.lower(): d for c, d in self.float32.items()})
+
+    def apply(self, df, booleans=True, floats=True):
+        '''Convert df's columns in place and return it. booleans=False keeps the
+        Yes/No columns as categories (for code that compares with "Yes"), and
+        floats=False keeps float64 (for code that sums the values itself).'''
+        for column in self.category:
+            if column in df.columns:
+                df[column] = df[column].astype("category")
+        for column in self.yes_no:
+            if column not in df.columns:
+                continue
+            values = df[column]
+            if booleans and values.dropna().isin(list(YES_NO)).all():
+                # plain bool (1 byte) unless there are gaps to keep
+                df[column] = values.map(YES_NO).astype("boolean" if values.hasnans else bool)
+            else:
+                df[column] = values.astype("category")
+        for column, dtype in self.ints.items():
+            if column in df.columns and pd.api.types.is_integer_dtype(df[column]) and len(df[column]):
+                limits = np.iinfo(dtype)
+                if limits.min <= df[column].min() and df[column].max() <= limits.max:
+                    df[column] = df[column].astype(dtype)
+        for column, decimals in (self.float32 if floats else {}).items():
+            if column in df.columns and pd.api.types.is_float_dtype(df[column]):
+                narrow = df[column].astype("float32")
+                if np.array_equal(narrow.astype("float64").round(decimals).to_numpy(),
+                                  df[column].to_numpy(), equal_nan=True):
+                    df[column] = narrow
+        return df
+
+    def restore(self, df):
+        '''Undo what changes the written text or schema: booleans back to "Yes"/"No"
+        (as categories), ints back to int64, float32 back to float64 at the planned decimals.'''
+        for column in self.yes_no:
+            if column in df.columns and pd.api.types.is_bool_dtype(df[column]):
+                df[column] = df[column].map({True: "Yes", False: "No"}).astype("category")
+        for column in self.ints:
+            if column in df.columns and pd.api.types.is_integer_dtype(df[column]):
+                df[column] = df[column].astype("int64")
+        for column, decimals in self.float32.items():
+            if column in df.columns and df[column].dtype == "float32":
+                df[column] = df[column].astype("float64").round(decimals)
+        return df
+
+
+def memory_report(before, after):
+    '''Bytes per column (deep) before and after, largest savings first, with a total row.'''
+    report = pd.DataFrame({"before": before.memory_usage(deep=True, index=False),
+                           "after": after.memory_usage(deep=True, index=False),
+                           "dtype_before": before.dtypes.astype(str), "dtype_after": after.dtypes.astype(str)})
+    report = report.sort_values("before", ascending=False)
+    report.loc["TOTAL"] = [report["before"].sum(), report["after"].sum(), "", ""]
+    report["ratio"] = (report["before"] / report["after"]).round(1)
+    return report
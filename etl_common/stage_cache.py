@@ -0,0 +1,182 @@
+'''STAGE CACHE (etl_common/stage_cache.py)
+Skip the pipeline stages whose inputs did not change since the last run.
+
+A stage's fingerprint is a sha256 over
+  - the content of its input files (not their names or times, so a new
+    extract that returned the same data counts as unchanged)
+  - its parameters (as JSON)
+  - the source of the code that builds it (e.g. transform.py)
+After a stage is built, the fingerprint, its inputs and its outputs (size
+and mtime) go to <stamp_dir>/<stage>.json, next to the pipeline's data.
+The next run reuses the stage when the fingerprint matches and the
+outputs are still there, unchanged; a stage that raises is not stamped.
+
+partitions() does the same per input file, for a stage that builds one
+output per input (e.g. one flat table per raw JSON): only new or changed
+inputs are rebuilt.
+
+Each run writes a manifest (run_manifest.json) of what was rebuilt, what
+was reused and what always runs (extracts), and why, with fingerprints
+and timings.
+
+    run = stage_cache.Run("data/.stages", "data/run_manifest.json")
+    raw = run.stage("extract", extract_data, always=True)
+    staged = run.stage("transform", lambda: transform_data(raw), inputs=[raw], code=["transform.py"])
+    run.save()
+
+PIPELINE_FORCE=1 (or Run(force=True)) rebuilds every stage.
+'''
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from etl_common.checkpoint import fingerprint as file_hash
+
+FORCE = os.getenv("PIPELINE_FORCE", "0") == "1"
+
+
+def _stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _unchanged(outputs):
+    '''outputs ({path: stat}) all exist with the recorded size and mtime.'''
+    return all(os.path.exists(path) and _stat(path) == stat for path, stat in outputs.items())
+
+
+def fingerprint(input_hashes, params=None, code=()):
+    digest = hashlib.sha256()
+    for content in input_hashes:
+        digest.update(content.encode())
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    for path in code:
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+
+class Run:
+    def __init__(self, stamp_dir, manifest_path, force=FORCE):
+        self.stamp_dir = str(stamp_dir)
+        self.manifest_path = str(manifest_path)
+        self.force = force
+        self.stages = []
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(self.stamp_dir, exist_ok=True)
+
+    def _stamp_path(self, name):
+        return os.path.join(self.stamp_dir, f"{name}.json")
+
+    def _load_stamp(self, name):
+        path = self._stamp_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_stamp(self, name, stamp):
+        path = self._stamp_path(name)
+        with open(path + ".tmp", "w") as f:
+            json.dump(stamp, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _record(self, entry):
+        self.stages.append(entry)
+        icon = {"reused": "♻️ ", "rebuilt": "🔧", "ran": "▶️ ", "partial": "🧩", "failed": "❌"}[entry["status"]]
+        print(f"{icon} Stage {entry['stage']}: {entry['status']} ({entry['reason']})")
+
+    # ------------------------------------------------------------------
+    # Whole stages
+    # ------------------------------------------------------------------
+    def stage(self, name, build, inputs=(), params=None, code=(), always=False):
+        '''Run build() unless the stage is up to date. build returns the output
+        path(s) or None (e.g. a load); the stage returns the same shape.'''
+        inputs = [str(p) for p in inputs]
+        hashes = [file_hash(p) for p in inputs]
+        key = fingerprint(hashes, params, [str(p) for p in code])
+        stamp = self._load_stamp(name)
+        if always:
+            reason = "always runs"
+        elif self.force:
+            reason = "forced"
+        elif stamp is None:
+            reason = "first run"
+        elif stamp["fingerprint"] != key:
+            reason = "inputs, parameters or code changed"
+        elif not _unchanged(stamp["outputs"]):
+            reason = "outputs missing or modified"
+        else:
+            self._record({"stage": name, "status": "reused", "reason": "inputs unchanged", "fingerprint": key,
+                          "inputs": dict(zip(inputs, hashes)), "outputs": list(stamp["outputs"]), "seconds": 0.0})
+            return stamp["result"]
+
+        t0 = time.perf_counter()
+        try:
+            result = build()
+        except BaseException as e:
+            self._record({"stage": name, "status": "failed", "reason": f"{type(e).__name__}: {e}", "fingerprint": key,
+                          "inputs": dict(zip(inputs, hashes)), "outputs": [],
+                          "seconds": round(time.perf_counter() - t0, 3)})
+            self.save()
+            raise
+        result = str(result) if result is not None and not isinstance(result, (list, tuple)) else result
+        outputs = [result] if isinstance(result, str) else [str(p) for p in result or []]
+        self._save_stamp(name, {"stage": name, "fingerprint": key, "params": params, "inputs": dict(zip(inputs, hashes)),
+                                "outputs": {p: _stat(p) for p in outputs}, "result": result,
+                                "built_at": datetime.now().isoformat(timespec="seconds")})
+        self._record({"stage": name, "status": "ran" if always else "rebuilt", "reason": reason, "fingerprint": key,
+                      "inputs": dict(zip(inputs, hashes)), "outputs": outputs,
+                      "seconds": round(time.perf_counter() - t0, 3)})
+        return result
+
+    # ------------------------------------------------------------------
+    # One output per input
+    # ------------------------------------------------------------------
+    def partitions(self, name, inputs, build, params=None, code=()):
+        '''build(input_path) -> output path, for the new or changed inputs only.
+        Returns the outputs in input order. Outputs of inputs that are gone are removed.'''
+        stamp = self._load_stamp(name) or {"partitions": {}}
+        code = [str(p) for p in code]
+        code_key = fingerprint([], params, code)
+        old, parts = stamp["partitions"], {}
+        rebuilt, reused = [], []
+        t0 = time.perf_counter()
+        for path in map(str, inputs):
+            key = fingerprint([file_hash(path)], {"code": code_key})
+            entry = old.get(path)
+            if (not self.force and entry and entry["fingerprint"] == key
+                    and _unchanged({entry["output"]: entry["stat"]})):
+                parts[path] = entry
+                reused.append(path)
+                continue
+            output = str(build(path))
+            parts[path] = {"fingerprint": key, "output": output, "stat": _stat(output)}
+            rebuilt.append(path)
+            self._save_stamp(name, {"stage": name, "partitions": {**old, **parts}})
+        kept = {entry["output"] for entry in parts.values()}
+        for path, entry in old.items():
+            if path not in parts and entry["output"] not in kept and os.path.exists(entry["output"]):
+                os.remove(entry["output"])
+        self._save_stamp(name, {"stage": name, "partitions": parts})
+        status = "reused" if not rebuilt else "rebuilt" if not reused else "partial"
+        self._record({"stage": name, "status": status, "reason": f"{len(rebuilt)} rebuilt, {len(reused)} reused",
+                      "rebuilt": rebuilt, "reused": reused, "outputs": [parts[p]["output"] for p in map(str, inputs)],
+                      "seconds": round(time.perf_counter() - t0, 3)})
+        return [parts[p]["output"] for p in map(str, inputs)]
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def save(self):
+        counts = {}
+        for entry in self.stages:
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        manifest = {"started_at": self.started_at, "finished_at": datetime.now().isoformat(timespec="seconds"),
+                    "forced": self.force, "summary": counts, "stages": self.stages}
+        with open(self.manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+        print(f"📝 Run manifest saved at: {self.manifest_path} {counts}")
+        return manifest
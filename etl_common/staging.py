@@ -0,0 +1,140 @@
+'''STAGING (etl_common/staging.py)
+The files the day13 stages hand to each other (data/raw, data/staged),
+as typed Parquet instead of CSV.
+
+A CSV makes every later stage parse the text again and guess the dtypes
+again (ints that became floats, codes that became "1.0", categories that
+became plain strings). A Parquet file keeps the dtypes it was written
+with, and low-cardinality text columns (contract, churn, embark_town,
+...) are stored as categoricals: small integer codes and a dictionary of
+the labels, so the file is several times smaller than the CSV.
+
+    write(df, path, categories=[...])   Parquet (or CSV if path ends in .csv)
+    read(path)                          memory-mapped; numeric columns
+                                        without nulls are not copied
+    rows(path)                          row count from the Parquet footer
+    write_chunks(chunks, path)          streamed, one row group per chunk
+    fillna(values, value)               also for categoricals
+
+STAGE_FORMAT=csv makes the pipelines stage CSV as before, and
+STAGE_EXPORT_CSV=1 writes a .csv copy next to every Parquet file.
+Readers fall back to the .csv next to a Parquet path that has not been
+written yet (the files committed under data/ are CSV).
+'''
+import os
+
+import pandas as pd
+
+from etl_common import streaming
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:       # CSV staging still works without it
+    pa = pq = None
+
+FORMAT = os.getenv("STAGE_FORMAT", "parquet")
+EXPORT_CSV = os.getenv("STAGE_EXPORT_CSV", "0") == "1"
+SUFFIX = {"parquet": ".parquet", "csv": ".csv"}
+
+
+def path(directory, stem):
+    '''directory/stem + the suffix of the staging format.'''
+    return os.path.join(directory, stem + SUFFIX[FORMAT])
+
+
+def is_parquet(file_path):
+    return str(file_path).endswith(".parquet")
+
+
+def existing(file_path):
+    '''file_path, or the .csv next to it when only that one exists.'''
+    if is_parquet(file_path) and not os.path.exists(file_path):
+        csv_path = os.path.splitext(file_path)[0] + ".csv"
+        if os.path.exists(csv_path):
+            return csv_path
+    return file_path
+
+
+def categorize(df, columns):
+    '''Turn the listed text columns of df into categoricals (in place).'''
+    for column in columns:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def fillna(values, value):
+    '''values.fillna(value), also for a categorical that lacks the value.'''
+    if isinstance(values.dtype, pd.CategoricalDtype) and value not in values.cat.categories:
+        values = values.cat.add_categories([value])
+    return values.fillna(value)
+
+
+def export_csv(df, file_path):
+    csv_path = os.path.splitext(file_path)[0] + ".csv"
+    df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+def write(df, file_path, categories=(), export=EXPORT_CSV):
+    '''Write df to file_path: Parquet, or CSV if the path ends in .csv.'''
+    if not is_parquet(file_path):
+        df.to_csv(file_path, index=False)
+        return file_path
+    tmp_path = file_path + ".part"
+    categorize(df, categories).to_parquet(tmp_path, engine="pyarrow", index=False)
+    os.replace(tmp_path, file_path)
+    if export:
+        export_csv(df, file_path)
+    return file_path
+
+
+def read(file_path, columns=None):
+    file_path = existing(file_path)
+    if not is_parquet(file_path):
+        return pd.read_csv(file_path, usecols=columns)
+    table = pq.read_table(file_path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def rows(file_path):
+    file_path = existing(file_path)
+    if is_parquet(file_path):
+        return pq.ParquetFile(file_path).metadata.num_rows
+    return sum(len(chunk) for chunk in pd.read_csv(file_path, usecols=[0], chunksize=100_000))
+
+
+def _schema(table):
+    '''table's schema with every dictionary column on int32 codes, so the
+    chunks of one file agree even when their category counts differ.'''
+    fields = [pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type, f.type.ordered))
+              if pa.types.is_dictionary(f.type) else f for f in table.schema]
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def write_chunks(chunks, file_path, categories=(), export=EXPORT_CSV):
+    '''Write the chunks to one file (CSV: appended; Parquet: one row group
+    each); returns rows written.'''
+    if not is_parquet(file_path):
+        return streaming.write_chunks(chunks, file_path)
+    written = 0
+    tmp_path = file_path + ".part"
+    writer = schema = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(categorize(chunk, categories), preserve_index=False)
+            if writer is None:
+                schema = _schema(table)
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(table.cast(schema))
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pd.DataFrame().to_parquet(tmp_path, engine="pyarrow", index=False)
+    os.replace(tmp_path, file_path)
+    if export:
+        streaming.write_chunks(streaming.read_chunks(file_path, 100_000), os.path.splitext(file_path)[0] + ".csv")
+    return written
@@ -0,0 +1,334 @@
+'''STAND-IN (etl_common/standin.py)
+A local HTTP server that answers the PostgREST calls the ETL scripts make
+(POST and GET /rest/v1/<table>), so loads and reads can be timed and
+failure-tested without a Supabase project. Rows are kept in memory per table.
+
+Knobs, to look like a real database:
+  latency_ms      fixed cost per request
+  row_cost_us     extra cost per row in the request
+  pool            requests served at once (the connection pool); the rest queue
+  max_body_bytes  bigger request bodies get 413 Payload Too Large
+  fail_rate       share of requests answered 503 without applying them
+  column_types    {"tenure": int, ...}: a request with a value of another
+                  type is refused whole (400, SQLSTATE 22P02), like Postgres
+  max_rows        a GET returns at most this many rows (PostgREST db-max-rows;
+                  Supabase defaults to 1000), whatever limit it asks for
+
+Upserts (Prefer: resolution=merge-duplicates, ?on_conflict=col or
+col1,col2) replace the stored row with the same key instead of adding one. Rows sent
+without an id get the next one (like a BIGSERIAL id column); an upsert
+keeps the id of the row it replaces.
+
+GET understands select=, column filters (eq, neq, gt, gte, lt, lte, is),
+order=col.asc|desc, limit and offset, answers CSV for Accept: text/csv,
+and a Content-Range with the total for Prefer: count=exact (also on HEAD).
+
+Use it in a script:
+    server = StandinServer(latency_ms=20, fail_rate=0.02).start()
+    client = create_client(server.url, "stand-in-key")
+    ...
+    server.stop()
+or run it: python -m etl_common.standin --port 54330 --latency-ms 20
+'''
+import argparse
+import bisect
+import csv
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+READ_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+OPERATORS = {
+    "eq": lambda a, b: a == b, "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b,
+}
+
+
+def _literal(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return {"true": True, "false": False, "null": None}.get(text, text)
+
+
+def _matches(value, op, literal):
+    if op == "is":
+        return value is literal
+    if value is None:             # SQL: a comparison with NULL is never true
+        return False
+    if type(value) is not type(literal) and not (isinstance(value, (int, float)) and isinstance(literal, (int, float))):
+        value, literal = str(value), str(literal)
+    return OPERATORS[op](value, literal)
+
+
+class StandinDB:
+    def __init__(self, latency_ms=0.0, row_cost_us=0.0, pool=8, max_body_bytes=None, fail_rate=0.0,
+                 column_types=None, max_rows=None, seed=1):
+        self.latency_ms = latency_ms
+        self.max_rows = max_rows
+        self.column_types = column_types or {}
+        self.row_cost_us = row_cost_us
+        self.max_body_bytes = max_body_bytes
+        self.fail_rate = fail_rate
+        self.tables = {}                 # name -> list of rows
+        self.keys = {}                   # (table, on_conflict) -> {key values: row position}
+        self.ids = {}                    # table -> sorted ids
+        self.positions = {}              # table -> {id: row position}
+        self.stats = Counter()           # requests, rows, updated, rows_read, 400, 413, 503
+        self._slots = threading.BoundedSemaphore(pool)
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def rows(self, table):
+        with self._lock:
+            return list(self.tables.get(table, []))
+
+    def invalid(self, rows):
+        '''The first value that does not fit its column type, else None.'''
+        for row in rows:
+            for column, kind in self.column_types.items():
+                value = row.get(column)
+                if value is not None and (not isinstance(value, kind) or isinstance(value, bool)):
+                    return column, value
+        return None
+
+    def insert(self, table, rows, on_conflict=None):
+        cost = self.latency_ms / 1000 + self.row_cost_us * len(rows) / 1e6
+        with self._slots:
+            time.sleep(cost)
+            with self._lock:
+                if self._random.random() < self.fail_rate:
+                    self.stats["503"] += 1
+                    return False
+                stored = self.tables.setdefault(table, [])
+                if on_conflict:
+                    columns = on_conflict.split(",")
+                    index = self.keys.get((table, on_conflict))
+                    if index is None:
+                        index = self.keys[(table, on_conflict)] = {
+                            tuple(r.get(c) for c in columns): i for i, r in enumerate(stored)}
+                    for row in rows:
+                        key = tuple(row.get(c) for c in columns)
+                        if key in index:
+                            row["id"] = stored[index[key]].get("id")
+                            stored[index[key]] = row
+                            self.stats["updated"] += 1
+                        else:
+                            self._append(table, row)
+                else:
+                    for row in rows:
+                        self._append(table, row)
+                self.stats["rows"] += len(rows)
+        return True
+
+    def _append(self, table, row):
+        stored = self.tables.setdefault(table, [])
+        ids = self.ids.setdefault(table, [])
+        if row.get("id") is None:
+            row["id"] = ids[-1] + 1 if ids else 1
+        if not ids or row["id"] > ids[-1]:
+            ids.append(row["id"])
+        else:
+            bisect.insort(ids, row["id"])
+        self.positions.setdefault(table, {})[row["id"]] = len(stored)
+        for (name, column), index in self.keys.items():
+            if name == table:
+                index[tuple(row.get(c) for c in column.split(","))] = len(stored)
+        stored.append(row)
+
+    def _candidates(self, table, filters):
+        '''The rows that can match, narrowed by bisecting the ids for id filters.'''
+        stored = self.tables.get(table, [])
+        id_filters = [(op, value) for column, op, value in filters
+                      if column == "id" and op in OPERATORS and op != "neq" and isinstance(value, int)]
+        if not id_filters or table not in self.ids:
+            return list(stored)
+        ids = self.ids[table]
+        lo, hi = 0, len(ids)
+        for op, value in id_filters:
+            if op in ("gt", "gte", "eq"):
+                lo = max(lo, (bisect.bisect_right if op == "gt" else bisect.bisect_left)(ids, value))
+            if op in ("lt", "lte", "eq"):
+                hi = min(hi, (bisect.bisect_left if op == "lt" else bisect.bisect_right)(ids, value))
+        positions = self.positions[table]
+        return [stored[positions[i]] for i in ids[lo:hi]]
+
+    def select(self, table, query):
+        '''Rows for a GET (query is parse_qs output): (rows, columns, offset, total).'''
+        filters = []
+        for column, values in query.items():
+            if column in READ_PARAMS:
+                continue
+            for value in values:
+                op, _, text = value.partition(".")
+                filters.append((column, op, _literal(text)))
+        with self._slots:
+            with self._lock:
+                self.stats["requests"] += 1
+                rows = [r for r in self._candidates(table, filters)
+                        if all(_matches(r.get(c), op, v) for c, op, v in filters)]
+                for term in reversed((query.get("order") or [""])[0].split(",")):
+                    if term:
+                        column, _, direction = term.partition(".")
+                        rows.sort(key=lambda r: (r.get(column) is None, r.get(column)),
+                                  reverse=direction.startswith("desc"))
+                total = len(rows)
+                offset = int((query.get("offset") or [0])[0])
+                limit = int((query.get("limit") or [total])[0])
+                if self.max_rows:
+                    limit = min(limit, self.max_rows)
+                rows = rows[offset:offset + limit]
+                self.stats["rows_read"] += len(rows)
+            time.sleep(self.latency_ms / 1000 + self.row_cost_us * len(rows) / 1e6)
+        select = (query.get("select") or ["*"])[0]
+        if select == "*":
+            columns = list(dict.fromkeys(c for r in rows for c in r))
+        else:
+            columns = select.split(",")
+        return [{c: r.get(c) for c in columns} for r in rows], columns, offset, total
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    db = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, content_type="application/json", headers=None, head=False):
+        if isinstance(body, bytes):
+            data = body
+        else:
+            data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    @staticmethod
+    def _csv(rows, columns):
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(columns)
+        for row in rows:
+            # PostgREST writes NULL as an empty field and booleans as true/false
+            writer.writerow(["" if v is None else str(v).lower() if isinstance(v, bool) else v
+                             for v in (row[c] for c in columns)])
+        return out.getvalue().encode()
+
+    def _table(self):
+        path = self.path.split("?", 1)[0]
+        if not path.startswith("/rest/v1/"):
+            return None
+        return path[len("/rest/v1/"):]
+
+    def do_POST(self):
+        db = self.db
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        with db._lock:
+            db.stats["requests"] += 1
+        table = self._table()
+        if not table:
+            return self._send(404, {"code": "PGRST125", "message": "Invalid path"})
+        if db.max_body_bytes and length > db.max_body_bytes:
+            with db._lock:
+                db.stats["413"] += 1
+            # nginx in front of PostgREST answers this one as plain text
+            data = b"413 Request Entity Too Large"
+            self.send_response(413)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            return self.wfile.write(data)
+        rows = json.loads(body or b"[]")
+        rows = rows if isinstance(rows, list) else [rows]
+        bad = db.invalid(rows)
+        if bad:
+            with db._lock:
+                db.stats["400"] += 1
+            return self._send(400, {"code": "22P02", "details": None, "hint": None,
+                                    "message": f'invalid input syntax for column {bad[0]}: "{bad[1]}"'})
+        on_conflict = None
+        if "resolution=merge-duplicates" in (self.headers.get("Prefer") or ""):
+            query = parse_qs(self.path.partition("?")[2])
+            on_conflict = (query.get("on_conflict") or [None])[0]
+        if not db.insert(table, rows, on_conflict):
+            return self._send(503, {"code": "PGRST001", "message": "Database client error. Retrying the connection."})
+        if "return=representation" in (self.headers.get("Prefer") or ""):
+            return self._send(201, rows)
+        return self._send(201, [])
+
+    def do_GET(self, head=False):
+        if self.path.startswith("/__admin/stats"):
+            with self.db._lock:
+                return self._send(200, dict(self.db.stats))
+        table = self._table()
+        if not table:
+            return self._send(404, {"code": "PGRST125", "message": "Invalid path"}, head=head)
+        query = parse_qs(self.path.partition("?")[2])
+        rows, columns, offset, total = self.db.select(table, query)
+        shown = f"{offset}-{offset + len(rows) - 1}" if rows else "*"
+        counted = "count=exact" in (self.headers.get("Prefer") or "")
+        headers = {"Content-Range": f"{shown}/{total if counted else '*'}"}
+        if "text/csv" in (self.headers.get("Accept") or ""):
+            return self._send(200, self._csv(rows, columns), "text/csv", headers, head)
+        return self._send(200, rows, headers=headers, head=head)
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+
+class StandinServer:
+    def __init__(self, port=0, **options):
+        self.db = StandinDB(**options)
+        handler = type("Handler", (_Handler,), {"db": self.db})
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PostgREST stand-in for the ETL loads")
+    parser.add_argument("--port", type=int, default=54330)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--row-cost-us", type=float, default=20.0)
+    parser.add_argument("--pool", type=int, default=8)
+    parser.add_argument("--max-body-bytes", type=int)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--max-rows", type=int, default=1000)
+    args = parser.parse_args()
+    server = StandinServer(args.port, latency_ms=args.latency_ms, row_cost_us=args.row_cost_us, pool=args.pool,
+                           max_body_bytes=args.max_body_bytes, fail_rate=args.fail_rate,
+                           max_rows=args.max_rows).start()
+    print(f"🧪 Stand-in PostgREST on {server.url} — set SUPABASE_URL to it")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+'''STREAMING (etl_common/streaming.py)
+Chunked CSV transforms with bounded memory, for files too big for one
+pd.read_csv.
+
+Pass 1, profile(): read the file chunk by chunk and keep only
+  - the dtype pandas would infer for each column over the whole file
+  - value counts for the columns that need a global fill value
+    (median / mode), so the fill values are exact, not estimated
+Pass 2, read_chunks() + write_chunks(): read the chunks again with those
+dtypes, transform each one and append it to the staged CSV.
+
+Memory is bounded by the chunk size plus the number of distinct values
+in the counted columns, not by the number of rows. Output matches a full
+read: same dtypes, so the same CSV text, and the same fill values.
+
+A .parquet input (etl_common/staging.py) is read one batch of rows at a
+time; its dtypes are fixed in the file, so no dtype overrides apply.
+'''
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:       # only needed for .parquet inputs
+    pq = None
+
+
+def _chunks(path, chunksize, dtypes=None):
+    if str(path).endswith(".parquet"):
+        return (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+    return pd.read_csv(path, chunksize=chunksize, dtype=dtypes or None)
+
+
+class Profile:
+    def __init__(self):
+        self.rows = 0
+        self.chunk_dtypes = {}      # column -> set of dtypes seen per chunk
+        self.counts = {}            # column -> value counts (Series)
+
+    @property
+    def dtypes(self):
+        '''read_csv dtype overrides for columns whose chunks disagreed.'''
+        resolved = {}
+        for column, seen in self.chunk_dtypes.items():
+            if len(seen) == 1:
+                continue
+            if any(pd.api.types.is_string_dtype(d) for d in seen):
+                resolved[column] = "str"           # text in some chunk: keep every value as read
+            elif all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in seen):
+                resolved[column] = "float64"       # ints, plus missing values in some chunk
+            else:
+                resolved[column] = object
+        return resolved
+
+
+def profile(path, chunksize, count=None):
+    '''First pass. count maps column -> None or a function applied to the
+    column before counting (e.g. pd.to_numeric for a text column).'''
+    count = count or {}
+    prof = Profile()
+    for chunk in _chunks(path, chunksize):
+        prof.rows += len(chunk)
+        for column, dtype in chunk.dtypes.items():
+            prof.chunk_dtypes.setdefault(column, set()).add(dtype)
+        for column, prepare in count.items():
+            values = prepare(chunk[column]) if prepare else chunk[column]
+            counts = values.value_counts()
+            if column in prof.counts:
+                counts = prof.counts[column].add(counts, fill_value=0)
+            prof.counts[column] = counts
+    return prof
+
+
+def median(counts):
+    '''Median of the counted values, as Series.median() would give it.'''
+    if counts is None or counts.empty:
+        return np.nan
+    counts = counts.sort_index()
+    n = int(counts.sum())
+    position = counts.cumsum().to_numpy()
+    values = counts.index.to_numpy(dtype="float64")
+    lower = values[np.searchsorted(position, (n - 1) // 2 + 1)]
+    upper = values[np.searchsorted(position, n // 2 + 1)]
+    return np.mean([lower, upper])
+
+
+def mode(counts):
+    '''Most frequent value, the smallest one on ties (Series.mode()[0]).'''
+    if counts is None or counts.empty:
+        return None
+    return min(counts.index[counts == counts.max()])
+
+
+def read_chunks(path, chunksize, dtypes=None):
+    return _chunks(path, chunksize, dtypes)
+
+
+def write_chunks(chunks, path):
+    '''Append each chunk to path (header once); returns rows written.'''
+    rows = 0
+    tmp_path = path + ".part"
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(tmp_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        rows += len(chunk)
+    if rows == 0 and not os.path.exists(tmp_path):
+        open(tmp_path, "w").close()
+    os.replace(tmp_path, path)
+    return rows
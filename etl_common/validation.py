@@ -0,0 +1,263 @@
+'''VALIDATION (etl_common/validation.py)
+Declarative data checks for the ETL stages, evaluated in one pass.
+
+A dataset declares its rules once:
+    RULES = [
+        NotNull("tenure", "monthlycharges", "totalcharges"),
+        Unique("id"),
+        Allowed("contract_type_code", {0, 1, 2}),
+        Range("hour", 0, 23),
+        Columns("tenure_group", "monthly_charge_segment"),
+        RowCount(7043),                  # or a function, e.g. staging.rows(source)
+    ]
+and validate(data, RULES, name) checks a DataFrame or an iterable of
+chunks (streaming.read_chunks, table_reader pages). Every rule
+looks at each chunk once, with column-wide pandas operations, and keeps
+only small running totals: counts, a few example values, and for Unique
+one 8-byte hash per row. A Validator also works as a table_reader
+aggregator, so a Supabase table can be checked page by page.
+
+The Report has one result per rule (rule, columns, passed, failed rows,
+details) and can be printed, turned into a dict / DataFrame or saved as JSON.
+Missing values are only checked by NotNull; Allowed and Range skip them,
+like a SQL CHECK constraint.
+'''
+import copy
+import json
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from etl_common import streaming
+
+EXAMPLES = 5        # bad values kept per rule for the report
+
+
+class Rule:
+    name = "rule"
+
+    def __init__(self, *columns):
+        self.columns = list(columns)
+        self.failed = 0
+        self.missing_columns = set()
+
+    def _present(self, chunk):
+        '''The rule's columns in chunk; notes the ones that are not there.'''
+        absent = [c for c in self.columns if c not in chunk.columns]
+        self.missing_columns.update(absent)
+        return [c for c in self.columns if c in chunk.columns]
+
+    def update(self, chunk):
+        raise NotImplementedError
+
+    def details(self):
+        return {}
+
+    def result(self, rows):
+        details = self.details()
+        if self.missing_columns:
+            details["missing_columns"] = sorted(self.missing_columns)
+        return {"rule": self.name, "columns": self.columns, "passed": not self.failed and not self.missing_columns,
+                "failed_rows": int(self.failed), "details": details}
+
+
+class NotNull(Rule):
+    name = "not_null"
+
+    def __init__(self, *columns):
+        super().__init__(*columns)
+        self.nulls = Counter()
+
+    def update(self, chunk):
+        present = self._present(chunk)
+        if not present:
+            return
+        missing = chunk[present].isna()
+        self.nulls.update({c: int(n) for c, n in missing.sum().items() if n})
+        self.failed += int(missing.any(axis=1).sum())
+
+    def details(self):
+        return {"nulls": dict(self.nulls)}
+
+
+class Unique(Rule):
+    '''The columns together identify a row (no two rows share the values).'''
+    name = "unique"
+
+    def __init__(self, *columns):
+        super().__init__(*columns)
+        self.hashes = []
+
+    def update(self, chunk):
+        if len(self._present(chunk)) == len(self.columns):
+            self.hashes.append(pd.util.hash_pandas_object(chunk[self.columns], index=False).to_numpy())
+
+    def result(self, rows):
+        hashes = np.concatenate(self.hashes) if self.hashes else np.empty(0, dtype="uint64")
+        self.failed = len(hashes) - len(np.unique(hashes))
+        return super().result(rows)
+
+    def details(self):
+        return {"duplicate_rows": int(self.failed)}
+
+
+class _ValueRule(Rule):
+    '''A rule on the non-missing values of one column.'''
+
+    def __init__(self, column):
+        super().__init__(column)
+        self.examples = Counter()
+
+    def bad(self, values):
+        '''Boolean mask of the values that break the rule.'''
+        raise NotImplementedError
+
+    def update(self, chunk):
+        if not self._present(chunk):
+            return
+        values = chunk[self.columns[0]]
+        values = values[values.notna()]
+        bad = values[self.bad(values)]
+        self.failed += len(bad)
+        if len(self.examples) < EXAMPLES:
+            self.examples.update(bad.astype(str).value_counts().head(EXAMPLES - len(self.examples)).to_dict())
+
+    def details(self):
+        return {"examples": dict(self.examples)}
+
+
+class Allowed(_ValueRule):
+    name = "allowed"
+
+    def __init__(self, column, values):
+        super().__init__(column)
+        self.values = list(values)
+
+    def bad(self, values):
+        return ~values.isin(self.values)
+
+    def details(self):
+        return dict(super().details(), allowed=[str(v) for v in self.values])
+
+
+class Range(_ValueRule):
+    '''low <= value <= high (either bound may be None); text that is not a number fails.'''
+    name = "range"
+
+    def __init__(self, column, low=None, high=None):
+        super().__init__(column)
+        self.low, self.high = low, high
+
+    def bad(self, values):
+        numbers = pd.to_numeric(values, errors="coerce")
+        bad = numbers.isna()
+        if self.low is not None:
+            bad |= numbers < self.low
+        if self.high is not None:
+            bad |= numbers > self.high
+        return bad
+
+    def details(self):
+        return dict(super().details(), low=self.low, high=self.high)
+
+
+class Columns(Rule):
+    '''The columns exist.'''
+    name = "columns"
+
+    def update(self, chunk):
+        self._present(chunk)
+
+
+class RowCount(Rule):
+    '''The total row count equals expected (an int, or a function called at the end,
+    e.g. the row count of the source file or table).'''
+    name = "row_count"
+
+    def __init__(self, expected):
+        super().__init__()
+        self.expected = expected
+
+    def update(self, chunk):
+        pass
+
+    def result(self, rows):
+        expected = self.expected() if callable(self.expected) else self.expected
+        self.failed = abs(rows - expected)
+        self.found_expected = (rows, expected)
+        return super().result(rows)
+
+    def details(self):
+        rows, expected = self.found_expected
+        return {"rows": int(rows), "expected": int(expected)}
+
+
+class Report:
+    def __init__(self, name, rows, chunks, results):
+        self.name = name
+        self.rows = rows
+        self.chunks = chunks
+        self.results = results
+
+    @property
+    def ok(self):
+        return all(r["passed"] for r in self.results)
+
+    @property
+    def failures(self):
+        return [r for r in self.results if not r["passed"]]
+
+    def as_dict(self):
+        return {"dataset": self.name, "rows": self.rows, "chunks": self.chunks, "ok": self.ok, "results": self.results}
+
+    def as_frame(self):
+        return pd.DataFrame([dict(r, columns=",".join(r["columns"]), details=json.dumps(r["details"], default=str))
+                             for r in self.results])
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2, default=str)
+        print(f"✅ Validation report saved at: {path}")
+
+    def print_summary(self):
+        print(f"\n🔍 Validation of {self.name}: {self.rows} rows in {self.chunks} chunk(s)")
+        for r in self.results:
+            columns = ", ".join(r["columns"])
+            detail = f" {r['details']}" if r["details"] and not r["passed"] else ""
+            print(f"{'✅' if r['passed'] else '❌'} {r['rule']}({columns}): {r['failed_rows']} failing rows{detail}")
+        print("✅ All checks passed." if self.ok else f"⚠️ {len(self.failures)} check(s) failed!")
+
+
+class Validator:
+    '''Runs the rules over the chunks passed to update(); report() at the end.
+    Works on copies, so a declared list of rules can be used again.'''
+
+    def __init__(self, rules, name="dataset"):
+        self.rules = copy.deepcopy(rules)
+        self.name = name
+        self.rows = 0
+        self.chunks = 0
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.chunks += 1
+        for rule in self.rules:
+            rule.update(chunk)
+
+    def report(self):
+        return Report(self.name, self.rows, self.chunks, [rule.result(self.rows) for rule in self.rules])
+
+
+def validate(data, rules, name="dataset"):
+    '''Check a DataFrame or an iterable of DataFrame chunks; returns a Report.'''
+    validator = Validator(rules, name)
+    for chunk in [data] if isinstance(data, pd.DataFrame) else data:
+        validator.update(chunk)
+    return validator.report()
+
+
+def validate_file(path, rules, chunksize=100_000, name=None):
+    '''Check a staged file (CSV or Parquet) chunk by chunk.'''
+    return validate(streaming.read_chunks(path, chunksize), rules, name or os.path.basename(path))